@@ -43,8 +43,8 @@ class ChannelAction(IAction):
              {"channel": "<the channel to get members from>"}),
             (self.search_messages,
              "search",
-             "Search for specific terms in a channel's message history.",
-             {"channel": "<the channel to search in>", "terms": "<comma-separated list of terms to search for>"}),
+             "Search for specific terms in a channel's message history, best matches first. Put a term in quotes to match exact wording.",
+             {"channel": "<the channel to search in>", "terms": "<comma-separated list of terms to search for>", "days": "<optional, only search messages from the last this many days>"}),
             (self.view_channel,
              "view",
              "View the messages in a specific channel.",
@@ -228,7 +228,7 @@ class ChannelAction(IAction):
     def search_messages(self, arguments: Dict[str, Any]):
         channel = arguments.get("channel", "")
         terms = arguments.get("terms", "").split(",")
-        terms = [term.strip().lower() for term in terms]
+        terms = [term.strip() for term in terms]
         
         if not terms or terms == [""]:
             yield ("result", "Please provide search terms as a comma-separated list")
@@ -247,46 +247,16 @@ class ChannelAction(IAction):
             
         yield ("system", f"Searching for terms {', '.join(terms)} in channel {channel}")
         
-        messages = self.pubsub.get_channel_messages(channel)
-        found_messages = []
+        days = arguments.get("days", 0)
+        since = time.time() - int(days) * 86400 if days and int(days) > 0 else None
+        results = self.pubsub.search_messages([channel], " ".join(terms), since=since)
         
-        for message in messages:
-            content = message.content.lower()
-            if any(term in content for term in terms):
-                found_messages.append(message)
-        
-        if not found_messages:
+        if not results:
             yield ("result", f"I found no messages containing the terms: {', '.join(terms)}")
             return
 
-        # Sort messages by timestamp in descending order (most recent first)
-        found_messages.sort(key=lambda x: float(x.sent_at) if x.sent_at else 0, reverse=False)
-        
-        # Initialize TokenCounter with a reasonable limit (4000 tokens)
-        token_counter = TokenCounter(4000)
-        
-        # Create header with total matches found
-        header = f"Found {len(found_messages)} matching messages in {channel} (showing most recent):\n"
-        token_counter.feed(header)
-        
-        # Process messages and add to token counter
-        for msg in found_messages:
-            try:
-                date_obj = datetime.fromtimestamp(float(msg.sent_at))
-                formatted_date = date_obj.strftime("%B %d, %Y at %I:%M:%S %p")
-            except (ValueError, TypeError):
-                formatted_date = str(msg.sent_at)
-                
-            message_block = (
-                f"From: {msg.from_user}\n"
-                f"Time: {formatted_date}\n"
-                f"Message: {msg.content}\n"
-                f"---\n"
-            )
-            token_counter.feed(message_block)
-            
-        # Get the chunks that fit within the token limit
-        yield ("result", "".join(token_counter.tail()))
+        header = f"Found {len(results)} matching messages in {channel} (best matches first):\n"
+        yield ("result", header + self.pubsub.format_search_results(results, include_channel=False))
 
     def check_direct_message_with(self, arguments: Dict[str, Any]):
         handle = arguments.get("handle", "")
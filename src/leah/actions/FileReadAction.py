@@ -41,7 +41,8 @@ class FileReadAction(IAction):
              {
                  "search_term": "<text to search for within files>",
                  "path": "<optional: starting directory path for the search>",
-                 "case_sensitive": "<optional: whether the search should be case sensitive (true/false)>"
+                 "case_sensitive": "<optional: whether the search should be case sensitive (true/false)>",
+                 "regex": "<optional: whether the search term is a regular expression (true/false)>"
              }),
              (self.content_search,
              "grep",
@@ -49,7 +50,8 @@ class FileReadAction(IAction):
              {
                  "search_term": "<text to search for within files>",
                  "path": "<optional: starting directory path for the search>",
-                 "case_sensitive": "<optional: whether the search should be case sensitive (true/false)>"
+                 "case_sensitive": "<optional: whether the search should be case sensitive (true/false)>",
+                 "regex": "<optional: whether the search term is a regular expression (true/false)>"
              }),
         ]
 
@@ -154,6 +156,7 @@ Source: {file_path}
         search_term = arguments.get("search_term", "")
         path = arguments.get("path", "")
         case_sensitive = arguments.get("case_sensitive", "false").lower() == "true"
+        regex = str(arguments.get("regex", "false")).lower() == "true"
 
         if not search_term:
             yield ("end", "Search term is required")
@@ -162,7 +165,7 @@ Source: {file_path}
         yield ("system", f"Searching for files containing the text: {search_term} in {path} with case sensitivity: {case_sensitive}")
         
         try:
-            matches = self.file_manager.content_search(search_term, path, case_sensitive)
+            matches = self.file_manager.content_search(search_term, path, case_sensitive, regex)
             if matches:
                 yield ("result", f"Found matches in files:\n" + "\n".join(matches))
             else:
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Dict, Any, Callable
 from .IActions import IAction
-from .utils import fetch_url_with_selenium
+from .utils import PageFetcher, fetch_url_with_selenium
 from selenium.webdriver.common.by import By
 
 class LinkAction(IAction):
@@ -79,7 +79,7 @@ I have downloaded the contents of the url {extracted_url} and found the followin
         try:
             url = arguments['url']
             yield ("system", "Reading contents of url: " + url)
-            main_content = fetch_url_with_selenium(url)
+            main_content = PageFetcher.get_instance().fetch(url)
             yield ("result", self.context_template(self.query, "<text>\n" + main_content + "\n</text>", url))
         except Exception as e:
             yield ("result", self.context_template(self.query, "Error fetching the url with Selenium", url))
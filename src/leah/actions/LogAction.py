@@ -35,25 +35,22 @@ Answer the query using the context provided above.
         logManager = self.config_manager.get_log_manager()
         terms = arguments.get("terms", "").split(",")
         yield ("system", "Logging terms: " + arguments.get("terms", ""))
-        for term in terms:
-            logManager.log_index_item(term, "[USER] " + self.query.replace("\n", "\\n"))
-            logManager.log_index_item(term, "[ASSISTANT] " + self.chat_app.history[-1].text().replace("\n", "\\n"))
+        logManager.index_exchange(self.query, self.chat_app.history[-1].text(), terms)
         yield ("end", "")
 
     def searchIndex(self, terms):
         logManager = self.config_manager.get_log_manager()
         results = []
         total_tokens = 0
-        for term in terms:
-            # Get results and reverse them
-            term_results = list(logManager.search_log_item(term))[::-1]
-            for result in term_results:
-                # Approximate token count (rough estimate: 4 chars = 1 token)
-                result_tokens = len(result) // 4
-                if total_tokens + result_tokens > 2000:
-                    break
-                results.append(result)
-                total_tokens += result_tokens
+        for hit in logManager.search_index(terms):
+            timestamp = datetime.fromtimestamp(hit.timestamp).strftime('%Y-%m-%d_%H-%M-%S') if hit.timestamp else ""
+            result = f"[{timestamp}] {hit.text}"
+            # Approximate token count (rough estimate: 4 chars = 1 token)
+            result_tokens = len(result) // 4
+            if total_tokens + result_tokens > 2000:
+                break
+            results.append(result)
+            total_tokens += result_tokens
         return results
 
     def searchConversationLogs(self, arguments: Dict[str, Any]):
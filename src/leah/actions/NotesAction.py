@@ -36,8 +36,12 @@ class NotesAction(IAction):
             (self.remove_reminder, "remove_reminder", "Remove a reminder", {"id": "<the id of the reminder to remove>"}),
             (self.search_notes,
              "search_notes",
-             "Search through note names for specific terms (comma-separated)",
-             {"terms": "<comma-separated list of terms to search for in note names, e.g. 'meeting,todo,important'>"})
+             "Search through the names and contents of your notes for specific terms (comma-separated), returns the best matching notes with a snippet of each",
+             {"terms": "<comma-separated list of terms to search for in your notes, e.g. 'meeting,todo,important'>"}),
+            (self.get_note_history,
+             "get_note_history",
+             "List the saved versions of a note, or get the content of an earlier version of a note by its version number",
+             {"note_name": "<the name of the note>", "version": "<optional version number to get, leave empty to list the versions>"})
         ]
 
     def context_template(self, query: str, context: str, note_name: str) -> str:
@@ -151,16 +155,31 @@ I have looked up the note {note_name} and found the following information:
         notes_manager = config_manager.get_notes_manager()
         terms_string = arguments.get("terms", "")
         search_terms = [term.strip() for term in terms_string.split(",") if term.strip()]
-        all_notes = notes_manager.get_all_notes()
+        hits = notes_manager.search_notes(" ".join(search_terms))
         
-        matching_notes = []
-        for note in all_notes:
-            if any(term.lower() in note.lower() for term in search_terms):
-                matching_notes.append(note)
-        
-        if not matching_notes:
+        if not hits:
             yield ("result", "No notes found matching the search terms: " + str(search_terms))
         else:
-            yield ("result", "Found the following matching notes: " + ", ".join(matching_notes))
+            yield ("result", "Found the following matching notes:\n" + "\n".join(f"{hit.doc_id}: {hit.snippet}" for hit in hits))
+
+    
 
-    
\ No newline at end of file
+    def get_note_history(self, arguments):
+        note_name = arguments.get("note_name", "")
+        yield ("system", "Getting history of note: " + note_name)
+        notes_manager = self.config_manager.get_notes_manager()
+        version = str(arguments.get("version", "")).strip()
+        if version.isdigit():
+            content = notes_manager.get_note_version(note_name, int(version))
+            if content is None:
+                yield ("result", f"Version {version} of the note {note_name} was not found")
+            else:
+                yield ("result", self.context_template(self.query, content, f"{note_name} (version {version})"))
+            return
+        history = notes_manager.get_note_history(note_name)
+        if not history:
+            yield ("result", "No saved versions found for the note " + note_name)
+        else:
+            yield ("result", "The saved versions of the note " + note_name + " are:\n" + "\n".join(
+                f"version {entry['version']}: {datetime.fromtimestamp(entry['timestamp']).strftime('%Y-%m-%d %H:%M:%S')}, {entry['size']} characters"
+                for entry in history))
@@ -1,9 +1,7 @@
 from datetime import datetime
 from typing import List, Dict, Any, Generator, Tuple, Union
 from .IActions import IAction
-from langchain_community.utilities.tavily_search import TavilySearchAPIWrapper
-from leah.utils.CacheManager import CacheManager
-import hashlib
+from leah.tools.tavily import search_tavily
 
 class TavilyAction(IAction):
     def __init__(self, config_manager, persona: str, query: str, chat_app: Any):
@@ -11,10 +9,6 @@ class TavilyAction(IAction):
         self.persona = persona
         self.query = query
         self.chat_app = chat_app
-        self.tavily_api_key = self.config_manager.get_config().get_keys()["tavily"]
-        self.search = TavilySearchAPIWrapper(tavily_api_key=self.tavily_api_key)
-        # Initialize cache manager with 4 hours (14400 seconds) default expiration
-        self.cache_manager = CacheManager(default_expiration=14400)
 
     def process_query(self) -> Dict[str, Any]:
         return {
@@ -52,37 +46,8 @@ from the Source: {source} which was last updated {today}
             query = arguments['query']
             yield ("system", f"Searching Tavily for: {query}")
             
-            # Create a cache key from the query
-            cache_key = f"tavily_search_{hashlib.md5(query.encode()).hexdigest()}"
-            
-            # Try to get results from cache first
-            cached_results = self.cache_manager.get(cache_key)
-            if cached_results is not None:
-                yield ("system", "Retrieved results from cache")
-                formatted_results = cached_results
-            else:
-                # Perform the search if not in cache
-                results = self.search.results(
-                    query=query,
-                    max_results=5,  # Limiting to top 5 results for conciseness
-                    search_depth="advanced"
-                )
-                
-                # Format the results
-                formatted_results = "Search Results:\n\n"
-                
-                # Format individual search results
-                for idx, result in enumerate(results, 1):
-                    title = result.get('title', 'No title')
-                    url = result.get('url', 'No URL')
-                    content = result.get('content', 'No content')
-                    
-                    formatted_results += f"{idx}. {title}\n"
-                    formatted_results += f"   URL: {url}\n"
-                    formatted_results += f"   Summary: {content}\n\n"
-                
-                # Cache the formatted results
-                self.cache_manager.set(cache_key, formatted_results)
+            # Identical searches from other personas share one request and its cached result
+            formatted_results = search_tavily(query)
             
             yield ("result", self.context_template(self.query, formatted_results, "Tavily Search Results"))
             
@@ -0,0 +1,145 @@
+import threading
+import time
+import traceback
+from typing import Callable, List, Optional
+
+from leah.config.GlobalConfig import GlobalConfig
+
+
+class MemoryConsolidator:
+    """
+    Folds a persona's exchanges into its memories in the background.
+
+    The response loop only hands each exchange to add(), which returns immediately. A
+    per-persona thread collects exchanges and summarizes them together with the current
+    memories in a single low priority LLM request once the persona has been idle for
+    idle_seconds, once batch_size exchanges are waiting, or once the oldest waiting
+    exchange is max_delay seconds old. A burst of messages therefore costs one request.
+    If the request fails the batch is put back in front of the waiting exchanges and
+    retried after a delay that doubles with every failure, up to MAX_RETRY_DELAY.
+    """
+
+    # How often waiting exchanges are checked while the persona is busy or not yet idle long enough
+    POLL_INTERVAL = 1.0
+    RETRY_DELAY = 5.0
+    MAX_RETRY_DELAY = 300.0
+
+    def __init__(self, persona: str, summarize: Callable[[str], str], load_memories: Callable[[], str],
+                 store_memories: Callable[[str], None], is_idle: Callable[[], bool] = lambda: True,
+                 batch_size: int = 5, idle_seconds: float = 10.0, max_delay: float = 300.0):
+        """
+        Initialize the consolidator and start its thread.
+
+        Args:
+            persona (str): The persona whose memories are consolidated
+            summarize (Callable[[str], str]): Sends a prompt to the LLM and returns the response
+            load_memories (Callable[[], str]): Returns the current memories
+            store_memories (Callable[[str], None]): Stores the new memories
+            is_idle (Callable[[], bool]): Whether the persona has no message to process
+            batch_size (int): Number of waiting exchanges that are consolidated without waiting for idle time
+            idle_seconds (float): How long the persona has to be idle before waiting exchanges are consolidated
+            max_delay (float): Longest time an exchange waits, even if the persona is never idle
+        """
+        self.persona = persona
+        self.summarize = summarize
+        self.load_memories = load_memories
+        self.store_memories = store_memories
+        self.is_idle = is_idle
+        self.batch_size = max(1, batch_size)
+        self.idle_seconds = idle_seconds
+        self.max_delay = max_delay
+        self.consolidations = 0
+        self._pending: List[str] = []
+        self._oldest: Optional[float] = None
+        self._last_added = 0.0
+        self._idle_since: Optional[float] = None
+        self._retry_delay = 0.0
+        self._retry_at = 0.0
+        self._condition = threading.Condition()
+        self._consolidate_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"MemoryConsolidator-{persona}", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, persona: str, summarize: Callable[[str], str], load_memories: Callable[[], str],
+                    store_memories: Callable[[str], None], is_idle: Callable[[], bool]) -> 'MemoryConsolidator':
+        """Create a consolidator configured from the memory_consolidator section of config.json."""
+        config = GlobalConfig().get_memory_consolidator_config()
+        return cls(persona, summarize, load_memories, store_memories, is_idle,
+                   batch_size=config.get('batch_size', 5),
+                   idle_seconds=config.get('idle_seconds', 10),
+                   max_delay=config.get('max_delay', 300))
+
+    def add(self, exchange: str) -> None:
+        """Queue an exchange to be folded into the memories."""
+        with self._condition:
+            self._pending.append(exchange)
+            now = time.monotonic()
+            self._last_added = now
+            if self._oldest is None:
+                self._oldest = now
+            self._condition.notify()
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def flush(self) -> None:
+        """Consolidate the waiting exchanges now, on the calling thread."""
+        with self._condition:
+            batch = self._take()
+        if batch:
+            self._consolidate(batch)
+
+    def _take(self) -> List[str]:
+        batch, self._pending, self._oldest = self._pending, [], None
+        return batch
+
+    def _ready(self, now: float) -> bool:
+        if not self._pending or now < self._retry_at:
+            return False
+        if len(self._pending) >= self.batch_size or now - self._oldest >= self.max_delay:
+            return True
+        # Idle means no new exchange and no message being processed for idle_seconds
+        if not self.is_idle():
+            self._idle_since = None
+            return False
+        if self._idle_since is None:
+            self._idle_since = now
+        return now - max(self._idle_since, self._last_added) >= self.idle_seconds
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._ready(time.monotonic()):
+                    self._condition.wait(timeout=self.POLL_INTERVAL if self._pending else None)
+                batch = self._take()
+            self._consolidate(batch)
+
+    def _consolidate(self, batch: List[str]) -> None:
+        with self._consolidate_lock:
+            succeeded = self._summarize_batch(batch)
+        with self._condition:
+            if succeeded:
+                self._retry_delay, self._retry_at = 0.0, 0.0
+                return
+            self._retry_delay = min(self.MAX_RETRY_DELAY, self._retry_delay * 2 or self.RETRY_DELAY)
+            self._retry_at = time.monotonic() + self._retry_delay
+            print(f"Retrying the memory consolidation of {self.persona} in {self._retry_delay} seconds")
+            self._pending = batch + self._pending
+            # Retry as soon as the delay has passed instead of waiting for idle time again
+            self._oldest = time.monotonic() - self.max_delay
+            self._condition.notify()
+
+    def _summarize_batch(self, batch: List[str]) -> bool:
+        try:
+            exchanges = "\n\n".join(batch)
+            new_memories = self.summarize(self.load_memories() + "\n\n" + exchanges + "\n\nSummarize the content above, use first person past tense, skip prose.")
+            if new_memories:
+                self.store_memories(new_memories)
+            self.consolidations += 1
+            return True
+        except Exception as e:
+            print(f"Error consolidating memories of {self.persona}: {e}")
+            traceback.print_exc()
+            return False
@@ -4,22 +4,25 @@ import json
 import traceback
 from typing import List
 from leah.actions import Actions
+from leah.actors.MemoryConsolidator import MemoryConsolidator
 from leah.llm.LlmConnector import LlmConnector
 from leah.llm.StreamProcessor import StreamProcessor
 from leah.tools.tools import getTools
+from leah.utils.ChannelExecutor import ChannelExecutor
 from leah.utils.ChannelContextManager import ChannelContextManager, ContextType
+from leah.utils.EpisodicMemory import EpisodicMemory, format_memories
+from leah.utils.ExpiringIdSet import ExpiringIdSet
 from leah.utils.FileManager import FileManager
 from leah.utils.Message import MessageType
 from leah.utils.SubscriptionService import SubscriptionService
 from leah.utils.TokenCounter import TokenCounter, TokenLimiter
 from leah.utils.PubSub import PubSub, Message
+from leah.config.GlobalConfig import GlobalConfig
 from leah.config.LocalConfigManager import LocalConfigManager
 from leah.llm.ChatApp import ChatApp
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
 import random
 import time
-from queue import Queue
-from threading import Thread
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from src.leah.llm.McpConnector import McpToolsSingleton
 
@@ -30,7 +33,6 @@ class ToolContent:
 class PersonaActor:
 
     def __init__(self, persona: str):
-        self._processing_queue = Queue()
         self.persona = persona
         self.handle = "@" + persona
         self._subscribed_channels = set()
@@ -38,9 +40,22 @@ class PersonaActor:
         self.file_manager = FileManager(LocalConfigManager("default", self.persona))
         self.memories_path = f"_{self.persona}_memories.txt"
         self.channel_seen_history = {}
-        self.seen_ids = []
+        self.id_config = GlobalConfig().get_persona_ids_config()
+        # Bounded, so duplicate checks stay O(1) and memory stays flat over long uptimes
+        self.seen_ids = ExpiringIdSet(self.id_config.get('max_seen_ids', 10000), self.id_config.get('seen_ttl', 86400))
         self.config_manager = LocalConfigManager("default", "default")
-        self.processing_message = None
+        # Messages of a channel are handled in order, different channels in parallel
+        self.executor = ChannelExecutor(self._process_message, GlobalConfig().get_max_concurrency(persona), f"PersonaActor-{persona}")
+        self.memory_consolidator = MemoryConsolidator.from_config(
+            persona, self._summarize_memories, self._load_memories, self._store_memories, self.is_idle)
+        self.memory_config = GlobalConfig().get_episodic_memory_config()
+        self.episodic_memory = EpisodicMemory.open(
+            LocalConfigManager("default", persona).get_persona_path("memories.db"),
+            half_life_days=self.memory_config.get('half_life_days', 30),
+            recency_weight=self.memory_config.get('recency_weight', 0.5))
+        if len(self.episodic_memory) == 0:
+            # Start from the memories written before episodes were kept
+            self.episodic_memory.set_summary(self._load_memories())
 
         self.tool_history = {}
         self.llm_response_history = {}
@@ -65,7 +80,7 @@ class PersonaActor:
 
         new_channel_messages = []
         for message in channel_messages:
-            if message.id not in self.messages_sent.get(channel, []):  
+            if message.id not in self.messages_sent.get(channel, ()):
                 new_channel_messages.append(message)
 
         channel_messages = new_channel_messages
@@ -97,8 +112,8 @@ class PersonaActor:
             if isinstance(item, AIMessage) and item.tool_calls:
                 tool_messages = []
                 for tool_call in item.tool_calls:
-                    if tool_call.get("id", "") in self.tool_history:
-                        tool_messages.append(self.tool_history[tool_call.get("id", "")])
+                    if tool_call.get("id", "") in self.tool_history.get(channel, {}):
+                        tool_messages.append(self.tool_history[channel][tool_call.get("id", "")])
                 # append the tool_messages to the history after the item
                 new_history.append(item)
                 new_history.extend(tool_messages)
@@ -140,9 +155,9 @@ class PersonaActor:
         
         return final_history
 
-    def get_context_items(self):
+    def get_context_items(self, channel: str):
         channel_context = ChannelContextManager()
-        items = channel_context.get_context(self.processing_message.via_channel) or []
+        items = channel_context.get_context(channel) or []
         out = []
         print("Context items:")
         print("--------------------------------")
@@ -153,7 +168,13 @@ class PersonaActor:
                 out.append(SystemMessage(context.get("text", "")))
         return out
 
-    def get_memories(self):
+    def get_memories(self, query: str = "") -> str:
+        """Return the memories most relevant to query, or the most recent ones if nothing matches."""
+        hits = self.episodic_memory.recall(query, k=self.memory_config.get('top_k', 8),
+                                           candidates=self.memory_config.get('candidates', 50))
+        return format_memories(hits)
+
+    def _load_memories(self) -> str:
         token_counter = TokenCounter(3000)
         file = self.file_manager.get_file(self.memories_path)
         if file:
@@ -166,10 +187,20 @@ class PersonaActor:
             return ""
         
     def update_memories(self, response: str):
-        connector = self.get_llm_connector(self.processing_message)
-        new_memories = connector.query(self.get_memories() + "\n\n" + response.replace("! done !", "").strip() + "\n\nSummarize the content above, use first person past tense, skip prose.")
-        if new_memories:
-            self.file_manager.put_file(self.memories_path, new_memories)
+        exchange = response.replace("! done !", "").strip()
+        self.episodic_memory.add(exchange)
+        # Consolidated in the background, batched with other exchanges while the persona is idle
+        self.memory_consolidator.add(exchange)
+
+    def _summarize_memories(self, prompt: str) -> str:
+        return LlmConnector(self.config_manager, self.persona).query(prompt, low_priority=True)
+
+    def _store_memories(self, memories: str):
+        self.file_manager.put_file(self.memories_path, memories)
+        self.episodic_memory.set_summary(memories)
+
+    def is_idle(self) -> bool:
+        return self.executor.idle()
 
     def get_llm_connector(self, message: Message):
         connector = LlmConnector(self.config_manager, self.persona)
@@ -186,7 +217,6 @@ class PersonaActor:
         #return SystemMessage(Actions.Actions(self.config_manager, self.persona, "", self).get_actions_prompt())
 
     def response_loop(self, message: Message, depth: int = 0):
-        self.processing_message = message
         max_depth = 2
         if depth > max_depth:
             print("Max depth reached, stopping")
@@ -227,9 +257,9 @@ class PersonaActor:
         
         connector = self.get_llm_connector(message)
 
-        memories = SystemMessage("These are your most recent memories: \n\n" + self.get_memories())
+        memories = SystemMessage("These are your memories relevant to this message: \n\n" + self.get_memories(message.content))
 
-        base_history = [self.get_persona_system_content(), self.get_tools_system_content(), memories] + self.get_context_items() + self.build_channel_history(message.via_channel)
+        base_history = [self.get_persona_system_content(), self.get_tools_system_content(), memories] + self.get_context_items(message.via_channel) + self.build_channel_history(message.via_channel)
         print("Base history:")
         for item in base_history:
             print(item.__class__.__name__ + ": " + str(item.text()[0:100]))
@@ -253,9 +283,9 @@ class PersonaActor:
                         self.hangup(message.via_channel)
                         return
                     if message.via_channel not in self.messages_sent:
-                        self.messages_sent[message.via_channel] = []
+                        self.messages_sent[message.via_channel] = ExpiringIdSet(self.id_config.get('max_sent_ids', 2000))
                     output_message = Message(self.handle, message.via_channel, content, message.type)
-                    self.messages_sent[message.via_channel].append(output_message.id)
+                    self.messages_sent[message.via_channel].add(output_message.id)
                     self._pubsub.publish(output_message.via_channel, output_message)
                     
                 if type == "tool_attempt":
@@ -263,18 +293,20 @@ class PersonaActor:
                 if type == "system":
                     self.system_message(content)
 
-            self.tool_history = {}
-            self.llm_response_history = {}
+            # Only this channel's call state is replaced, other channels may be responding at the same time
+            tool_history = {}
+            llm_response_history = []
 
             for item in connector.history:
                 if isinstance(item, ToolMessage):  
-                    self.tool_history[item.tool_call_id] = item
+                    tool_history[item.tool_call_id] = item
                 if isinstance(item, AIMessage):
-                    if not message.via_channel in self.llm_response_history:
-                        self.llm_response_history[message.via_channel] = []
                     ## if item has sent_at, add it to the history
                     if hasattr(item, "sent_at"):
-                        self.llm_response_history[message.via_channel].append((item.sent_at, item))
+                        llm_response_history.append((item.sent_at, item))
+
+            self.tool_history[message.via_channel] = tool_history
+            self.llm_response_history[message.via_channel] = llm_response_history
                    
 
             if "! continue !" in response:
@@ -302,31 +334,21 @@ class PersonaActor:
     def hangup(self, channel: str):
         self._pubsub.publish(channel, Message(self.handle, channel, "! hangup !", MessageType.HANGUP))
 
-    def _handle_message(self,  message: Message):      
-        self._processing_queue.put(message)
-
-    def _thread_loop(self):
-        try:
-            while True:
-                if not self._processing_queue.empty():
-                    message = self._processing_queue.get()
-                    if message.id in self.seen_ids:
-                        print(" !! DUPLICATE MESSAGE !!")
-                        continue
-                    self.seen_ids.append(message.id)
-                else:
-                    time.sleep(0.1)
-                    continue
-                self.response_loop(message, 0)
-        except Exception as e:
-            print(e)
-            traceback.print_exc()
-            time.sleep(1)
-            self._thread_loop()
+    def _handle_message(self,  message: Message):
+        if not self.seen_ids.add(message.id):
+            print(" !! DUPLICATE MESSAGE !!")
+            return
+        self.executor.submit(message.via_channel, message)
+
+    def _process_message(self, message: Message):
+        self.response_loop(message, 0)
+
+    def get_metrics(self) -> dict:
+        """Return the queue depths and totals of this persona's message executor."""
+        return self.executor.metrics()
 
     def listen(self):
         self._pubsub.subscribe(self.handle, self._handle_message)
-        Thread(target=self._thread_loop).start()
 
     def query_template(self, query: str):
         return f"""
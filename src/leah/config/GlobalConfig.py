@@ -79,12 +79,68 @@ class GlobalConfig:
         """Get the Stable Diffusion URL from config."""
         return self.config.get('stable_diffusion', {})
 
+    def get_tts_config(self) -> Dict[str, Any]:
+        """Get the text to speech settings from config."""
+        return self.config.get('tts', {})
+
+    def get_browser_pool_config(self) -> Dict[str, Any]:
+        """Get the headless browser pool settings from config."""
+        return self.config.get('browser_pool', {})
+
+    def get_page_fetcher_config(self) -> Dict[str, Any]:
+        """Get the web page fetching and caching settings from config."""
+        return self.config.get('page_fetcher', {})
+
+    def get_cache_config(self) -> Dict[str, Any]:
+        """Get the memory and disk limits for the shared cache from config."""
+        return self.config.get('cache', {})
+
+    def get_prompt_cache_config(self) -> Dict[str, Any]:
+        """Get the LLM prompt cache settings from config."""
+        return self.config.get('prompt_cache', {})
+
+    def get_embeddings_config(self) -> Dict[str, Any]:
+        """Get the embedding backend and batching settings from config."""
+        return self.config.get('embeddings', {})
+
+    def get_file_index_config(self) -> Dict[str, Any]:
+        """Get the trigram file index settings from config, the index is disabled without a root."""
+        return self.config.get('file_index', {})
+
+    def get_file_search_config(self) -> Dict[str, Any]:
+        """Get the unindexed file search settings from config."""
+        return self.config.get('file_search', {})
+
+    def get_log_writer_config(self) -> Dict[str, Any]:
+        """Get the background log writer and rotation settings from config."""
+        return self.config.get('log_writer', {})
+
+    def get_notes_config(self) -> Dict[str, Any]:
+        """Get the note version retention settings from config."""
+        return self.config.get('notes', {})
+
+    def get_memory_consolidator_config(self) -> Dict[str, Any]:
+        """Get the batching and idle settings of the persona memory consolidator from config."""
+        return self.config.get('memory_consolidator', {})
+
+    def get_episodic_memory_config(self) -> Dict[str, Any]:
+        """Get the recall settings of the persona episodic memory from config."""
+        return self.config.get('episodic_memory', {})
+
+    def get_persona_ids_config(self) -> Dict[str, Any]:
+        """Get the size and expiry limits of the seen and sent message ids kept by persona actors from config."""
+        return self.config.get('persona_ids', {})
+
     
     
     def get_use_broker(self, persona='default') -> bool:
         """Get the use broker setting for the specified persona."""
         return self._get_persona_config(persona).get('use_broker', False)
 
+    def get_max_concurrency(self, persona='default') -> int:
+        """Get the number of channels the specified persona responds in at the same time."""
+        return int(self._get_persona_config(persona).get('max_concurrency', 2))
+
     def get_model(self, persona='default') -> str:
         """Get the model for the specified persona."""
         return self._get_persona_config(persona)['model']
@@ -13,6 +13,7 @@ from typing import Any, List
 import tiktoken
 from langchain_openai import ChatOpenAI
 from langchain_ollama import ChatOllama
+from leah.llm.PromptCache import PromptCache
 from leah.llm.TokenRateLimiter import TokenRateLimiter
 from leah.utils.TokenCounter import TokenLimiter
 
@@ -40,6 +41,8 @@ class LlmConnector:
         self.connector_type = connector_type
         model = self.config.get_model(persona)
         temperature = self.config.get_temperature(persona)
+        self.model = model
+        self.temperature = temperature
         api_key = self.config.get_ollama_api_key(persona)
         base_url = self.config.get_ollama_url(persona)
 
@@ -75,7 +78,25 @@ class LlmConnector:
     def add_processor(self, processor: StreamProcessor):
         self.processors.append(processor)
 
-    def query(self, query):
+    def query(self, query, use_cache: bool = None, low_priority: bool = False):
+        """
+        Send a single prompt and return the full response.
+
+        Args:
+            query: The prompt
+            use_cache: Serve repeated prompts from the PromptCache. By default this is
+                       only done when the persona's temperature is 0 and no tools are bound.
+            low_priority: Background work that waits for a smaller share of the token rate limit
+        """
+        if use_cache is None:
+            use_cache = self.temperature == 0 and not self.tools
+        if not use_cache:
+            return self._query(query, low_priority)
+        prompt_cache = PromptCache.get_instance()
+        key = prompt_cache.key(self.connector_type, self.model, self.temperature, query)
+        return prompt_cache.get_or_compute(key, lambda: self._query(query, low_priority))
+
+    def _query(self, query, low_priority: bool = False):
         
         # Calculate estimated tokens for rate limiting
         estimated_tokens = 0
@@ -84,7 +105,7 @@ class LlmConnector:
         # Check rate limit
         connector_type = self.config.get_connector_type(self.persona)
         rate_limiter = TokenRateLimiter()
-        while not rate_limiter.check_rate_limit(connector_type, estimated_tokens):
+        while not rate_limiter.check_rate_limit(connector_type, estimated_tokens, low_priority):
             print(" !! Token rate limit exceeded, waiting 1 second before checking again")
             time.sleep(1)  # Wait 1 second before checking again
             
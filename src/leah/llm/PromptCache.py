@@ -0,0 +1,98 @@
+import hashlib
+import threading
+from typing import Callable, Optional
+
+from leah.config.GlobalConfig import GlobalConfig
+from leah.utils.CacheManager import CacheManager
+from leah.utils.SingleFlight import SingleFlight
+
+
+class PromptCache:
+    """
+    Caches LLM responses to single prompts.
+
+    Entries are keyed by connector, model, temperature and a hash of the prompt, and are
+    stored in the shared CacheManager, which bounds them by TTL and by the cache's memory
+    and disk budgets. Concurrent requests for the
+    same prompt wait for one LLM call instead of each making their own.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, ttl: int = 86400, max_response_chars: int = 100000, config_manager=None):
+        """
+        Initialize the prompt cache.
+
+        Args:
+            ttl (int): Seconds a cached response stays valid
+            max_response_chars (int): Longer responses are returned but not cached
+            config_manager: LocalConfigManager whose cache directory is used, None for the default one
+        """
+        self.ttl = ttl
+        self.max_response_chars = max_response_chars
+        self.config_manager = config_manager
+        self._flight = SingleFlight()
+
+    @classmethod
+    def get_instance(cls) -> 'PromptCache':
+        """
+        Get the shared prompt cache, configured from the prompt_cache section of config.json.
+
+        Returns:
+            PromptCache: The singleton instance
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    config = GlobalConfig().get_prompt_cache_config()
+                    cls._instance = PromptCache(
+                        ttl=config.get('ttl', 86400),
+                        max_response_chars=config.get('max_response_chars', 100000))
+        return cls._instance
+
+    @staticmethod
+    def normalize(prompt: str) -> str:
+        """
+        Strip leading and trailing whitespace. Whitespace inside the prompt is kept, since
+        it can be meaningful (code or verse passed to translate).
+        """
+        return prompt.strip()
+
+    def key(self, connector_type: str, model: str, temperature: float, prompt: str) -> str:
+        digest = hashlib.sha256(
+            f"{connector_type}\0{model}\0{temperature}\0{self.normalize(prompt)}".encode('utf-8')).hexdigest()
+        return f"prompt_{digest}"
+
+    def get(self, key: str) -> Optional[str]:
+        return CacheManager(self.config_manager, default_expiration=self.ttl).get(key)
+
+    def put(self, key: str, response: str) -> None:
+        if not response or len(response) > self.max_response_chars:
+            return
+        CacheManager(self.config_manager, default_expiration=self.ttl).set(key, response)
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        """
+        Return the cached response for key, or run compute once and cache its result.
+
+        Args:
+            key (str): Key from key()
+            compute (Callable): Makes the LLM call when the response is not cached
+
+        Returns:
+            str: The response
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        def compute_and_store() -> str:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            response = compute()
+            self.put(key, response)
+            return response
+
+        return self._flight.do(key, compute_and_store)
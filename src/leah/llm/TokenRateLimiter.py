@@ -8,6 +8,10 @@ class TokenRateLimiter:
     """
     _instance = None
     _lock = threading.Lock()
+
+    # Low priority requests (background work such as memory consolidation) may only use
+    # this share of the per-minute budget, leaving the rest for interactive requests
+    LOW_PRIORITY_SHARE = 0.5
     
     def __new__(cls):
         with cls._lock:
@@ -35,7 +39,7 @@ class TokenRateLimiter:
             # Add current token usage with timestamp
             self._token_usage[connector_type].append((current_time, token_count))
     
-    def check_rate_limit(self, connector_type: str, estimated_tokens: int = 0) -> bool:
+    def check_rate_limit(self, connector_type: str, estimated_tokens: int = 0, low_priority: bool = False) -> bool:
         """
         Check if we can make a request for this connector type based on token rate limits.
         Returns True if request is allowed, False if we need to wait.
@@ -43,9 +47,34 @@ class TokenRateLimiter:
         Args:
             connector_type: The type of connector (e.g., 'gemini', 'openai')
             estimated_tokens: Estimated number of tokens for the upcoming request
+            low_priority: Whether the request is background work limited to LOW_PRIORITY_SHARE of the budget
+        """
+        # The actual token usage will be added after the request completes via add_tokens
+        return self._acquire(connector_type, estimated_tokens, low_priority, reserve=False)
+
+    def reserve_tokens(self, connector_type: str, estimated_tokens: int, low_priority: bool = False) -> bool:
         """
+        Check the rate limit and, if the request is allowed, record its estimated tokens in the same step.
+
+        Concurrent callers cannot all pass against the same window, as they can with
+        check_rate_limit followed by add_tokens. The reserved tokens count as used; do not
+        call add_tokens for the request as well.
+
+        Args:
+            connector_type: The type of connector (e.g., 'gemini', 'openai')
+            estimated_tokens: Estimated number of tokens for the upcoming request
+            low_priority: Whether the request is background work limited to LOW_PRIORITY_SHARE of the budget
+
+        Returns:
+            bool: True if the tokens were reserved, False if we need to wait
+        """
+        return self._acquire(connector_type, estimated_tokens, low_priority, reserve=True)
+
+    def _acquire(self, connector_type: str, estimated_tokens: int, low_priority: bool, reserve: bool) -> bool:
         config = GlobalConfig()
         tokens_per_minute = int(config.get_connector_rate_limit(connector_type)) # TOKENS per minute
+        if low_priority:
+            tokens_per_minute = int(tokens_per_minute * self.LOW_PRIORITY_SHARE)
         print(f" - Checking rate limit for {connector_type} with limit {tokens_per_minute} tokens/minute")
         
         with self._limiter_lock:
@@ -65,10 +94,11 @@ class TokenRateLimiter:
             
             print(f" - Used {total_tokens_used} tokens in the last minute for {connector_type}")
            
-            # Check if we've exceeded the token rate limit
-            if estimated_total > tokens_per_minute:
+            # Check if we've exceeded the token rate limit, a large low priority request still runs once the minute is quiet
+            if estimated_total > tokens_per_minute and not (low_priority and total_tokens_used == 0):
                 print(f" - Estimated total tokens: {estimated_total} is greater than tpm limit of {tokens_per_minute}")
                 return False
-                
-            # The actual token usage will be added after the request completes via add_tokens
-            return True 
\ No newline at end of file
+
+            if reserve:
+                self._token_usage[connector_type].append((current_time, estimated_tokens))
+            return True
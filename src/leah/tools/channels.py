@@ -186,11 +186,12 @@ def getTools(persona: str, config_manager):
         return f"Members in {channel}: {members_list}"
 
     @tool
-    def search_messages_in_channel(channel: str, terms: str):
+    def search_messages_in_channel(channel: str, terms: str, days: int = 0):
         """
-        Search for specific terms in a channel's message history.
+        Search for specific terms in a channel's message history, best matches first.
+        Use "quoted phrases" for exact wording, and days to only search recent messages.
         """
-        terms_list = [term.strip().lower() for term in terms.split(",")]
+        terms_list = [term.strip() for term in terms.split(",")]
         
         if not terms_list or terms_list == [""]:
             return "Please provide search terms as a comma-separated list"
@@ -204,45 +205,14 @@ def getTools(persona: str, config_manager):
         if not channel.startswith("#"):
             channel = "#" + channel
         
-        messages = pubsub.get_channel_messages(channel)
-        found_messages = []
+        since = time.time() - int(days) * 86400 if days and int(days) > 0 else None
+        results = pubsub.search_messages([channel], " ".join(terms_list), since=since)
         
-        for message in messages:
-            content = message.content.lower()
-            if any(term in content for term in terms_list):
-                found_messages.append(message)
-        
-        if not found_messages:
+        if not results:
             return f"I found no messages containing the terms: {', '.join(terms_list)}"
 
-        # Sort messages by timestamp in descending order (most recent first)
-        found_messages.sort(key=lambda x: float(x.sent_at) if x.sent_at else 0, reverse=False)
-        
-        # Initialize TokenCounter with a reasonable limit (4000 tokens)
-        token_counter = TokenCounter(4000)
-        
-        # Create header with total matches found
-        header = f"Found {len(found_messages)} matching messages in {channel} (showing most recent):\n"
-        token_counter.feed(header)
-        
-        # Process messages and add to token counter
-        for msg in found_messages:
-            try:
-                date_obj = datetime.fromtimestamp(float(msg.sent_at))
-                formatted_date = date_obj.strftime("%B %d, %Y at %I:%M:%S %p")
-            except (ValueError, TypeError):
-                formatted_date = str(msg.sent_at)
-                
-            message_block = (
-                f"From: {msg.from_user}\n"
-                f"Time: {formatted_date}\n"
-                f"Message: {msg.content}\n"
-                f"---\n"
-            )
-            token_counter.feed(message_block)
-            
-        # Get the chunks that fit within the token limit
-        return "".join(token_counter.tail())
+        header = f"Found {len(results)} matching messages in {channel} (best matches first):\n"
+        return header + pubsub.format_search_results(results, include_channel=False)
 
     @tool 
     def view_channel(channel: str):
@@ -11,6 +11,8 @@ import re # For safe math evaluation
 
 from langchain_core.tools import tool
 
+from leah.utils.LineIndex import LineIndex
+
 @tool
 def get_current_datetime():
     """Returns the current date and time."""
@@ -78,9 +80,7 @@ def file_line_count(file_path: str) -> int:
         The total number of lines in the file, or an error message string.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        return len(lines)
+        return LineIndex.for_file(file_path).line_count
     except FileNotFoundError:
         return f"Error: File not found at {file_path}"
     except Exception as e:
@@ -7,6 +7,7 @@ from typing import Any, Dict, List
 import requests
 from leah.actions.IActions import IAction
 from leah.utils.GlobalFileManager import GlobalFileManager
+from leah.utils.LineIndex import LineIndex
 from langchain_core.tools import tool
 from leah.config.LocalConfigManager import LocalConfigManager
 
@@ -93,8 +94,6 @@ def search_files(search_terms: List[str], path: str, case_sensitive: bool):
         return "At least one search term is required"
     if not path:
         return "Path is required"
-    if not case_sensitive:
-        return "Case sensitive is required"
     
     search_terms = [term.strip() for term in search_terms if term.strip()]
 
@@ -102,7 +101,7 @@ def search_files(search_terms: List[str], path: str, case_sensitive: bool):
         return "At least one valid search term is required"
     
     try:
-        matches = GlobalFileManager().search_files(search_terms, path, case_sensitive)
+        matches = get_file_manager().search_files(search_terms, path, case_sensitive)
         if matches:
             return f"Found {len(matches)} matching files/directories:\n" + "\n".join(matches)
         else:
@@ -111,16 +110,24 @@ def search_files(search_terms: List[str], path: str, case_sensitive: bool):
         return f"Error searching files: {str(e)}"
 
 @tool
-def search_files_containing(search_term: List[str], path: str, case_sensitive: bool):
+def search_files_containing(search_term: List[str], path: str, case_sensitive: bool, regex: bool = False):
     """
-    Search for files containing the specified search term in their content (similar to grep).
+    Search for files containing any of the specified search terms in their content (similar to grep).
+    Set regex to true to search for regular expressions. At most 200 matching lines are returned.
     """
 
     if not search_term:
         return "Search term is required"
+    if isinstance(search_term, str):
+        search_term = [search_term]
 
     try:
-        matches = GlobalFileManager().content_search(search_term, path, case_sensitive)
+        file_manager = get_file_manager()
+        matches = []
+        for term in search_term:
+            matches.extend(file_manager.content_search(term, path, case_sensitive, regex, max_results=200 - len(matches)))
+            if len(matches) >= 200:
+                break
         if matches:
             return f"Found matches in files:\n" + "\n".join(matches)
         else:
@@ -242,11 +249,12 @@ def search_file_lines(file_path: str, search_term: str):
     Search for a term in a file. Will show the line number and the line.
     """
     file_manager = get_file_manager()
-    lines = file_manager.get_file_lines(file_path)
+    index = LineIndex.for_file(file_path)
+    width = len(str(index.line_count))
     matches = []
-    for line in lines:  
+    for line_number, line in index.iter_lines():
         if search_term in line:
-            matches.append(line)
+            matches.append(str(line_number).rjust(width) + ": " + line)
     if matches:
         return "Search term found on the following lines:\n" + "\n".join(matches)
     else:
@@ -332,13 +340,9 @@ def read_file_partial(file_path: str, offset: int, length: int):
     max_read_size = 8192
     read_length = min(length, max_read_size)
     try:
-        content = file_manager.get_file(file_path)
-        if content is None:
+        partial_content = file_manager.get_file_chars(file_path, offset, read_length)
+        if partial_content is None:
             return f"File {file_path} not found"
-        if not isinstance(content, str):
-            content = content.decode('utf-8')
-        end = offset + read_length
-        partial_content = content[offset:end]
         actual_read = len(partial_content)
         header = f"Read {actual_read} characters from offset {offset}:"
         return f"{header}\n{partial_content}"
@@ -9,6 +9,11 @@ def getLlmConnector():
     config_manager = LocalConfigManager("default")
     return LlmConnector(config_manager, "gemini")
 
+def getUtilityLlmConnector():
+    # The utility persona runs at temperature 0, so repeated requests are served from the PromptCache
+    config_manager = LocalConfigManager("default")
+    return LlmConnector(config_manager, "utility")
+
 
 @tool
 def generate_creative_text(prompt: str) -> str:
@@ -64,7 +69,7 @@ def analyze_sentiment(text: str) -> str:
         The sentiment of the text.
     '''
     try:
-        llm = getLlmConnector()
+        llm = getUtilityLlmConnector()
         prompt = f"Please analyze the sentiment of the following text and return one of: Positive, Negative, or Neutral.\n\nText: {text}"
         sentiment = llm.query(prompt)
         # Basic validation to ensure the LLM returns one of the expected sentiments.
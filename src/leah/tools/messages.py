@@ -4,7 +4,6 @@ from leah.actions.IActions import IAction
 from leah.utils.Message import MessageType
 from leah.utils.SubscriptionService import SubscriptionService
 from leah.utils.PubSub import Message, PubSub
-from leah.utils.TokenCounter import TokenCounter
 import leah.utils.ChannelNameGuide as CNG
 import time
 from datetime import datetime
@@ -111,54 +110,27 @@ def getTools(persona: str, channel_id: str):
             return f"I have sent a message to {channel} saying {message}. "
 
     @tool
-    def search_messages(terms: List[str], channel: str = "@" + persona):
+    def search_messages(terms: List[str], channel: str = "", days: int = 0):
         """
-        Search for messages in a channel.
+        Search for messages by their content, best matches first.
+        Searches every channel you are subscribed to unless a channel is given.
+        Use "quoted phrases" for exact wording, and days to only search recent messages.
         """
-        terms = [term.strip().lower() for term in terms]
+        terms = [term.strip() for term in terms]
         
         if not terms or terms == [""]:
             return "Please provide search terms as a comma-separated list"
-            
-        messages = pubsub.get_channel_messages(channel)
-        found_messages = []
-        
-        for message in messages:
-            content = message.content.lower()
-            if any(term in content for term in terms):
-                found_messages.append(message)
+
+        if channel:
+            channels = [channel]
+        else:
+            channels = ["@" + persona] + sorted(SubscriptionService().get_user_subscriptions("@" + persona))
+        since = time.time() - int(days) * 86400 if days and int(days) > 0 else None
+        results = pubsub.search_messages(channels, " ".join(terms), since=since)
         
-        if not found_messages:
+        if not results:
             return f"No messages found containing the terms: {', '.join(terms)}"
 
-        # Sort messages by timestamp in descending order (most recent first)
-        found_messages.sort(key=lambda x: float(x.sent_at) if x.sent_at else 0, reverse=True)
-        
-        # Initialize TokenCounter with a reasonable limit (4000 tokens)
-        token_counter = TokenCounter(4000)
-        
-        # Process messages and add to token counter
-        for msg in found_messages:
-            try:
-                date_obj = datetime.fromtimestamp(float(msg.sent_at))
-                formatted_date = date_obj.strftime("%B %d, %Y at %I:%M:%S %p")
-            except (ValueError, TypeError):
-                formatted_date = str(msg.sent_at)
-                
-            message_block = (
-                f"From: {msg.from_user}\n"
-                f"Time: {formatted_date}\n"
-                f"Channel: {msg.via_channel}\n"
-                f"Message: {msg.content}\n"
-                f"---\n"
-            )
-            token_counter.feed(message_block)
-            
-        # Get the chunks that fit within the token limit
-        result_chunks = token_counter.tail()
-        
-        token_counter.feed(f"I found {len(found_messages)} matching messages (showing {len(result_chunks)} most recent):\n")
-            
-        return "".join(token_counter.tail())
+        return f"I found {len(results)} matching messages (best matches first):\n" + pubsub.format_search_results(results)
 
     return [check_messages, send_direct_message, send_message, search_messages]
\ No newline at end of file
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List
 from leah.config.LocalConfigManager import LocalConfigManager
 from langchain_core.tools import tool
@@ -38,22 +39,37 @@ def list_notes():
 @tool
 def search_notes(terms: List[str]):
     """
-    Search for notes in the notes manager.
+    Search the names and contents of the notes, returning the best matches with a snippet of each.
     """
     if not terms:
         return
     
     config_manager = LocalConfigManager("default")
     notes_manager = config_manager.get_notes_manager()
-    all_notes = notes_manager.get_all_notes()
+    hits = notes_manager.search_notes(" ".join(terms))
     
-    matching_notes = []
-    for note in all_notes:
-        if any(term.lower() in note.lower() for term in terms):
-            matching_notes.append(note)
-    
-    if not matching_notes:
+    if not hits:
         return "No notes found matching the search terms: " + str(terms)
     else:
-        return "Found the following matching notes: " + ", ".join(matching_notes)
+        return "Found the following matching notes:\n" + "\n".join(f"{hit.doc_id}: {hit.snippet}" for hit in hits)
 
+@tool
+def get_note_history(note_name: str, version: int = 0):
+    """
+    List the saved versions of a note, or get the content of one version when a version number is given.
+    """
+    if not note_name:
+        return
+    config_manager = LocalConfigManager("default")
+    notes_manager = config_manager.get_notes_manager()
+    if version:
+        content = notes_manager.get_note_version(note_name, version)
+        if content is None:
+            return f"Version {version} of the note {note_name} was not found"
+        return content
+    history = notes_manager.get_note_history(note_name)
+    if not history:
+        return "No saved versions found for the note " + note_name
+    return "Saved versions of the note " + note_name + ":\n" + "\n".join(
+        f"version {entry['version']}: {datetime.fromtimestamp(entry['timestamp']).strftime('%Y-%m-%d %H:%M:%S')}, {entry['size']} characters"
+        for entry in history)
@@ -1,38 +1,114 @@
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_core.vectorstores import InMemoryVectorStore
-from typing import List
+import os
+import re
+from langchain_core.documents import Document
+from typing import Iterable, List, Optional, Sequence
 from leah.config.GlobalConfig import GlobalConfig as GCM
+from leah.utils.EmbeddingPipeline import EmbeddingPipeline, GeminiEmbedder, create_embedder
+from leah.utils.VectorIndex import VectorIndex
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+def collect_files(roots: Iterable[str], extensions: Sequence[str] = (".txt", ".md")) -> List[str]:
+    """
+    List the text files under each root, e.g. a user's notes directory or a files sandbox.
+    """
+    files = []
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.') and d != "backup"]
+            files.extend(os.path.join(dirpath, name) for name in filenames if name.endswith(tuple(extensions)))
+    return files
+
 class NotesRag:
-    def __init__(self, files: List[str], model: str = "models/gemini-embedding-exp-03-07", task_type: str = "RETRIEVAL_DOCUMENT", chunk_size: int = 1000, chunk_overlap: int = 200):
+    """
+    Similarity search over a set of files, backed by a persistent VectorIndex.
+
+    The index lives under ~/.leah/vector_index/<embedder> and is shared between
+    instances, so constructing a NotesRag only embeds chunks of files that changed since
+    they were last indexed. Searches only return chunks of the files and texts given to
+    this instance. Chunks are embedded through an EmbeddingPipeline, and each
+    group of files is committed as soon as it is embedded, so an interrupted indexing
+    run picks up where it stopped.
+    """
+
+    def __init__(self, files: List[str], model: str = None, task_type: str = "RETRIEVAL_DOCUMENT", chunk_size: int = 1000, chunk_overlap: int = 200, index_dir: Optional[str] = None, embedder=None):
         self.config = GCM()
-        api_key = self.config.get_gemini_api_key()
-        self.embeddings = GoogleGenerativeAIEmbeddings(model=model, task_type=task_type, google_api_key=api_key)
+        if embedder is None:
+            # An explicit model keeps the previous Gemini behaviour, otherwise use the configured backend
+            embedder = GeminiEmbedder(model=model, task_type=task_type) if model else create_embedder()
+        self.embedder = embedder
+        self.pipeline = EmbeddingPipeline.from_config(embedder)
         self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        texts = self._load_and_split_files(files)
-        self.vector_store = InMemoryVectorStore.from_texts(texts, embedding=self.embeddings)
+        if index_dir is None:
+            index_dir = os.path.join(self.config.get_home_config_directory(), "vector_index", re.sub(r'[^A-Za-z0-9_.-]', '_', embedder.name))
+        dim = VectorIndex.stored_dim(index_dir) or embedder.dim
+        self.index = VectorIndex(index_dir, dim)
+        self.paths = set()
+        self.update_files(files)
+
+    def update_files(self, files: List[str]) -> int:
+        """
+        Bring the index up to date with files, embedding only chunks that are new.
 
-    def _load_and_split_files(self, files: List[str]) -> List[str]:
-        all_chunks = []
+        Returns:
+            int: The number of chunks that were embedded
+        """
+        pending = []
         for file_path in files:
+            try:
+                mtime = os.path.getmtime(file_path)
+            except FileNotFoundError:
+                self.index.remove_file(file_path)
+                self.paths.discard(file_path)
+                continue
+            self.paths.add(file_path)
+            if self.index.needs_update(file_path, mtime):
+                pending.append((file_path, mtime))
+
+        embedded = 0
+        group, group_chunks = [], 0
+        group_limit = self.pipeline.batch_size * self.pipeline.concurrency
+        for position, (file_path, mtime) in enumerate(pending, 1):
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     content = f.read()
                 # Split content into chunks
                 chunks = self.text_splitter.split_text(content)
-                all_chunks.extend(chunks)
             except Exception as e:
                 print(f"Error reading or splitting {file_path}: {e}")
-        return all_chunks
+                continue
+            group.append((file_path, mtime, chunks))
+            group_chunks += len(chunks)
+            if group_chunks >= group_limit or position == len(pending):
+                embedded += self._index_group(group)
+                print(f"Indexed {position}/{len(pending)} changed files")
+                group, group_chunks = [], 0
+        if group:
+            embedded += self._index_group(group)
+        return embedded
+
+    def _index_group(self, group) -> int:
+        """Embed the new chunks of a group of files in one pipeline run, then commit each file."""
+        texts = {}
+        for _, _, chunks in group:
+            for chunk in chunks:
+                texts.setdefault(VectorIndex.chunk_hash(chunk), chunk)
+        # Copy the known vectors now: committing one file of the group can drop a chunk that
+        # moved to another file of the group, and with it the only indexed copy of its vector
+        vectors = self.index.known_vectors(list(texts))
+        missing = [chunk_hash for chunk_hash in texts if chunk_hash not in vectors]
+        vectors.update(zip(missing, self.pipeline.embed([texts[chunk_hash] for chunk_hash in missing])))
+        lookup = lambda chunk_texts: [vectors[VectorIndex.chunk_hash(text)] for text in chunk_texts]
+        for file_path, mtime, chunks in group:
+            self.index.update_file(file_path, mtime, chunks, lookup)
+        return len(missing)
 
     def add_documents(self, texts: List[str]):
-        # Add new documents to the vector store
-        new_store = InMemoryVectorStore.from_texts(texts, embedding=self.embeddings)
-        self.vector_store._vectors.extend(new_store._vectors)
-        self.vector_store._documents.extend(new_store._documents)
+        # Index free-standing texts under a path derived from their content
+        group = [(f"text:{VectorIndex.chunk_hash(text)}", 0, self.text_splitter.split_text(text)) for text in texts]
+        self.paths.update(path for path, _, _ in group)
+        self._index_group(group)
 
-    def similarity_search(self, query: str, k: int = 3):
+    def similarity_search(self, query: str, k: int = 3) -> List[Document]:
         # Return the top-k most similar documents to the query
-        retriever = self.vector_store.as_retriever(search_kwargs={"k": k})
-        return retriever.invoke(query)
+        results = self.index.search(self.pipeline.embed_query(query), k, paths=self.paths)
+        return [Document(page_content=text, metadata={"source": path, "score": score}) for score, path, text in results]
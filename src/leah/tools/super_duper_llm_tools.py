@@ -4,10 +4,12 @@ import os
 from langchain_core.tools import tool
 from leah.config.LocalConfigManager import LocalConfigManager
 from leah.llm.LlmConnector import LlmConnector # Keep this for getLlmConnector
+from leah.utils.SingleFlight import single_flight
 
 def getLlmConnector():
+    # The utility persona runs at temperature 0, so repeated requests are served from the PromptCache
     config_manager = LocalConfigManager("default")
-    return LlmConnector(config_manager, "gemini")
+    return LlmConnector(config_manager, "utility")
 
 
 SUMMARIZE_TEXT_CONTEXT_TEMPLATE = """
@@ -26,6 +28,7 @@ Translated Text ({target_language}):
 """
 
 @tool
+@single_flight("summarize_text")
 def summarize_text(text_to_summarize: str) -> str:
     '''Summarizes the provided text using an LLM.
 
@@ -44,6 +47,7 @@ def summarize_text(text_to_summarize: str) -> str:
         return f"Error during summarization: {str(e)}"
 
 @tool
+@single_flight("extract_keywords")
 def extract_keywords(text_to_extract_from: str) -> str:
     '''Extracts keywords from the provided text using an LLM.
 
@@ -62,6 +66,7 @@ def extract_keywords(text_to_extract_from: str) -> str:
         return f"Error during keyword extraction: {str(e)}"
 
 @tool
+@single_flight("translate_text")
 def translate_text(text_to_translate: str, target_language: str) -> str:
     '''Translates the provided text to the target language using an LLM.
 
@@ -1,7 +1,7 @@
 from leah.tools.math import add, subtract, multiply, divide
 from leah.tools.linktools import fetch_stock_info, fetch_link_with_selenium
 from leah.tools.tavily import web_search
-from leah.tools.notes import put_note, get_note, list_notes, search_notes
+from leah.tools.notes import put_note, get_note, list_notes, search_notes, get_note_history
 from leah.tools.files import get_absolute_path_of_file, read_file, list_files, move_file, delete_file, download_file, read_file_partial, create_file, edit_file, insert_file_lines, delete_file_lines, read_file_lines, replace_file_lines, copy_file, append_file_lines, search_file_lines   
 from leah.tools.process import run_command, run_script, run_python_script, run_bash_script, run_powershell_script, run_background_script
 from leah.tools.task import getTools as getTaskTools
@@ -34,6 +34,7 @@ def getTools(persona: str, channel_id: str):
         get_note,
         list_notes,
         search_notes,
+        get_note_history,
         get_absolute_path_of_file,
         edit_file,
         copy_file,
@@ -1,9 +1,11 @@
 from langchain_core.tools import tool
+from leah.utils.SingleFlight import single_flight
 
 import requests
 import json
 
 @tool
+@single_flight("fetch_weather_info")
 def fetch_weather_info(latitude: float, longitude: float) -> dict:
     """
     Fetches current weather and daily forecast information for a given latitude and longitude using the NOAA NWS API.
@@ -0,0 +1,189 @@
+import atexit
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.remote.webdriver import WebDriver
+from webdriver_manager.chrome import ChromeDriverManager
+
+from leah.config.GlobalConfig import GlobalConfig
+
+
+class BrowserSession:
+    """A headless Chrome driver owned by the pool and the number of pages it has loaded."""
+
+    def __init__(self, driver: WebDriver):
+        self.driver = driver
+        self.uses = 0
+
+    def is_alive(self) -> bool:
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"Error closing browser session: {e}")
+
+
+class BrowserPool:
+    """
+    A pool of warm headless Chrome sessions shared by every page fetch.
+
+    Callers lease a driver with `with BrowserPool.get_instance().lease() as driver:`.
+    At most `size` drivers exist at once; a lease waits up to `lease_timeout` seconds
+    for one to be returned. Sessions are recycled after `max_uses` page loads, or as
+    soon as a lease ends with a WebDriverException or the browser stops responding.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+    _driver_path = None
+    _driver_path_lock = threading.Lock()
+
+    def __init__(self, size: int = 2, max_uses: int = 50, lease_timeout: float = 60, page_load_timeout: float = 30):
+        """
+        Initialize the pool.
+
+        Args:
+            size (int): Maximum number of browser sessions
+            max_uses (int): Number of leases after which a session is replaced
+            lease_timeout (float): Seconds to wait for a free session before giving up
+            page_load_timeout (float): Seconds a page may take to load
+        """
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.lease_timeout = lease_timeout
+        self.page_load_timeout = page_load_timeout
+        self._idle: List[BrowserSession] = []
+        self._lock = threading.Lock()
+        self._available = threading.BoundedSemaphore(self.size)
+        self._closed = False
+
+    @classmethod
+    def get_instance(cls) -> 'BrowserPool':
+        """
+        Get the shared pool, configured from the browser_pool section of config.json.
+
+        Returns:
+            BrowserPool: The singleton instance
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    config = GlobalConfig().get_browser_pool_config()
+                    cls._instance = BrowserPool(
+                        size=config.get('size', 2),
+                        max_uses=config.get('max_uses', 50),
+                        lease_timeout=config.get('lease_timeout', 60),
+                        page_load_timeout=config.get('page_load_timeout', 30))
+                    atexit.register(cls._instance.shutdown)
+                    if config.get('warm_on_start', False):
+                        threading.Thread(target=cls._instance._warm_in_background, daemon=True).start()
+        return cls._instance
+
+    @classmethod
+    def get_driver_path(cls) -> str:
+        """Resolve the chromedriver binary once per process instead of on every fetch."""
+        if cls._driver_path is None:
+            with cls._driver_path_lock:
+                if cls._driver_path is None:
+                    cls._driver_path = ChromeDriverManager().install()
+        return cls._driver_path
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[WebDriver]:
+        """
+        Borrow a driver for the duration of a with block.
+
+        Args:
+            timeout (float): Seconds to wait for a free session, defaults to lease_timeout
+
+        Raises:
+            TimeoutError: If every session stays busy for the whole timeout
+        """
+        timeout = self.lease_timeout if timeout is None else timeout
+        if not self._available.acquire(timeout=timeout):
+            raise TimeoutError(f"No browser session became available within {timeout} seconds")
+        session = None
+        healthy = True
+        try:
+            session = self._checkout()
+            yield session.driver
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            if session is not None:
+                self._checkin(session, healthy)
+            self._available.release()
+
+    def warm(self, count: Optional[int] = None) -> None:
+        """Start sessions ahead of time so the first fetches do not pay for browser startup."""
+        count = self.size if count is None else min(count, self.size)
+        permits = 0
+        while permits < count and self._available.acquire(blocking=False):
+            permits += 1
+        sessions = []
+        try:
+            for _ in range(permits):
+                sessions.append(self._checkout())
+        finally:
+            for session in sessions:
+                session.uses -= 1  # Warming up is not a page load
+                self._checkin(session, True)
+            for _ in range(permits):
+                self._available.release()
+
+    def _warm_in_background(self) -> None:
+        try:
+            self.warm()
+        except Exception as e:
+            print(f"Error warming browser pool: {e}")
+
+    def shutdown(self) -> None:
+        """Quit every idle session. Leased sessions are quit when they are returned."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for session in idle:
+            session.quit()
+
+    def _checkout(self) -> BrowserSession:
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                return self._create_session()
+            if session.is_alive():
+                return session
+            print("Discarding unresponsive browser session")
+            session.quit()
+
+    def _checkin(self, session: BrowserSession, healthy: bool) -> None:
+        session.uses += 1
+        if healthy and session.uses < self.max_uses:
+            with self._lock:
+                if not self._closed:
+                    self._idle.append(session)
+                    return
+        session.quit()
+
+    def _create_session(self) -> BrowserSession:
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')  # Run headless Chrome
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--lang=en-US')
+        chrome_options.add_argument('--accept-charset=utf-8')
+        driver = webdriver.Chrome(service=Service(self.get_driver_path()), options=chrome_options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        return BrowserSession(driver)
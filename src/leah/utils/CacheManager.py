@@ -1,173 +1,302 @@
 import os
-import json
 import pickle
-from typing import Any, Optional, Union, Dict
-import hashlib
+import sqlite3
+import threading
 import time
-from leah.config.LocalConfigManager import LocalConfigManager
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from leah.config.LocalConfigManager import LocalConfigManager
+
+_MISSING = object()
+
+
+class CacheStore:
+    """
+    The shared storage behind every CacheManager that points at the same cache directory.
+
+    Entries live in a single SQLite database (WAL mode, so readers are not blocked by a
+    writer and every write is an atomic transaction). A thread-safe in-memory LRU sits
+    in front of it so hot keys are served without touching the disk. Both tiers expire
+    entries by TTL and evict the least recently used entries once their budgets are
+    exceeded.
+    """
+
+    def __init__(self, cache_dir: str, max_memory_entries: int = 1024, max_memory_bytes: int = 32 * 1024 * 1024,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        """
+        Open (or create) the cache database in cache_dir.
+
+        Args:
+            cache_dir: Directory holding the cache database.
+            max_memory_entries: Maximum number of entries kept in memory.
+            max_memory_bytes: Maximum pickled size of the entries kept in memory.
+            max_disk_bytes: Maximum pickled size of the entries kept in the database.
+        """
+        self.cache_dir = cache_dir
+        self.db_path = os.path.join(cache_dir, "cache.db")
+        self.max_memory_entries = max_memory_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._remove_legacy_files()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)")
+        self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _remove_legacy_files(self) -> None:
+        """Remove the per-key pickle files and manifest written by earlier versions of the cache."""
+        manifest_path = os.path.join(self.cache_dir, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.cache') or filename == "manifest.json":
+                try:
+                    os.remove(os.path.join(self.cache_dir, filename))
+                except OSError:
+                    pass
+
+    def get(self, key: str) -> Any:
+        """Return the value for key, or _MISSING if it is absent or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, size, expires_at = entry
+                if now <= expires_at:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                self._delete(key)
+                self._stats["misses"] += 1
+                return _MISSING
+
+            row = self._conn.execute("SELECT value, size, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return _MISSING
+            blob, size, expires_at = row
+            if now > expires_at:
+                self._delete(key)
+                self._stats["misses"] += 1
+                return _MISSING
+            try:
+                value = pickle.loads(blob)
+            except (pickle.PickleError, EOFError, AttributeError, ImportError):
+                self._delete(key)
+                self._stats["misses"] += 1
+                return _MISSING
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._remember(key, value, size, expires_at)
+            self._stats["disk_hits"] += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), expires_at, now))
+            self._disk_bytes += len(blob) - (old[0] if old else 0)
+            self._forget(key)
+            self._remember(key, value, len(blob), expires_at)
+            self._stats["sets"] += 1
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk_bytes = 0
+
+    def delete_expired(self) -> None:
+        now = time.time()
+        with self._lock:
+            for key in [key for key, (_, _, expires_at) in self._memory.items() if now > expires_at]:
+                self._forget(key)
+            self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+            self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+            })
+            return stats
+
+    def _delete(self, key: str) -> bool:
+        self._forget(key)
+        row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False
+        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._disk_bytes -= row[0]
+        return True
+
+    def _remember(self, key: str, value: Any, size: int, expires_at: float) -> None:
+        if size > self.max_memory_bytes:
+            return
+        self._memory[key] = (value, size, expires_at)
+        self._memory_bytes += size
+        while len(self._memory) > self.max_memory_entries or self._memory_bytes > self.max_memory_bytes:
+            _, (_, evicted_size, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    def _forget(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[1]
+
+    def _evict_disk(self) -> None:
+        """Drop expired entries, then the least recently used ones until 90% of the budget is free."""
+        now = time.time()
+        target = self.max_disk_bytes * 0.9
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            evicted = []
+            if total > target:
+                for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+                    if total <= target:
+                        break
+                    evicted.append(key)
+                    total -= size
+                self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in evicted])
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        for key in evicted:
+            self._forget(key)
+        self._stats["evictions"] += len(evicted)
+        self._disk_bytes = total
+
 
 class CacheManager:
     """
     A class to manage a cache directory with get and set methods.
+
+    All CacheManager instances for the same cache directory share one CacheStore, so
+    creating a CacheManager per call is cheap and sees the same in-memory entries.
+    Values returned from the in-memory tier are shared objects and should not be mutated
+    in place; store a new value with set instead.
     """
-    
-    def __init__(self, config_manager: Optional[LocalConfigManager] = None, default_expiration: int = 600):
+
+    _stores: Dict[str, CacheStore] = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, config_manager: Optional['LocalConfigManager'] = None, default_expiration: int = 600):
         """
         Initialize the cache manager with the specified LocalConfigManager.
-        
+
         Args:
             config_manager: The LocalConfigManager instance to use for path management.
                            If None, a new instance will be created with "default" as the user ID.
             default_expiration: Default expiration time in seconds (default: 600 seconds / 10 minutes)
         """
         if config_manager is None:
+            # Imported here because the config package imports the actions that use this cache
+            from leah.config.LocalConfigManager import LocalConfigManager
             config_manager = LocalConfigManager("default")
-            
+
         self.config_manager = config_manager
         self.cache_dir = self.config_manager.get_path("cache")
         self.default_expiration = default_expiration
-        self.manifest_path = os.path.join(self.cache_dir, "manifest.json")
-        self._ensure_cache_dir_exists()
-        self._load_manifest()
-    
-    def _ensure_cache_dir_exists(self) -> None:
-        """Ensure the cache directory exists, creating it if necessary."""
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir, exist_ok=True)
-    
-    def _load_manifest(self) -> None:
-        """Load the cache manifest from disk or create a new one if it doesn't exist."""
-        if os.path.exists(self.manifest_path):
-            try:
-                with open(self.manifest_path, 'r') as f:
-                    self.manifest = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                self.manifest = {}
-        else:
-            self.manifest = {}
-    
-    def _save_manifest(self) -> None:
-        """Save the cache manifest to disk."""
-        try:
-            with open(self.manifest_path, 'w') as f:
-                json.dump(self.manifest, f)
-        except IOError as e:
-            print(f"Error saving manifest: {e}")
-    
-    def _get_cache_path(self, key: str) -> str:
-        """
-        Get the path to the cache file for the given key.
-        
-        Args:
-            key: The cache key.
-            
-        Returns:
-            The path to the cache file.
-        """
-        # Hash the key to create a safe filename
-        safe_key = hashlib.md5(key.encode()).hexdigest()
-        return os.path.join(self.cache_dir, f"{safe_key}.cache")
-    
+        self.store = self._get_store(self.cache_dir)
+
+    def _get_store(self, cache_dir: str) -> CacheStore:
+        """Return the store shared by every cache manager for cache_dir, opening it on first use."""
+        cache_dir = os.path.abspath(cache_dir)
+        with CacheManager._stores_lock:
+            store = CacheManager._stores.get(cache_dir)
+            if store is None:
+                cache_config = self.config_manager.get_config().get_cache_config()
+                store = CacheStore(
+                    cache_dir,
+                    max_memory_entries=cache_config.get('max_memory_entries', 1024),
+                    max_memory_bytes=cache_config.get('max_memory_bytes', 32 * 1024 * 1024),
+                    max_disk_bytes=cache_config.get('max_disk_bytes', 256 * 1024 * 1024))
+                CacheManager._stores[cache_dir] = store
+            return store
+
     def get(self, key: str, default: Any = None) -> Any:
         """
         Get data from the cache.
-        
+
         Args:
             key: The cache key.
             default: The default value to return if the key is not found.
-            
+
         Returns:
             The cached data or the default value if not found.
         """
-        cache_path = self._get_cache_path(key)
-        
-        # Check if the key exists in the manifest and is not expired
-        if key in self.manifest:
-            expiration_time = self.manifest[key].get('expiration_time', 0)
-            if time.time() > expiration_time:
-                # Cache item has expired, delete it
-                self.delete(key)
-                return default
-        
-        if not os.path.exists(cache_path):
-            return default
-        
-        try:
-            with open(cache_path, 'rb') as f:
-                return pickle.load(f)
-        except (pickle.PickleError, EOFError, FileNotFoundError):
-            # If there's an error reading the cache, return the default
-            return default
-    
+        value = self.store.get(key)
+        return default if value is _MISSING else value
+
     def set(self, key: str, data: Any, expiration: Optional[int] = None) -> None:
         """
         Store data in the cache.
-        
+
         Args:
             key: The cache key.
             data: The data to store.
             expiration: Optional expiration time in seconds. If None, uses default_expiration.
         """
-        cache_path = self._get_cache_path(key)
-        
         try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(data, f)
-            
-            # Update manifest with expiration time
-            expiration_time = time.time() + (expiration if expiration is not None else self.default_expiration)
-            self.manifest[key] = {
-                'expiration_time': expiration_time,
-                'cache_path': cache_path
-            }
-            self._save_manifest()
-        except (pickle.PickleError, IOError) as e:
+            self.store.set(key, data, expiration if expiration is not None else self.default_expiration)
+        except (pickle.PickleError, TypeError, AttributeError, sqlite3.Error) as e:
             print(f"Error writing to cache: {e}")
-    
+
     def delete(self, key: str) -> bool:
         """
         Delete a cache entry.
-        
+
         Args:
             key: The cache key.
-            
+
         Returns:
             True if the key was deleted, False otherwise.
         """
-        cache_path = self._get_cache_path(key)
-        
-        if os.path.exists(cache_path):
-            try:
-                os.remove(cache_path)
-                if key in self.manifest:
-                    del self.manifest[key]
-                    self._save_manifest()
-                return True
-            except OSError:
-                return False
-        
-        return False
-    
+        return self.store.delete(key)
+
     def clear(self) -> None:
         """Clear all cache entries."""
-        for filename in os.listdir(self.cache_dir):
-            if filename.endswith('.cache'):
-                try:
-                    os.remove(os.path.join(self.cache_dir, filename))
-                except OSError:
-                    pass
-        
-        # Clear the manifest
-        self.manifest = {}
-        self._save_manifest()
-    
+        self.store.clear()
+
     def delete_expired(self) -> None:
         """Delete all expired cache entries."""
-        current_time = time.time()
-        expired_keys = [
-            key for key, info in self.manifest.items()
-            if current_time > info.get('expiration_time', 0)
-        ]
-        
-        for key in expired_keys:
-            self.delete(key) 
\ No newline at end of file
+        self.store.delete_expired()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get hit, miss and size statistics for the cache.
+
+        Returns:
+            A dictionary with hit and miss counters and the current memory and disk usage.
+        """
+        return self.store.stats()
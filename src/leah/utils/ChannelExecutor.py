@@ -0,0 +1,86 @@
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict
+
+
+class ChannelExecutor:
+    """
+    Runs work items on a bounded thread pool, in order within each channel.
+
+    Every channel has its own queue, and at most one item of a channel runs at a time,
+    so messages of a channel are handled in the order they arrived while different
+    channels run in parallel on up to max_workers threads. A pool task handles one item
+    and then requeues its channel behind the other waiting channels, so a channel with
+    a long backlog does not hold on to a worker.
+    """
+
+    def __init__(self, handler: Callable[[Any], None], max_workers: int = 2, name: str = "ChannelExecutor"):
+        """
+        Initialize the executor.
+
+        Args:
+            handler (Callable[[Any], None]): Called with each submitted item on a pool thread
+            max_workers (int): Number of channels that are handled at the same time
+            name (str): Prefix of the pool thread names
+        """
+        self.handler = handler
+        self.max_workers = max(1, max_workers)
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[Any]] = {}
+        self._running = set()
+        self._processed = 0
+        self._failed = 0
+        self._max_depth = 0
+
+    def submit(self, channel: str, item: Any) -> None:
+        """Queue an item, it runs after the items submitted earlier for the same channel."""
+        with self._lock:
+            queue = self._queues.setdefault(channel, deque())
+            queue.append(item)
+            self._max_depth = max(self._max_depth, len(queue))
+            if channel in self._running:
+                return
+            self._running.add(channel)
+        self._executor.submit(self._run_next, channel)
+
+    def idle(self) -> bool:
+        """Whether no item is running or waiting."""
+        with self._lock:
+            return not self._running
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the queue depth of each channel and the totals of the executor."""
+        with self._lock:
+            depths = {channel: len(queue) for channel, queue in self._queues.items()}
+            return {
+                "max_workers": self.max_workers,
+                "active_channels": len(self._running),
+                "queued": sum(depths.values()),
+                "max_queue_depth": self._max_depth,
+                "processed": self._processed,
+                "failed": self._failed,
+                "channels": depths,
+            }
+
+    def _run_next(self, channel: str) -> None:
+        with self._lock:
+            item = self._queues[channel].popleft()
+        failed = False
+        try:
+            self.handler(item)
+        except Exception as e:
+            failed = True
+            print(f"Error handling item of {channel} in {self.name}: {e}")
+            traceback.print_exc()
+        with self._lock:
+            self._processed += 1
+            self._failed += failed
+            if not self._queues[channel]:
+                del self._queues[channel]
+                self._running.discard(channel)
+                return
+        self._executor.submit(self._run_next, channel)
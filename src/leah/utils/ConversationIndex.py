@@ -0,0 +1,186 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from leah.utils.InvertedIndex import InvertedIndex, SearchHit, tokenize
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each even few for from further get got had has have having
+he her here hers herself him himself his how however i if in into is it its itself just know let like make many
+me might more most much must my myself need no nor not now of off on once one only or other our ours ourselves
+out over own really said same say see she should so some still such sure than that the their theirs them
+themselves then there these they thing things think this those through to too under until up us use used very
+want was way we well were what when where which while who whom why will with would yes yet you your yours
+yourself yourselves assistant user
+""".split())
+
+ENTRY_PATTERN = re.compile(r'^\[([0-9_-]+)\] \[(USER|ASSISTANT)\] (.*)$')
+
+
+def normalize_term(term: str) -> str:
+    """Normalize an index term like term log files were named, keeping non-ASCII letters."""
+    term = re.sub(r'\W', '_', term.strip().lower())
+    return re.sub(r'_+', '_', term).strip('_')
+
+
+class ConversationIndex:
+    """
+    Keyword index over the user/assistant exchanges of a persona.
+
+    Each exchange is stored once in an InvertedIndex, keyed by a hash of its text, so
+    indexing the same exchange again only adds terms. Keywords are picked locally with
+    TF-IDF: term frequencies in the exchange weighted by the inverse document frequency
+    of the term across all exchanges indexed so far, without stopwords. The keyword
+    postings (term to exchange, with its weight) live in the same database, and search
+    looks terms up there first, falling back to BM25 over the full text.
+
+    Use ConversationIndex.open(path) to share one index per database file within a process.
+    """
+
+    _indexes: Dict[str, 'ConversationIndex'] = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.index = InvertedIndex.open(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS keywords (term TEXT NOT NULL, doc_id TEXT NOT NULL, weight REAL NOT NULL, "
+            "PRIMARY KEY (term, doc_id)) WITHOUT ROWID")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS keywords_doc ON keywords (doc_id)")
+
+    @classmethod
+    def open(cls, db_path: str) -> 'ConversationIndex':
+        """Return the shared index for db_path, opening it on first use."""
+        db_path = os.path.abspath(db_path)
+        with cls._indexes_lock:
+            index = cls._indexes.get(db_path)
+            if index is None:
+                index = cls(db_path)
+                cls._indexes[db_path] = index
+            return index
+
+    def extract_keywords(self, text: str, count: int = 5) -> List[Tuple[str, float]]:
+        """
+        Pick the count terms of text with the highest TF-IDF weight.
+
+        Returns:
+            List[Tuple[str, float]]: (term, weight) pairs by descending weight
+        """
+        frequencies = Counter(token for token in tokenize(text)
+                              if len(token) > 2 and token not in STOPWORDS and not token.isdigit())
+        if not frequencies:
+            return []
+        terms = list(frequencies)
+        document_frequencies = self.index.document_frequencies(terms)
+        tf = np.array([frequencies[term] for term in terms], dtype=np.float64)
+        df = np.array([document_frequencies[term] for term in terms], dtype=np.float64)
+        weights = (tf / tf.sum()) * (np.log((len(self.index) + 1) / (df + 1)) + 1)
+        # Ties go to the term that appears first in the text
+        top = np.argsort(-weights, kind='stable')[:count]
+        return [(terms[i], float(weights[i])) for i in top]
+
+    def add_exchange(self, query: str, response: str, terms: Optional[List[str]] = None,
+                     timestamp: Optional[float] = None) -> List[str]:
+        """
+        Index a user/assistant exchange under its extracted keywords and any given terms.
+
+        Args:
+            query (str): The user's message
+            response (str): The assistant's response
+            terms (List[str]): Extra index terms, e.g. chosen by the assistant
+            timestamp (float): When the exchange happened, defaults to now
+
+        Returns:
+            List[str]: The terms the exchange is indexed under
+        """
+        text = f"[USER] {query}\n[ASSISTANT] {response}"
+        doc_id = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        keywords = []
+        if doc_id not in self.index:
+            # Extract before adding, so the exchange does not count towards its own document frequencies
+            keywords = self.extract_keywords(text)
+            self.index.add(doc_id, text, timestamp if timestamp is not None else time.time())
+        keywords += [(term, 1.0) for term in map(normalize_term, terms or []) if term]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO keywords (term, doc_id, weight) VALUES (?, ?, ?)",
+                                   [(term, doc_id, weight) for term, weight in keywords])
+        return [term for term, _ in keywords]
+
+    def search(self, terms: List[str], limit: int = 20) -> List[SearchHit]:
+        """
+        Find the exchanges indexed under any of the terms, most relevant first.
+
+        Exchanges with a matching keyword come first, ordered by their summed keyword
+        weight; if there are fewer than limit, full-text matches fill the rest.
+        """
+        terms = [term for term in map(normalize_term, terms) if term]
+        if not terms:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT doc_id, SUM(weight) AS score FROM keywords WHERE term IN ({','.join('?' * len(terms))}) "
+                "GROUP BY doc_id ORDER BY score DESC LIMIT ?", terms + [limit]).fetchall()
+        hits = []
+        for doc_id, score in rows:
+            hit = self.index.get(doc_id)
+            if hit is not None:
+                hit.score = score
+                hits.append(hit)
+        if len(hits) < limit:
+            found = {hit.doc_id for hit in hits}
+            query = " ".join(term.replace("_", " ") for term in terms)
+            hits += [hit for hit in self.index.search(query, limit=limit) if hit.doc_id not in found][:limit - len(hits)]
+        return hits
+
+    def top_keywords(self, count: int = 100) -> List[str]:
+        """Return the terms that the most exchanges are indexed under."""
+        with self._lock:
+            return [term for term, in self._conn.execute(
+                "SELECT term FROM keywords GROUP BY term ORDER BY COUNT(*) DESC, term LIMIT ?", (count,))]
+
+    def import_term_logs(self, index_dir: str) -> int:
+        """
+        Import the per-term log files (logs/index/<term>.log) written before this index existed.
+
+        Each file holds [USER] and [ASSISTANT] entries in pairs; an exchange found in several
+        files is stored once and indexed under all their terms.
+
+        Returns:
+            int: The number of exchanges read
+        """
+        imported = 0
+        for name in sorted(os.listdir(index_dir)):
+            term, ext = os.path.splitext(name)
+            if ext != ".log":
+                continue
+            with open(os.path.join(index_dir, name), 'r', encoding='utf-8', errors='replace') as file:
+                pending = None
+                for line in file:
+                    match = ENTRY_PATTERN.match(line.rstrip("\n"))
+                    if not match:
+                        continue
+                    timestamp, role, message = match.groups()
+                    message = message.replace("\\n", "\n")
+                    if role == "USER":
+                        pending = (timestamp, message)
+                    elif pending is not None:
+                        try:
+                            when = datetime.strptime(pending[0], '%Y-%m-%d_%H-%M-%S').timestamp()
+                        except ValueError:
+                            when = None
+                        self.add_exchange(pending[1], message, [term], when)
+                        imported += 1
+                        pending = None
+        return imported
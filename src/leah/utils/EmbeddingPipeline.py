@@ -0,0 +1,163 @@
+import math
+import re
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from leah.config.GlobalConfig import GlobalConfig
+from leah.llm.TokenRateLimiter import TokenRateLimiter
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+class HashingEmbedder:
+    """
+    A local embedding backend based on the hashing trick.
+
+    Each text becomes a bag of word unigrams and bigrams hashed into `dim` signed
+    buckets with log-scaled counts. It needs no network or model download, is
+    deterministic across processes, and is good enough for keyword-level similarity.
+    """
+
+    rate_limit_key = None
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text).tolist()
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        words = TOKEN_PATTERN.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        counts: Dict[int, float] = {}
+        for feature in features:
+            h = zlib.crc32(feature.encode('utf-8'))
+            bucket = h % self.dim
+            counts[bucket] = counts.get(bucket, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+        for bucket, count in counts.items():
+            vector[bucket] = math.copysign(math.log1p(abs(count)), count)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+class GeminiEmbedder:
+    """The Gemini embeddings API, behind the same interface as the local backends."""
+
+    rate_limit_key = "gemini"
+
+    def __init__(self, model: str = "models/gemini-embedding-exp-03-07", task_type: str = "RETRIEVAL_DOCUMENT"):
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        self.name = model
+        self.embeddings = GoogleGenerativeAIEmbeddings(model=model, task_type=task_type,
+                                                       google_api_key=GlobalConfig().get_gemini_api_key())
+        self._dim = None
+
+    @property
+    def dim(self) -> int:
+        if self._dim is None:
+            self._dim = len(self.embed_query("dimension"))
+        return self._dim
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+
+def create_embedder(config: Optional[Dict[str, Any]] = None):
+    """
+    Build the embedding backend selected in the embeddings section of config.json.
+
+    Args:
+        config (dict): Overrides the configured settings, e.g. {"backend": "hashing"}
+    """
+    if config is None:
+        config = GlobalConfig().get_embeddings_config()
+    backend = config.get('backend', 'gemini')
+    if backend == 'hashing':
+        return HashingEmbedder(dim=config.get('dim', 1024))
+    if backend == 'gemini':
+        return GeminiEmbedder(model=config.get('model', "models/gemini-embedding-exp-03-07"))
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+class EmbeddingPipeline:
+    """
+    Embeds large lists of texts in batches.
+
+    Batches run concurrently, reserve their estimated tokens in the shared
+    TokenRateLimiter before they are sent when the backend is a rate limited API, and are
+    retried with exponential backoff (each attempt reserves tokens again). The result preserves
+    the order of the input texts.
+    """
+
+    def __init__(self, embedder, batch_size: int = 64, concurrency: int = 4, max_retries: int = 3):
+        """
+        Initialize the pipeline.
+
+        Args:
+            embedder: The backend, see create_embedder
+            batch_size (int): Number of texts sent in one request
+            concurrency (int): Number of batches in flight at once
+            max_retries (int): Number of times a failed batch is retried
+        """
+        self.embedder = embedder
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+
+    @classmethod
+    def from_config(cls, embedder=None) -> 'EmbeddingPipeline':
+        config = GlobalConfig().get_embeddings_config()
+        return cls(embedder if embedder is not None else create_embedder(config),
+                   batch_size=config.get('batch_size', 64),
+                   concurrency=config.get('concurrency', 4),
+                   max_retries=config.get('max_retries', 3))
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, returning one vector per text in the same order."""
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) <= 1 or self.concurrency == 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                results = list(executor.map(self._embed_batch, batches))
+        return [vector for batch in results for vector in batch]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embedder.embed_query(text)
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        # Roughly four characters per token is enough for rate limiting purposes
+        estimated_tokens = sum(len(text) for text in batch) // 4
+        attempt = 0
+        while True:
+            self._wait_for_rate_limit(estimated_tokens)
+            try:
+                return self.embedder.embed_documents(batch)
+            except Exception as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = 2 ** (attempt - 1)
+                print(f"Embedding batch failed ({e}), retrying in {delay} seconds")
+                time.sleep(delay)
+
+    def _wait_for_rate_limit(self, estimated_tokens: int) -> None:
+        if self.embedder.rate_limit_key is None:
+            return
+        rate_limiter = TokenRateLimiter()
+        # Reserved atomically, so concurrent batches cannot all pass against the same window
+        while not rate_limiter.reserve_tokens(self.embedder.rate_limit_key, estimated_tokens):
+            print(" !! Token rate limit exceeded, waiting 1 second before checking again")
+            time.sleep(1)
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from leah.utils.InvertedIndex import InvertedIndex, SearchHit
+
+EPISODE = "episode"
+SUMMARY = "summary"
+PARAGRAPH_PATTERN = re.compile(r'\n\s*\n')
+
+
+def split_paragraphs(text: str, max_chars: int = 1000) -> List[str]:
+    """Split text into paragraphs, cutting paragraphs longer than max_chars at line breaks."""
+    paragraphs = []
+    for paragraph in PARAGRAPH_PATTERN.split(text):
+        current = ""
+        for line in paragraph.strip().split("\n"):
+            if current and len(current) + len(line) + 1 > max_chars:
+                paragraphs.append(current)
+                current = ""
+            current = f"{current}\n{line}" if current else line
+        if current.strip():
+            paragraphs.append(current)
+    return paragraphs
+
+
+def format_memories(hits: List[SearchHit], max_chars: int = 1000) -> str:
+    """Render recalled memories oldest first, each with its date and cut to max_chars."""
+    lines = []
+    for hit in sorted(hits, key=lambda hit: hit.timestamp or 0):
+        when = datetime.fromtimestamp(hit.timestamp).strftime('%Y-%m-%d %H:%M') if hit.timestamp else "unknown"
+        text = hit.text if len(hit.text) <= max_chars else hit.text[:max_chars] + "..."
+        lines.append(f"[{when}] {text}")
+    return "\n\n".join(lines)
+
+
+class EpisodicMemory:
+    """
+    Timestamped memories of a persona, recalled by relevance to a message.
+
+    Every exchange is stored as an episode, and the paragraphs of the consolidated
+    memories summary as summary entries, in an InvertedIndex. recall() takes the BM25
+    candidates for the message and weights them by recency: the score is scaled by
+    (1 - recency_weight) + recency_weight * 0.5 ** (age / half_life), so recent memories
+    win among equally relevant ones while old but relevant ones are still found. When
+    too few memories match, the most recent ones fill the rest.
+
+    Use EpisodicMemory.open(path) to share one store per database file within a process.
+    """
+
+    _memories: Dict[str, 'EpisodicMemory'] = {}
+    _memories_lock = threading.Lock()
+
+    def __init__(self, db_path: str, half_life_days: float = 30.0, recency_weight: float = 0.5):
+        """
+        Initialize the store.
+
+        Args:
+            db_path (str): The database file of the index
+            half_life_days (float): Age in days at which the recency boost of a memory is halved
+            recency_weight (float): Share of the score that depends on recency, between 0 and 1
+        """
+        self.db_path = db_path
+        self.index = InvertedIndex.open(db_path)
+        self.half_life_days = half_life_days
+        self.recency_weight = min(1.0, max(0.0, recency_weight))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, db_path: str, half_life_days: float = 30.0, recency_weight: float = 0.5) -> 'EpisodicMemory':
+        """Return the shared store for db_path, opening it on first use."""
+        db_path = os.path.abspath(db_path)
+        with cls._memories_lock:
+            memory = cls._memories.get(db_path)
+            if memory is None:
+                memory = cls(db_path, half_life_days, recency_weight)
+                cls._memories[db_path] = memory
+            return memory
+
+    def add(self, text: str, timestamp: Optional[float] = None, kind: str = EPISODE) -> str:
+        """
+        Store a memory; storing the same text again only updates its timestamp.
+
+        Returns:
+            str: The id of the memory
+        """
+        doc_id = self._doc_id(kind, text)
+        self.index.add(doc_id, text, timestamp if timestamp is not None else time.time(), kind)
+        return doc_id
+
+    def set_summary(self, text: str, timestamp: Optional[float] = None) -> None:
+        """
+        Replace the summary entries with the paragraphs of text.
+
+        Paragraphs that were already in the previous summary keep their timestamp.
+        """
+        paragraphs = {self._doc_id(SUMMARY, paragraph): paragraph for paragraph in split_paragraphs(text)}
+        with self._lock:
+            for doc_id in self.index.doc_ids(SUMMARY):
+                if doc_id not in paragraphs:
+                    self.index.remove(doc_id)
+            for doc_id, paragraph in paragraphs.items():
+                if doc_id not in self.index:
+                    self.index.add(doc_id, paragraph, timestamp if timestamp is not None else time.time(), SUMMARY)
+
+    def recall(self, query: str, k: int = 8, candidates: int = 50, now: Optional[float] = None) -> List[SearchHit]:
+        """
+        Find the k memories most relevant to query, weighted by recency.
+
+        Args:
+            query (str): The message to recall memories for
+            k (int): Number of memories to return
+            candidates (int): Number of BM25 matches that are rescored
+            now (float): The time ages are measured from, defaults to now
+
+        Returns:
+            List[SearchHit]: The memories by descending score
+        """
+        now = now if now is not None else time.time()
+        # Quotes in a message are not meant as phrase queries
+        hits = self.index.search(query.replace('"', ' '), limit=max(k, candidates))
+        for hit in hits:
+            hit.score *= self._recency(hit.timestamp, now)
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        hits = hits[:k]
+        if len(hits) < k:
+            found = {hit.doc_id for hit in hits}
+            hits += [hit for hit in self.index.recent(k) if hit.doc_id not in found][:k - len(hits)]
+        return hits
+
+    def _recency(self, timestamp: Optional[float], now: float) -> float:
+        if timestamp is None or self.half_life_days <= 0:
+            return 1.0 - self.recency_weight
+        age_days = max(0.0, now - timestamp) / 86400
+        return (1.0 - self.recency_weight) + self.recency_weight * 0.5 ** (age_days / self.half_life_days)
+
+    def _doc_id(self, kind: str, text: str) -> str:
+        return kind + ":" + hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.index)
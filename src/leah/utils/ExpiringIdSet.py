@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class ExpiringIdSet:
+    """
+    A thread-safe set of ids with bounded size and optional expiry.
+
+    Ids are kept in insertion order with the time they were added, so membership checks
+    and adds are O(1) and the oldest ids are at the front. When the set holds more than
+    max_size ids the oldest are dropped, and ids older than ttl seconds are dropped as
+    they are reached; a ttl of 0 keeps ids until they are pushed out by size.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 0, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the set.
+
+        Args:
+            max_size (int): Maximum number of ids kept
+            ttl (float): Seconds an id is kept, 0 to keep ids until the set is full
+            clock (Callable[[], float]): Returns the current time in seconds
+        """
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.clock = clock
+        self._ids: 'OrderedDict[Hashable, float]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, id: Hashable) -> bool:
+        """
+        Add an id, refreshing its age if it is already in the set.
+
+        Returns:
+            bool: True if the id was not in the set
+        """
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            is_new = id not in self._ids
+            self._ids[id] = now
+            self._ids.move_to_end(id)
+            while len(self._ids) > self.max_size:
+                self._ids.popitem(last=False)
+            return is_new
+
+    def _expire(self, now: float) -> None:
+        if not self.ttl:
+            return
+        cutoff = now - self.ttl
+        while self._ids:
+            id, added = next(iter(self._ids.items()))
+            if added > cutoff:
+                break
+            del self._ids[id]
+
+    def __contains__(self, id: Hashable) -> bool:
+        with self._lock:
+            self._expire(self.clock())
+            return id in self._ids
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(self.clock())
+            return len(self._ids)
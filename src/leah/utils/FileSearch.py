@@ -0,0 +1,342 @@
+import mmap
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generator, Iterable, List, Optional, Tuple
+
+from leah.config.GlobalConfig import GlobalConfig
+
+DEFAULT_SKIP_DIRS = (".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".backup")
+BINARY_SNIFF_BYTES = 8192
+FOLD_CHUNK_BYTES = 1048576
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a gitignore glob into a regular expression over '/'-separated paths."""
+    result, i = [], 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            result.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            result.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            result.append("[^/]*")
+        elif char == "?":
+            result.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                result.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                result.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        else:
+            result.append(re.escape(char))
+        i += 1
+    return "".join(result)
+
+
+class IgnoreRules:
+    """
+    gitignore-style rules for a directory tree.
+
+    Rules are collected from the .gitignore of every directory on the way down, so a
+    pattern only applies below the directory whose .gitignore defines it. As in git,
+    the last matching rule wins, "!" re-includes, a trailing "/" only matches
+    directories, and patterns without a "/" match a name at any depth.
+    """
+
+    def __init__(self, rules: Tuple = ()):
+        self.rules = rules
+
+    @staticmethod
+    def parse(lines: Iterable[str], base: str) -> List[Tuple]:
+        rules = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            regex = re.compile(glob_to_regex(line.lstrip("/")) + "$")
+            rules.append((base, regex, negate, dir_only, anchored))
+        return rules
+
+    def child(self, directory: str) -> 'IgnoreRules':
+        """Return the rules that apply inside directory, adding its .gitignore if it has one."""
+        try:
+            with open(os.path.join(directory, ".gitignore"), "r", encoding="utf-8", errors="replace") as f:
+                return IgnoreRules(self.rules + tuple(self.parse(f, directory)))
+        except OSError:
+            return self
+
+    def ignored(self, path: str, is_dir: bool) -> bool:
+        result = False
+        for base, regex, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if anchored:
+                subject = path[len(base):].lstrip(os.sep).replace(os.sep, "/")
+            else:
+                subject = os.path.basename(path)
+            if regex.match(subject):
+                result = not negate
+        return result
+
+
+class FileSearch:
+    """
+    Searches file names and contents under a directory without an index.
+
+    The tree is walked with os.scandir, skipping well known tool directories and
+    anything excluded by .gitignore files. Files are searched on a thread pool as
+    memory-mapped bytes, skipping binaries and files above a size limit, and matches
+    are yielded as they are found until max_results is reached or the deadline passes.
+    Literal patterns are found in the bytes directly; regular expressions and
+    case-insensitive non-ASCII literals run on the decoded text so that Unicode
+    characters match as they would in a str regex.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, workers: int = 8, max_file_size: int = 16777216, timeout: float = 20.0,
+                 respect_gitignore: bool = True, skip_dirs: Iterable[str] = DEFAULT_SKIP_DIRS):
+        """
+        Initialize the search.
+
+        Args:
+            workers (int): Number of files searched in parallel
+            max_file_size (int): Larger files are not searched
+            timeout (float): Default number of seconds a search may take
+            respect_gitignore (bool): Whether .gitignore files exclude paths
+            skip_dirs (Iterable[str]): Directory names that are never entered
+        """
+        self.workers = max(1, workers)
+        self.max_file_size = max_file_size
+        self.timeout = timeout
+        self.respect_gitignore = respect_gitignore
+        self.skip_dirs = set(skip_dirs)
+
+    @classmethod
+    def get_instance(cls) -> 'FileSearch':
+        """
+        Get the shared search, configured from the file_search section of config.json.
+
+        Returns:
+            FileSearch: The singleton instance
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    config = GlobalConfig().get_file_search_config()
+                    cls._instance = FileSearch(
+                        workers=config.get('workers', 8),
+                        max_file_size=config.get('max_file_size', 16777216),
+                        timeout=config.get('timeout', 20.0),
+                        respect_gitignore=config.get('respect_gitignore', True))
+        return cls._instance
+
+    def walk(self, root: str, deadline: Optional[float] = None) -> Generator[os.DirEntry, None, None]:
+        """
+        Yield the files and directories under root that are not skipped or ignored.
+
+        Symbolic links are not followed.
+        """
+        rules = IgnoreRules()
+        if self.respect_gitignore:
+            # Rules from .gitignore files above root still apply to it
+            parents, directory = [], os.path.abspath(root)
+            while True:
+                parent = os.path.dirname(directory)
+                if parent == directory:
+                    break
+                parents.append(parent)
+                directory = parent
+            for parent in reversed(parents):
+                rules = rules.child(parent)
+        stack = [(os.path.abspath(root), rules)]
+        while stack:
+            if deadline is not None and time.monotonic() > deadline:
+                return
+            directory, rules = stack.pop()
+            if self.respect_gitignore:
+                rules = rules.child(directory)
+            try:
+                with os.scandir(directory) as entries:
+                    entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            subdirectories = []
+            for entry in entries:
+                try:
+                    if entry.is_symlink():
+                        continue
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if is_dir and entry.name in self.skip_dirs:
+                    continue
+                if rules.rules and rules.ignored(entry.path, is_dir):
+                    continue
+                yield entry
+                if is_dir:
+                    subdirectories.append((entry.path, rules))
+            stack.extend(reversed(subdirectories))
+
+    def find_names(self, terms: List[str], root: str, case_sensitive: bool = False,
+                   max_results: Optional[int] = None, timeout: Optional[float] = None) -> Generator[str, None, None]:
+        """Yield the files and directories under root whose name contains any of the terms."""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        if not case_sensitive:
+            terms = [term.lower() for term in terms]
+        count = 0
+        for entry in self.walk(root, deadline):
+            name = entry.name if case_sensitive else entry.name.lower()
+            if any(term in name for term in terms):
+                yield os.path.abspath(entry.path)
+                count += 1
+                if max_results is not None and count >= max_results:
+                    return
+
+    def search(self, pattern: str, root: str, case_sensitive: bool = False, regex: bool = False,
+               max_results: Optional[int] = 200, timeout: Optional[float] = None) -> Generator[str, None, None]:
+        """
+        Search the contents of the files under root.
+
+        Args:
+            pattern (str): A literal string, or a regular expression if regex is True
+            root (str): The directory (or single file) to search
+            case_sensitive (bool): Whether the match is case sensitive
+            regex (bool): Whether pattern is a regular expression
+            max_results (int): Stop after this many matching lines, None for no limit
+            timeout (float): Stop after this many seconds, defaults to the configured timeout
+
+        Yields:
+            str: Matches in the format "absolute_path:line_number:matching_line", in walk order
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        needle, matcher, fold = self._matcher(pattern, case_sensitive, regex)
+
+        if os.path.isfile(root):
+            paths = iter([os.path.abspath(root)])
+        else:
+            paths = (os.path.abspath(entry.path) for entry in self.walk(root, deadline) if not entry.is_dir())
+
+        count = 0
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        pending = deque()
+        try:
+            for path in paths:
+                pending.append(executor.submit(self._search_file, path, needle, matcher, fold, max_results, deadline))
+                # Keep a bounded number of files in flight and yield results in walk order
+                while pending and (len(pending) >= self.workers * 4 or pending[0].done()):
+                    for result in pending.popleft().result():
+                        yield result
+                        count += 1
+                        if max_results is not None and count >= max_results:
+                            return
+                if time.monotonic() > deadline:
+                    print(f"File search for {pattern!r} in {root} stopped after {timeout} seconds")
+                    return
+            while pending:
+                for result in pending.popleft().result():
+                    yield result
+                    count += 1
+                    if max_results is not None and count >= max_results:
+                        return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _matcher(pattern: str, case_sensitive: bool, regex: bool) -> Tuple[bytes, Optional[re.Pattern], bool]:
+        """Return the (needle, matcher, fold) arguments of _search_file for a search."""
+        needle = pattern.encode('utf-8')
+        if regex:
+            # ^ and $ match at line boundaries, as in grep
+            return needle, re.compile(pattern, re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE), False
+        if not case_sensitive and needle.isascii():
+            # Lowercasing the file and using find is much faster than an IGNORECASE regex
+            return needle.lower(), None, True
+        if not case_sensitive:
+            return needle, re.compile(re.escape(pattern), re.IGNORECASE), False
+        return needle, None, False
+
+    def _search_file(self, path: str, needle: bytes, matcher: Optional[re.Pattern], fold: bool,
+                     max_results: Optional[int], deadline: float) -> List[str]:
+        try:
+            size = os.path.getsize(path)
+            if size == 0 or size > self.max_file_size or time.monotonic() > deadline:
+                return []
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data.find(b'\0', 0, BINARY_SNIFF_BYTES) != -1:
+                    return []
+                if matcher is not None:
+                    text = str(data, 'utf-8', 'replace')
+
+                    def find(position: int) -> int:
+                        match = matcher.search(text, position)
+                        return -1 if match is None else match.start()
+                    return self._matching_lines(path, text, find, max_results)
+                if fold:
+                    return self._matching_lines(path, data, lambda position: self._folded_find(data, needle, position),
+                                                max_results)
+                return self._matching_lines(path, data, lambda position: data.find(needle, position), max_results)
+        except (OSError, ValueError):
+            return []
+
+    @staticmethod
+    def _folded_find(data: mmap.mmap, needle: bytes, position: int) -> int:
+        """Find the lowercase ASCII needle in data ignoring case, lowercasing one chunk of data at a time."""
+        # Consecutive chunks overlap so that a match across a chunk boundary is found
+        overlap = max(len(needle) - 1, 0)
+        while position <= len(data):
+            end = min(len(data), position + max(FOLD_CHUNK_BYTES, len(needle)))
+            start = data[position:end].lower().find(needle)
+            if start != -1:
+                return position + start
+            if end == len(data):
+                return -1
+            position = max(position + 1, end - overlap)
+        return -1
+
+    def _matching_lines(self, path: str, data, find: Callable[[int], int], max_results: Optional[int]) -> List[str]:
+        # data is the memory-mapped file or its decoded text, find returns the offset of the next match in it
+        newline = '\n' if isinstance(data, str) else b'\n'
+        results = []
+        position, line_number, counted_to = 0, 1, 0
+        while True:
+            start = find(position)
+            if start == -1:
+                return results
+            line_start = data.rfind(newline, 0, start) + 1
+            line_end = data.find(newline, start)
+            if line_end == -1:
+                line_end = len(data)
+            line_number += data[counted_to:line_start].count(newline)
+            counted_to = line_start
+            line = data[line_start:line_end]
+            if not isinstance(line, str):
+                line = line.decode('utf-8', errors='replace')
+            results.append(f"{path}:{line_number}:{line.strip()}")
+            if max_results is not None and len(results) >= max_results:
+                return results
+            position = line_end + 1
+            if position > len(data):
+                return results
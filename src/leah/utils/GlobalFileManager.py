@@ -1,7 +1,7 @@
 import os
 import shutil
 from datetime import datetime
-from typing import Optional, List
+from typing import Generator, Optional, List
 import io
 import sys
 import tempfile
@@ -9,6 +9,10 @@ try:
     import patch
 except ImportError:
     raise ImportError("The 'patch' library is required for applying diffs. Install it with 'pip install patch'.")
+from leah.utils.FileSearch import FileSearch
+from leah.utils.LineEditor import LineEditor
+from leah.utils.LineIndex import LineIndex
+from leah.utils.TrigramIndex import TrigramIndex
 
 class GlobalFileManager:
     def __init__(self, config_manager, read_root: str, write_root: str):
@@ -51,13 +55,7 @@ class GlobalFileManager:
         The end_line_number is the line to end at.
         If end_line_number is not provided, all lines are returned.
         """
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
-            lines = file.readlines()
-
-        if end_line_number is None:
-            end_line_number = len(lines)
-
-        lines = lines[start_line_number-1:end_line_number]
+        lines = LineIndex.for_file(file_path).read_lines(start_line_number, end_line_number)
 
         width = len(str(len(lines)))
         def pad(n: int) -> str:
@@ -66,6 +64,36 @@ class GlobalFileManager:
 
         return [pad(n+1) + ": " + line for n, line in enumerate(lines)]
 
+    def get_file_line_count(self, file_path: str) -> int:
+        """
+        Get the number of lines in a file, from its cached line index.
+        """
+        return LineIndex.for_file(file_path).line_count
+
+    def get_file_chars(self, file_path: str, offset: int, length: int) -> Optional[str]:
+        """
+        Get length characters of a file starting at character offset, only if within read_root.
+        The file is not read up to offset, so paging through a large file costs a seek per page.
+
+        Args:
+            file_path (str): Name of the file or full path to read
+            offset (int): The character offset to start at
+            length (int): The number of characters to read
+
+        Returns:
+            Optional[str]: The characters read if the file exists, None otherwise
+        """
+        if os.path.isabs(file_path):
+            full_path = file_path
+        else:
+            full_path = os.path.join(self.read_root, file_path)
+
+        if not self._is_within_root(full_path, self.read_root):
+            raise PermissionError("Read operation not allowed outside read_root")
+        if not os.path.isfile(full_path):
+            return None
+        return LineIndex.for_file(full_path).read_chars(offset, length)
+
     def get_file(self, file_path: str) -> Optional[bytes]:
         """
         Retrieve the content of a specific file in binary mode, only if within read_root.
@@ -298,11 +326,7 @@ class GlobalFileManager:
             file_path = os.path.join(self.write_root, file_path)
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File {file_path} not found")
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
-            content = file.read()
-        new_content = content[:offset] + insert_chars + content[offset + delete_chars:]
-        with open(file_path, 'w', encoding='utf-8') as file:
-            file.write(new_content)
+        LineEditor(file_path).splice(offset, delete_chars, insert_chars)
 
     def replace_file_lines(self, file_path: str, start_line_number: int, end_line_number: int, replacement_lines: List[str]):
         """
@@ -310,26 +334,15 @@ class GlobalFileManager:
         The line_number is the line to replace.
         The replace_line is the line to replace with.
         """
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
-            lines = [line.rstrip('\n') for line in file.readlines()]
-
-        if end_line_number >= len(lines):
-            # add empty lines till we reach the line_number
-            lines.extend([""] * (end_line_number - len(lines)))
-
-        # delete the lines between start_line_number and end_line_number (inclusive, 1-based)
-        lines = lines[0:start_line_number-1] + replacement_lines + lines[end_line_number:]
-        with open(file_path, 'w', encoding='utf-8') as file:
-            file.write("\n".join(lines))
+        LineEditor(file_path).replace_lines(start_line_number, end_line_number, replacement_lines)
         return f"I have replaced the lines {start_line_number} to {end_line_number} with {replacement_lines} in the file {file_path}"
 
     def append_file_lines(self, file_path: str, append_lines: List[str]):
         """
         Append lines to a file.
         """
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
-            lines = [line.rstrip('\n') for line in file.readlines()]
-        lines.extend(append_lines)
+        LineEditor(file_path).append_lines(append_lines)
+        return f"I have appended the lines {append_lines} to the file {file_path}"
     
     def insert_file_lines(self, file_path: str, line_number: int, insert_lines: List[str]):
         """
@@ -337,33 +350,17 @@ class GlobalFileManager:
         The line_number is the line to insert under (i.e., before the original line N).
         The insert_lines are the lines to insert.
         """
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
-            lines = [line.rstrip('\n') for line in file.readlines()]
-        if len(lines) == 0:
-            lines = [""]
-
-        if line_number > len(lines):
-            # add empty lines till we reach the line_number
-            lines.extend([""] * (line_number - len(lines)))
-
-        # insert the lines after the original line at line_number
-        lines = lines[0:line_number] + insert_lines + lines[line_number:]
-        with open(file_path, 'w', encoding='utf-8') as file:
-            file.write("\n".join(lines))
+        LineEditor(file_path).insert_lines(line_number, insert_lines)
         return f"I have inserted the lines {insert_lines} under the line {line_number} in the file {file_path}"
     
     def delete_file_lines(self, file_path: str, start_line_number: int, end_line_number: int):
         """
         Delete lines from a file. Line numbers are 1-based and inclusive.
         """
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
-            lines = file.readlines()
-        # Convert to 0-based indices, and end_line_number is inclusive
-        del lines[start_line_number-1:end_line_number]
-        with open(file_path, 'w', encoding='utf-8') as file:
-            file.writelines(lines)
+        LineEditor(file_path).delete_lines(start_line_number, end_line_number)
 
-    def search_files(self, search_strings: List[str], path: str = "", case_sensitive: bool = False) -> List[str]:
+    def search_files(self, search_strings: List[str], path: str = "", case_sensitive: bool = False,
+                     max_results: Optional[int] = 500) -> List[str]:
         """
         Recursively search for files containing any of the search strings in their name.
         
@@ -371,6 +368,7 @@ class GlobalFileManager:
             search_strings (List[str]): List of strings to search for in file names
             path (str): Starting path for the search, can be relative or absolute
             case_sensitive (bool): Whether the search should be case-sensitive
+            max_results (int): Maximum number of paths to return, None for no limit
             
         Returns:
             List[str]: List of absolute paths to files that match any of the search criteria
@@ -391,33 +389,14 @@ class GlobalFileManager:
         if not self._is_within_root(full_path, self.read_root):
             raise PermissionError("Search operation not allowed outside read_root")
 
-        matches = set()  # Using set to avoid duplicates
-        
-        # If case-insensitive search is requested, convert search strings to lowercase
-        if not case_sensitive:
-            search_strings = [s.lower() for s in search_strings]
-
-        # Walk through directory tree
-        for root, dirs, files in os.walk(full_path):
-            # Search in file names
-            for filename in files:
-                # Apply case sensitivity setting
-                compare_name = filename if case_sensitive else filename.lower()
-                # Check if any search string matches
-                if any(search_string in compare_name for search_string in search_strings):
-                    matches.add(os.path.abspath(os.path.join(root, filename)))
-            
-            # Search in directory names
-            for dirname in dirs:
-                # Apply case sensitivity setting
-                compare_name = dirname if case_sensitive else dirname.lower()
-                # Check if any search string matches
-                if any(search_string in compare_name for search_string in search_strings):
-                    matches.add(os.path.abspath(os.path.join(root, dirname)))
+        index = TrigramIndex.get_instance()
+        if index is not None and index.covers(full_path):
+            return index.search_names(search_strings, full_path, case_sensitive)[:max_results]
 
-        return sorted(list(matches))  # Convert set back to sorted list
+        return sorted(FileSearch.get_instance().find_names(search_strings, full_path, case_sensitive, max_results))
 
-    def content_search(self, search_term: str, path: str = "", case_sensitive: bool = False) -> List[str]:
+    def content_search(self, search_term: str, path: str = "", case_sensitive: bool = False, regex: bool = False,
+                       max_results: Optional[int] = 200) -> List[str]:
         """
         Search for a term within all text files in the specified directory and its subdirectories.
         Only searches within the read_root directory. Returns results in grep-like format.
@@ -426,6 +405,8 @@ class GlobalFileManager:
             search_term (str): The term to search for in the files
             path (str): The path within read_root to start the search (default: root)
             case_sensitive (bool): Whether the search should be case-sensitive (default: False)
+            regex (bool): Whether search_term is a regular expression (default: False)
+            max_results (int): Maximum number of matching lines to return, None for no limit
             
         Returns:
             List[str]: List of strings in format "absolute_path:line_number:matching_line"
@@ -433,6 +414,17 @@ class GlobalFileManager:
         Raises:
             PermissionError: If the search path is outside read_root
         """
+        return list(self.iter_content_search(search_term, path, case_sensitive, regex, max_results))
+
+    def iter_content_search(self, search_term: str, path: str = "", case_sensitive: bool = False, regex: bool = False,
+                            max_results: Optional[int] = None, timeout: Optional[float] = None) -> Generator[str, None, None]:
+        """
+        Like content_search, but yields matches as they are found.
+
+        Paths inside the configured file index are answered from the index, which only
+        reads the files that can contain the term. Other paths are walked by FileSearch,
+        which gives up after timeout seconds (the configured file_search timeout by default).
+        """
         # Determine if the path is absolute or relative
         if os.path.isabs(path):
             full_path = path
@@ -442,24 +434,9 @@ class GlobalFileManager:
         if not self._is_within_root(full_path, self.read_root):
             raise PermissionError("Content search operation not allowed outside read_root")
 
-        results = []
-        
-        for root, _, filenames in os.walk(full_path):
-            for filename in filenames:
-                file_path = os.path.join(root, filename)
-                
-                try:
-                    # Try to open and read the file as text
-                    with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
-                        for line_num, line in enumerate(file, 1):
-                            if case_sensitive:
-                                if search_term in line:
-                                    results.append(f"{file_path}:{line_num}:{line.strip()}")
-                            else:
-                                if search_term.lower() in line.lower():
-                                    results.append(f"{file_path}:{line_num}:{line.strip()}")
-                except (UnicodeDecodeError, IOError):
-                    # Skip files that can't be read as text
-                    continue
-                    
-        return results 
\ No newline at end of file
+        index = TrigramIndex.get_instance()
+        if index is not None and index.covers(full_path):
+            yield from index.search(search_term, full_path, case_sensitive, regex, max_results=max_results)
+            return
+
+        yield from FileSearch.get_instance().search(search_term, full_path, case_sensitive, regex, max_results, timeout)
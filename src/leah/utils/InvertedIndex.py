@@ -0,0 +1,323 @@
+import heapq
+import math
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Split a query into terms and quoted phrases.
+
+    Returns:
+        Tuple[List[str], List[List[str]]]: All query terms (including the words of the
+        phrases) and the tokenized phrases
+    """
+    phrases = [tokenize(phrase) for phrase in PHRASE_PATTERN.findall(query)]
+    phrases = [phrase for phrase in phrases if phrase]
+    terms = tokenize(PHRASE_PATTERN.sub(' ', query))
+    for phrase in phrases:
+        terms.extend(phrase)
+    return list(dict.fromkeys(terms)), phrases
+
+
+@dataclass
+class SearchHit:
+    doc_id: str
+    score: float
+    snippet: str
+    timestamp: Optional[float] = None
+    text: str = ""
+    data: Optional[str] = None
+
+
+@dataclass
+class CorpusStatistics:
+    """Document count, total length and document frequencies that BM25 scores are computed with."""
+    doc_count: int
+    total_length: int
+    document_frequencies: Dict[str, int]
+
+    @staticmethod
+    def combine(statistics: Iterable['CorpusStatistics']) -> 'CorpusStatistics':
+        """Add up the statistics of several indexes, so their scores can be compared."""
+        combined = CorpusStatistics(0, 0, {})
+        for item in statistics:
+            combined.doc_count += item.doc_count
+            combined.total_length += item.total_length
+            for term, df in item.document_frequencies.items():
+                combined.document_frequencies[term] = combined.document_frequencies.get(term, 0) + df
+        return combined
+
+
+class InvertedIndex:
+    """
+    A persistent full-text index with BM25 ranking.
+
+    Documents are tokenized into postings (term, document, term frequency, positions)
+    stored in SQLite, so adding or removing a document only touches its own postings.
+    Queries are scored with BM25 over the query terms; quoted phrases must appear in
+    order, and results can be restricted to a timestamp range. The document text is
+    kept for building snippets, along with an optional string of caller data such as
+    the sender of a message. Callers can keep small markers, such as whether a backfill
+    has completed, in the index's settings (get_setting/set_setting).
+
+    Use InvertedIndex.open(path) to share one index per database file within a process.
+    """
+
+    _indexes: Dict[str, 'InvertedIndex'] = {}
+    _indexes_lock = threading.Lock()
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs (doc_id TEXT PRIMARY KEY, length INTEGER NOT NULL, timestamp REAL, text TEXT, data TEXT)")
+        if "data" not in [column[1] for column in self._conn.execute("PRAGMA table_info(docs)")]:
+            self._conn.execute("ALTER TABLE docs ADD COLUMN data TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS docs_timestamp ON docs (timestamp)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings (term TEXT NOT NULL, doc_id TEXT NOT NULL, tf INTEGER NOT NULL, "
+            "positions TEXT NOT NULL, PRIMARY KEY (term, doc_id)) WITHOUT ROWID")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT)")
+        self._doc_count, self._total_length = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs").fetchone()
+
+    @classmethod
+    def open(cls, db_path: str) -> 'InvertedIndex':
+        """Return the shared index for db_path, opening it on first use."""
+        db_path = os.path.abspath(db_path)
+        with cls._indexes_lock:
+            index = cls._indexes.get(db_path)
+            if index is None:
+                index = cls(db_path)
+                cls._indexes[db_path] = index
+            return index
+
+    def add(self, doc_id: str, text: str, timestamp: Optional[float] = None, data: Optional[str] = None) -> None:
+        """Index a document, replacing any previous version with the same id."""
+        tokens = tokenize(text)
+        positions: Dict[str, List[int]] = {}
+        for position, token in enumerate(tokens):
+            positions.setdefault(token, []).append(position)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._remove(doc_id)
+                self._conn.execute("INSERT INTO docs (doc_id, length, timestamp, text, data) VALUES (?, ?, ?, ?, ?)",
+                                   (doc_id, len(tokens), timestamp, text, data))
+                self._conn.executemany(
+                    "INSERT INTO postings (term, doc_id, tf, positions) VALUES (?, ?, ?, ?)",
+                    [(term, doc_id, len(term_positions), ",".join(map(str, term_positions)))
+                     for term, term_positions in positions.items()])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._doc_count += 1
+            self._total_length += len(tokens)
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._remove(doc_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM docs")
+            self._conn.execute("DELETE FROM settings")
+            self._doc_count, self._total_length = 0, 0
+
+    def get_setting(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM settings WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_setting(self, name: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)", (name, value))
+
+    def timestamps(self) -> Dict[str, Optional[float]]:
+        """Return the timestamp stored for every document."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT doc_id, timestamp FROM docs"))
+
+    def get(self, doc_id: str) -> Optional[SearchHit]:
+        """Return a stored document as an unscored hit, or None if it is not indexed."""
+        with self._lock:
+            row = self._conn.execute("SELECT text, timestamp, data FROM docs WHERE doc_id = ?", (doc_id,)).fetchone()
+        if row is None:
+            return None
+        text, timestamp, data = row
+        return SearchHit(doc_id, 0.0, make_snippet(text or "", []), timestamp, text or "", data)
+
+    def recent(self, limit: int = 10, data: Optional[str] = None) -> List[SearchHit]:
+        """Return the newest documents as unscored hits, optionally only those stored with the given data."""
+        sql = "SELECT doc_id, text, timestamp, data FROM docs"
+        params: List = []
+        if data is not None:
+            sql += " WHERE data = ?"
+            params.append(data)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY timestamp DESC LIMIT ?", params + [limit]).fetchall()
+        return [SearchHit(doc_id, 0.0, make_snippet(text or "", []), timestamp, text or "", row_data)
+                for doc_id, text, timestamp, row_data in rows]
+
+    def doc_ids(self, data: Optional[str] = None) -> List[str]:
+        """Return the ids of all documents, optionally only those stored with the given data."""
+        with self._lock:
+            if data is None:
+                return [doc_id for doc_id, in self._conn.execute("SELECT doc_id FROM docs")]
+            return [doc_id for doc_id, in self._conn.execute("SELECT doc_id FROM docs WHERE data = ?", (data,))]
+
+    def document_frequencies(self, terms: Iterable[str]) -> Dict[str, int]:
+        """Return the number of documents containing each of the terms."""
+        terms = list(dict.fromkeys(terms))
+        frequencies = dict.fromkeys(terms, 0)
+        with self._lock:
+            # Stay below SQLite's limit on the number of parameters
+            for start in range(0, len(terms), 500):
+                chunk = terms[start:start + 500]
+                frequencies.update(self._conn.execute(
+                    f"SELECT term, COUNT(*) FROM postings WHERE term IN ({','.join('?' * len(chunk))}) GROUP BY term",
+                    chunk))
+        return frequencies
+
+    def statistics(self, terms: Iterable[str]) -> CorpusStatistics:
+        """Return the statistics of this index for the terms, see search(statistics=...)."""
+        with self._lock:
+            return CorpusStatistics(self._doc_count, self._total_length, self.document_frequencies(terms))
+
+    def __contains__(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM docs WHERE doc_id = ?", (doc_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._doc_count
+
+    def search(self, query: str, limit: int = 10, since: Optional[float] = None, until: Optional[float] = None,
+               require_all: bool = False, snippet_width: int = 200,
+               statistics: Optional[CorpusStatistics] = None) -> List[SearchHit]:
+        """
+        Find the documents that best match a query.
+
+        Args:
+            query (str): Words to search for; "quoted phrases" must match in order
+            limit (int): Maximum number of results
+            since (float): Only documents with a timestamp at or after this
+            until (float): Only documents with a timestamp at or before this
+            require_all (bool): Only documents that contain every query term
+            snippet_width (int): Approximate length of the snippets
+            statistics (CorpusStatistics): Score with these statistics instead of this index's
+                own, e.g. combined over several indexes whose results are merged
+
+        Returns:
+            List[SearchHit]: Matches ordered by descending score
+        """
+        terms, phrases = parse_query(query)
+        if not terms:
+            return []
+        with self._lock:
+            if self._doc_count == 0:
+                return []
+            if statistics is None:
+                doc_count, total_length = self._doc_count, self._total_length
+            else:
+                doc_count, total_length = statistics.doc_count, statistics.total_length
+            average_length = total_length / doc_count
+            scores: Dict[str, float] = {}
+            matched_terms: Dict[str, int] = {}
+            for term in terms:
+                postings = self._postings(term, since, until)
+                if not postings:
+                    continue
+                if statistics is not None:
+                    df = statistics.document_frequencies.get(term, len(postings))
+                elif since is None and until is None:
+                    df = len(postings)
+                else:
+                    df = self._conn.execute("SELECT COUNT(*) FROM postings WHERE term = ?", (term,)).fetchone()[0]
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for doc_id, tf, length in postings:
+                    norm = tf + self.K1 * (1 - self.B + self.B * length / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.K1 + 1) / norm
+                    matched_terms[doc_id] = matched_terms.get(doc_id, 0) + 1
+
+            candidates = scores.keys()
+            if require_all:
+                candidates = [doc_id for doc_id in candidates if matched_terms[doc_id] == len(terms)]
+            if phrases:
+                candidates = [doc_id for doc_id in candidates
+                              if all(self._contains_phrase(doc_id, phrase) for phrase in phrases)]
+            ranked = heapq.nlargest(limit, candidates, key=scores.__getitem__)
+
+            hits = []
+            for doc_id in ranked:
+                text, timestamp, data = self._conn.execute(
+                    "SELECT text, timestamp, data FROM docs WHERE doc_id = ?", (doc_id,)).fetchone()
+                text = text or ""
+                hits.append(SearchHit(doc_id, scores[doc_id], make_snippet(text, terms, snippet_width), timestamp, text, data))
+            return hits
+
+    def _postings(self, term: str, since: Optional[float], until: Optional[float]) -> List[Tuple[str, int, int]]:
+        sql = "SELECT p.doc_id, p.tf, d.length FROM postings p JOIN docs d ON d.doc_id = p.doc_id WHERE p.term = ?"
+        params: List = [term]
+        if since is not None:
+            sql += " AND d.timestamp >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND d.timestamp <= ?"
+            params.append(until)
+        return self._conn.execute(sql, params).fetchall()
+
+    def _contains_phrase(self, doc_id: str, phrase: List[str]) -> bool:
+        positions = []
+        for term in phrase:
+            row = self._conn.execute("SELECT positions FROM postings WHERE term = ? AND doc_id = ?", (term, doc_id)).fetchone()
+            if row is None:
+                return False
+            positions.append(set(map(int, row[0].split(","))))
+        return any(all(start + offset in positions[offset] for offset in range(1, len(phrase)))
+                   for start in positions[0])
+
+    def _remove(self, doc_id: str) -> bool:
+        row = self._conn.execute("SELECT length FROM docs WHERE doc_id = ?", (doc_id,)).fetchone()
+        if row is None:
+            return False
+        self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+        self._conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+        self._doc_count -= 1
+        self._total_length -= row[0]
+        return True
+
+
+def make_snippet(text: str, terms: Iterable[str], width: int = 200) -> str:
+    """Return the part of text around the first occurrence of any of the terms."""
+    text = " ".join(text.split())
+    if len(text) <= width:
+        return text
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(term) for term in terms) + r')\b', re.IGNORECASE)
+    match = pattern.search(text)
+    start = 0 if match is None else max(0, match.start() - width // 3)
+    end = min(len(text), start + width)
+    snippet = text[start:end]
+    return ("..." if start > 0 else "") + snippet + ("..." if end < len(text) else "")
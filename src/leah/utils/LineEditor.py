@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, List, TextIO
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class LineWriter:
+    """Writes lines joined by newlines, without a newline after the last one."""
+
+    def __init__(self, file: TextIO):
+        self.file = file
+        self.first = True
+
+    def write(self, line: str) -> None:
+        if not self.first:
+            self.file.write("\n")
+        self.file.write(line)
+        self.first = False
+
+
+class LineEditor:
+    """
+    Line and offset edits that stream through a file instead of loading it.
+
+    Every edit reads the file line by line (or in chunks for offset edits), writes the
+    result to a temporary file in the same directory and renames it over the original,
+    so memory use does not depend on the file size and a failed edit never leaves a
+    half written file behind. Files are read as UTF-8 with undecodable bytes replaced,
+    and line semantics match the previous readlines() based implementation, e.g.
+    replace and insert write the lines joined by newlines.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def lines(self) -> Iterator[str]:
+        """Yield the lines of the file without their line endings."""
+        with self._open() as file:
+            for line in file:
+                yield line.rstrip('\n')
+
+    def replace_lines(self, start_line_number: int, end_line_number: int, replacement_lines: List[str]) -> None:
+        """Replace lines start_line_number to end_line_number (1-based, inclusive), padding short files with empty lines."""
+        with self._rewrite() as (source, target):
+            out = LineWriter(target)
+            count = 0
+            for count, line in enumerate(source, 1):
+                if count == start_line_number:
+                    self._write_all(out, replacement_lines)
+                if count < start_line_number or count > end_line_number:
+                    out.write(line.rstrip('\n'))
+            if count < start_line_number:
+                for _ in range(count + 1, start_line_number):
+                    out.write("")
+                self._write_all(out, replacement_lines)
+
+    def insert_lines(self, line_number: int, insert_lines: List[str]) -> None:
+        """Insert lines after line line_number (1-based), padding short files with empty lines."""
+        line_number = max(line_number, 0)
+        with self._rewrite() as (source, target):
+            out = LineWriter(target)
+            inserted = line_number == 0
+            if inserted:
+                self._write_all(out, insert_lines)
+            count = 0
+            for count, line in enumerate(source, 1):
+                out.write(line.rstrip('\n'))
+                if count == line_number:
+                    self._write_all(out, insert_lines)
+                    inserted = True
+            if count == 0:
+                # An empty file counts as a single empty line
+                out.write("")
+                count = 1
+            if not inserted:
+                for _ in range(count, line_number):
+                    out.write("")
+                self._write_all(out, insert_lines)
+
+    def delete_lines(self, start_line_number: int, end_line_number: int) -> None:
+        """Delete lines start_line_number to end_line_number (1-based, inclusive), keeping the other lines as they are."""
+        with self._rewrite() as (source, target):
+            for count, line in enumerate(source, 1):
+                if count < start_line_number or count > end_line_number:
+                    target.write(line)
+
+    def append_lines(self, append_lines: List[str]) -> None:
+        """Append lines at the end of the file, starting on a new line."""
+        if not os.path.exists(self.file_path):
+            raise FileNotFoundError(f"File {self.file_path} not found")
+        if not append_lines:
+            return
+        needs_newline = False
+        with open(self.file_path, 'rb') as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell() > 0:
+                file.seek(-1, os.SEEK_END)
+                needs_newline = file.read(1) not in (b'\n', b'\r')
+        with open(self.file_path, 'a', encoding='utf-8') as file:
+            if needs_newline:
+                file.write("\n")
+            file.write("\n".join(append_lines))
+
+    def splice(self, offset: int, delete_chars: int, insert_chars: str) -> None:
+        """Delete delete_chars characters at character offset and insert insert_chars in their place."""
+        with self._rewrite() as (source, target):
+            position = 0
+            while position < offset:
+                chunk = source.read(min(CHUNK_SIZE, offset - position))
+                if not chunk:
+                    break
+                target.write(chunk)
+                position += len(chunk)
+            target.write(insert_chars)
+            remaining = delete_chars
+            while remaining > 0:
+                skipped = source.read(min(CHUNK_SIZE, remaining))
+                if not skipped:
+                    break
+                remaining -= len(skipped)
+            shutil.copyfileobj(source, target, CHUNK_SIZE)
+
+    def _write_all(self, out: LineWriter, lines: List[str]) -> None:
+        for line in lines:
+            out.write(line)
+
+    def _open(self) -> TextIO:
+        return open(self.file_path, 'r', encoding='utf-8', errors='replace')
+
+    @contextmanager
+    def _rewrite(self):
+        """Yield (source, target) files and atomically replace the file with target when done."""
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        with self._open() as source:
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as target:
+                    yield source, target
+                shutil.copymode(self.file_path, temp_path)
+                os.replace(temp_path, self.file_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
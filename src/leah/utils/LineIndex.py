@@ -0,0 +1,169 @@
+import bisect
+import codecs
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Generator, List, Optional, Tuple
+
+import numpy as np
+
+SCAN_CHUNK = 64 * 1024 * 1024
+
+
+class LineIndex:
+    """
+    Byte offsets of the lines of a file, for reading line or character ranges with a seek.
+
+    The file is scanned once for newlines and the offset of every STRIDE-th line is
+    kept, so locating a line is an array lookup plus at most STRIDE - 1 newline searches
+    in the memory-mapped file, and the index stays small even for multi-gigabyte logs.
+    Character offsets for read_chars are checkpointed the same way the first time they
+    are needed. Indexes are cached per file and rebuilt when its mtime or size changes.
+
+    Lines are decoded as UTF-8 with undecodable bytes replaced and CRLF endings read as
+    LF, like a file opened in text mode.
+    """
+
+    STRIDE = 1024
+    CACHE_SIZE = 32
+
+    _cache: 'OrderedDict[str, LineIndex]' = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, file_path: str):
+        self.file_path = os.path.abspath(file_path)
+        stat = os.stat(self.file_path)
+        self.signature = (stat.st_mtime_ns, stat.st_size)
+        self.size = stat.st_size
+        self._lock = threading.Lock()
+        self._char_checkpoints: Optional[List[int]] = None
+        self._build()
+
+    @classmethod
+    def for_file(cls, file_path: str) -> 'LineIndex':
+        """Return the cached index of file_path, rebuilding it if the file changed."""
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        with cls._cache_lock:
+            index = cls._cache.get(file_path)
+            if index is not None and index.signature == (stat.st_mtime_ns, stat.st_size):
+                cls._cache.move_to_end(file_path)
+                return index
+        index = cls(file_path)
+        with cls._cache_lock:
+            cls._cache[file_path] = index
+            cls._cache.move_to_end(file_path)
+            while len(cls._cache) > cls.CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        return index
+
+    @property
+    def line_count(self) -> int:
+        return self._line_count
+
+    def read_lines(self, start_line_number: int = 1, end_line_number: Optional[int] = None) -> List[str]:
+        """
+        Read lines start_line_number to end_line_number (1-based, inclusive).
+
+        Returns:
+            List[str]: The lines with their line endings, like readlines()
+        """
+        start_line_number = max(start_line_number, 1)
+        if end_line_number is None or end_line_number > self._line_count:
+            end_line_number = self._line_count
+        if end_line_number < start_line_number:
+            return []
+        with self._map() as data:
+            begin = self._line_offset(data, start_line_number)
+            end = self._line_offset(data, end_line_number + 1)
+            text = self._decode(data[begin:end])
+        # Only split on newlines, str.splitlines also splits on form feeds and other separators
+        lines = [line + '\n' for line in text.split('\n')]
+        if text.endswith('\n'):
+            lines.pop()
+        else:
+            lines[-1] = lines[-1][:-1]
+        return lines
+
+    def iter_lines(self, start_line_number: int = 1) -> Generator[Tuple[int, str], None, None]:
+        """Yield (line_number, line) pairs from start_line_number on, without line endings."""
+        line_number = max(start_line_number, 1)
+        while line_number <= self._line_count:
+            end_line_number = min(line_number + self.STRIDE - 1, self._line_count)
+            for line in self.read_lines(line_number, end_line_number):
+                yield line_number, line.rstrip('\n')
+                line_number += 1
+
+    def read_chars(self, offset: int, length: int) -> str:
+        """Read length characters starting at character offset, counting the raw file contents."""
+        if self.size == 0 or length <= 0:
+            return ""
+        checkpoints = self._chars()
+        with self._map() as data:
+            # Find the last line checkpoint at or before the character offset and decode from there
+            k = max(bisect.bisect_right(checkpoints, offset) - 1, 0)
+            position = int(self._offsets[k])
+            skip = offset - checkpoints[k]
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            parts, have = [], 0
+            while position < self.size and have < skip + length:
+                chunk = decoder.decode(data[position:position + max(length, 65536)], final=False)
+                position += max(length, 65536)
+                parts.append(chunk)
+                have += len(chunk)
+            if position >= self.size:
+                parts.append(decoder.decode(b'', final=True))
+        return "".join(parts)[skip:skip + length]
+
+    def _build(self) -> None:
+        if self.size == 0:
+            self._offsets = np.zeros(1, dtype=np.int64)
+            self._line_count = 0
+            return
+        checkpoints = [np.zeros(1, dtype=np.int64)]
+        newlines = 0
+        with self._map() as data:
+            for chunk_start in range(0, self.size, SCAN_CHUNK):
+                count = min(SCAN_CHUNK, self.size - chunk_start)
+                chunk = np.frombuffer(data, dtype=np.uint8, count=count, offset=chunk_start)
+                positions = np.flatnonzero(chunk == 10)
+                # Line k + 1 starts after newline k (0-based), keep the starts of lines 1 + n * STRIDE
+                first = (-newlines - 1) % self.STRIDE
+                checkpoints.append(positions[first::self.STRIDE].astype(np.int64) + chunk_start + 1)
+                newlines += len(positions)
+                del chunk
+            last_byte = data[self.size - 1]
+        self._offsets = np.concatenate(checkpoints)
+        self._line_count = newlines + (0 if last_byte == 10 else 1)
+
+    def _line_offset(self, data: mmap.mmap, line_number: int) -> int:
+        """Byte offset where line line_number starts, or the file size past the last line."""
+        if line_number > self._line_count:
+            return self.size
+        k, remainder = divmod(line_number - 1, self.STRIDE)
+        position = int(self._offsets[k])
+        for _ in range(remainder):
+            position = data.find(b'\n', position) + 1
+        return position
+
+    def _chars(self) -> List[int]:
+        """Character offset of every checkpointed line, computed on first use."""
+        with self._lock:
+            if self._char_checkpoints is None:
+                checkpoints, chars = [], 0
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                with self._map() as data:
+                    for k, start in enumerate(self._offsets.tolist()):
+                        checkpoints.append(chars)
+                        end = int(self._offsets[k + 1]) if k + 1 < len(self._offsets) else self.size
+                        chars += len(decoder.decode(data[start:end], final=end == self.size))
+                self._char_checkpoints = checkpoints
+            return self._char_checkpoints
+
+    def _decode(self, data: bytes) -> str:
+        return data.decode('utf-8', errors='replace').replace('\r\n', '\n')
+
+    def _map(self) -> mmap.mmap:
+        with open(self.file_path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
@@ -1,8 +1,13 @@
 import os
 from datetime import datetime
 from datetime import timedelta
+from leah.utils.ConversationIndex import ConversationIndex
+from leah.utils.InvertedIndex import SearchHit
 from leah.utils.LogItem import LogCollection
-import re
+from leah.utils.LogQuery import LogQuery
+from leah.utils.LogWriter import LogWriter
+
+REPORT_SIZE = 50
 
 class LogManager:
     def __init__(self, config_manager):
@@ -13,6 +18,8 @@ class LogManager:
             config_manager (LocalConfigManager): The LocalConfigManager instance to use for path management
         """
         self.config_manager = config_manager
+        self.writer = LogWriter.get_instance()
+        self.query = LogQuery()
         self.logs_directory = self.config_manager.get_persona_path("logs")
         if not os.path.exists(self.logs_directory):
             os.makedirs(self.logs_directory, exist_ok=True)
@@ -30,57 +37,45 @@ class LogManager:
         log_entry = f"[{timestamp}] {message_type.upper()}: {message}\n"
         
 
-        # Create a log file for the current date
-        current_date = datetime.now().strftime('%Y-%m-%d')
+        # system.log is rotated by size and date, old segments are gzipped
         log_file = os.path.join(self.logs_directory, f"system.log")
         
-        # Append the log entry to the file
-        with open(log_file, 'a', encoding='utf-8') as file:
-            file.write(log_entry) 
+        # Queue the log entry, the writer thread appends it to the file
+        self.writer.write(log_file, log_entry, rotate=True)
 
-    def log_index_item(self, term: str, message: str) -> None:
+    def get_conversation_index(self) -> ConversationIndex:
         """
-        Log an index item with a timestamp.
+        Get the keyword index of this persona's conversations.
+
+        The index is created on first use, importing the per-term log files of logs/index.
+        """
+        db_path = os.path.join(self.logs_directory, "conversations.db")
+        is_new = not os.path.exists(db_path)
+        conversation_index = ConversationIndex.open(db_path)
+        index_dir = os.path.join(self.logs_directory, "index")
+        if is_new and os.path.isdir(index_dir):
+            print(f"Imported {conversation_index.import_term_logs(index_dir)} exchanges from {index_dir}")
+        return conversation_index
+
+    def index_exchange(self, query: str, response: str, terms: list[str] = None) -> list[str]:
+        """
+        Index a user/assistant exchange for search_index.
         
         Args:
-            term (str): The term to log
-            message (str): The message to log
-            persona (str): The persona name to organize logs under (default: "default")
+            query (str): The user's message
+            response (str): The assistant's response
+            terms (list[str]): Extra index terms to file the exchange under
+
+        Returns:
+            list[str]: The terms the exchange was indexed under
         """
-        # Sanitize the term by replacing special characters with underscores
-        term = re.sub(r'[^a-zA-Z0-9]', '_', term.lower())
-        # Remove consecutive underscores
-        term = re.sub(r'_+', '_', term)
-        # Remove leading/trailing underscores
-        term = term.strip('_')
-        
-        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-        message = message.replace("\n", "\\n")
-        log_entry = f"[{timestamp}] {message}\n"
+        return self.get_conversation_index().add_exchange(query, response, terms)
         
-        # Create a log file for the current term in the logs/index/persona directory
-        index_dir = os.path.join(self.logs_directory, "index")
-        if not os.path.exists(index_dir):
-            os.makedirs(index_dir, exist_ok=True)
-        log_file = os.path.join(index_dir, f"{term}.log")
-        with open(log_file, 'a', encoding='utf-8') as file:
-            file.write(log_entry)
-        
-    def search_log_item(self, term: str) -> list[str]:
+    def search_index(self, terms: list[str], limit: int = 20) -> list[SearchHit]:
         """
-        Search the log for an index item with a timestamp.
+        Search the indexed exchanges for any of the terms, most relevant first.
         """
-        output = []
-        term = term.strip().lower().replace(" ", "_")
-        log_file = os.path.join(self.logs_directory, "index", f"{term}.log")
-        print("Searching for log file: " + log_file)
-        if not os.path.exists(log_file):
-            return []
-        with open(log_file, 'r', encoding='utf-8') as file:
-            print("Found log file: " + log_file)
-            for line in file:
-                output.append(line.strip())
-        return list(set(output))
+        return self.get_conversation_index().search(terms, limit)
 
 
     def log_chat(self, message_type: str, message: str) -> None:
@@ -102,35 +97,24 @@ class LogManager:
         
         # Create persona-specific directory under logs/chat/
         chat_dir = os.path.join(self.logs_directory, "chat")
-        if not os.path.exists(chat_dir):
-            os.makedirs(chat_dir, exist_ok=True)
         
         # Create a log file for the current date
         current_date = datetime.now().strftime('%Y-%m-%d')
         log_file = os.path.join(chat_dir, f"chat_{current_date}.log")
         
-        # Append the log entry to the file
-        with open(log_file, 'a', encoding='utf-8') as file:
-            file.write(log_entry) 
+        # Queue the log entry, the writer thread appends it to the file
+        self.writer.write(log_file, log_entry)
 
 
 
     def get_all_indexes(self, persona: str) -> list[str]:
         """
-        Get a list of all log file names in the logs/index directory without extensions.
+        Get a list of all terms that conversations are indexed under.
         
         Returns:
-            list[str]: A list of log file names without extensions.
+            list[str]: A list of index terms.
         """
-        index_dir = os.path.join(self.logs_directory, "index")
-        if not os.path.exists(index_dir):
-            return []
-        log_files = []
-        for root, _, files in os.walk(index_dir):
-            for file in files:
-                file_name, _ = os.path.splitext(file)
-                log_files.append(file_name)
-        return log_files 
+        return self.get_conversation_index().top_keywords(-1)
 
     def get_logs_for_days(self, days: int) -> list[str]:
         """
@@ -143,46 +127,31 @@ class LogManager:
         Returns:
             list[str]: A list of log file paths.
         """
+        # Make sure queued entries are on disk before reading
+        self.writer.flush()
         log_entries = []
         chat_dir = os.path.join(self.logs_directory, "chat")
         if not os.path.exists(chat_dir):
             return log_entries
 
+        # Daily files newest first, only the most recent entries that make it into the report are read
         current_date = datetime.now().date()
+        log_files = []
         for i in range(days + 1):
             date_to_check = current_date - timedelta(days=i)
-            log_file = os.path.join(chat_dir, f"chat_{date_to_check.strftime('%Y-%m-%d')}.log")
-            if os.path.exists(log_file):
-                with open(log_file, 'r', encoding='utf-8') as file:
-                    for line in file:
-                        log_entries.append(" ".join(line.split(" ")[:200]))        
-        log_collection = LogCollection.fromLogLines(log_entries)
-        return log_collection.generate_report()
+            log_files.append(os.path.join(chat_dir, f"chat_{date_to_check.strftime('%Y-%m-%d')}.log"))
+        log_collection = LogCollection()
+        log_collection.add_logs(self.query.recent(log_files, REPORT_SIZE))
+        return log_collection.generate_report(REPORT_SIZE)
 
     def get_largest_index_logs(self, num_logs: int = 100) -> list[str]:
         """
-        Get the largest index logs sorted from largest to smallest.
+        Get the index terms with the most conversations, sorted from most to least.
 
         Args:
-            persona (str): The persona name to filter logs.
-            num_logs (int): The number of log files to return (default: 100).
+            num_logs (int): The number of terms to return (default: 100).
 
         Returns:
-            list[str]: A list of the largest log file names without extensions, sorted by size.
+            list[str]: A list of index terms.
         """
-        index_dir = os.path.join(self.logs_directory, "index")
-        if not os.path.exists(index_dir):
-            return []
-
-        log_files = []
-        for root, _, files in os.walk(index_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_size = os.path.getsize(file_path)
-                log_files.append((file, file_size))
-
-        # Sort log files by size in descending order
-        log_files.sort(key=lambda x: x[1], reverse=True)
-
-        # Return the largest log file names without extensions, up to num_logs
-        return [os.path.splitext(file)[0] for file, _ in log_files[:min(num_logs, len(log_files))]]
+        return self.get_conversation_index().top_keywords(num_logs)
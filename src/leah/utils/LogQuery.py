@@ -0,0 +1,156 @@
+import heapq
+import os
+import threading
+from collections import OrderedDict
+from typing import Generator, List, Optional
+
+from leah.utils.LogItem import LogItem
+
+BLOCK_SIZE = 65536
+
+
+def parse_log_line(line: str) -> Optional[LogItem]:
+    """Parse a chat log line, truncated to its first 200 words, or None if it is not a log entry."""
+    try:
+        return LogItem.fromLogLine(" ".join(line.split(" ")[:200]))
+    except ValueError:
+        return None
+
+
+def reverse_lines(file_path: str, block_size: int = BLOCK_SIZE) -> Generator[str, None, None]:
+    """Yield the lines of a file from last to first, reading it backwards in blocks."""
+    with open(file_path, 'rb') as file:
+        position = file.seek(0, os.SEEK_END)
+        remainder = b''
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            file.seek(position)
+            block = file.read(step) + remainder
+            lines = block.split(b'\n')
+            # The first piece may be the end of a line that starts in the previous block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line.decode('utf-8', errors='replace')
+        if remainder:
+            yield remainder.decode('utf-8', errors='replace')
+
+
+class LogQuery:
+    """
+    Reads parsed entries from append-only log files, newest first.
+
+    Parsed entries are cached per file. A cached file that has grown since it was parsed
+    only has its new bytes parsed, so the log of the current day is never parsed twice.
+    Large files that are not cached yet are read backwards from the end when only their
+    most recent entries are needed.
+    """
+
+    CACHE_SIZE = 400
+    TAIL_THRESHOLD = 1048576
+
+    _cache: 'OrderedDict[str, tuple]' = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def file_items(self, file_path: str) -> List[LogItem]:
+        """
+        Get the entries of a log file in file order.
+
+        Args:
+            file_path (str): The log file
+
+        Returns:
+            List[LogItem]: The parsed entries
+        """
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._cache_lock:
+            cached = self._cache.get(file_path)
+            if cached is not None:
+                self._cache.move_to_end(file_path)
+        if cached is not None and cached[0] == signature:
+            return cached[2]
+
+        items, offset = [], 0
+        if cached is not None and cached[1] <= stat.st_size:
+            # Log files are only appended to, parse the new bytes after the last complete line
+            items, offset = list(cached[2]), cached[1]
+        with open(file_path, 'rb') as file:
+            file.seek(offset)
+            data = file.read(stat.st_size - offset)
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].decode('utf-8', errors='replace').splitlines():
+            item = parse_log_line(line)
+            if item:
+                items.append(item)
+        with self._cache_lock:
+            self._cache[file_path] = (signature, offset + end, items)
+            self._cache.move_to_end(file_path)
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return items
+
+    def tail_items(self, file_path: str, limit: int) -> List[LogItem]:
+        """
+        Get the last limit entries of a log file in file order.
+
+        Args:
+            file_path (str): The log file
+            limit (int): The number of entries
+
+        Returns:
+            List[LogItem]: The parsed entries
+        """
+        if limit <= 0:
+            return []
+        with self._cache_lock:
+            cached = file_path in self._cache
+        if cached or os.path.getsize(file_path) <= self.TAIL_THRESHOLD:
+            return self.file_items(file_path)[-limit:]
+        items = []
+        lines = reverse_lines(file_path)
+        with open(file_path, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b'\n':
+                # Like file_items, skip a last line that is still being written
+                next(lines, None)
+        for line in lines:
+            item = parse_log_line(line)
+            if item:
+                items.append(item)
+                if len(items) >= limit:
+                    break
+        items.reverse()
+        return items
+
+    def recent(self, file_paths: List[str], limit: int) -> List[LogItem]:
+        """
+        Get the most recent distinct entries of a set of log files, oldest first.
+
+        Args:
+            file_paths (List[str]): The log files, newest first, e.g. one per day
+            limit (int): The maximum number of entries
+
+        Returns:
+            List[LogItem]: Up to limit entries sorted by date
+        """
+        per_file = []
+        seen = set()
+        for file_path in file_paths:
+            if len(seen) >= limit:
+                break
+            if not os.path.exists(file_path):
+                continue
+            items = sorted(self.tail_items(file_path, limit), key=lambda item: item.date)
+            per_file.append(items)
+            seen.update((item.date, item.message) for item in items)
+
+        # Each file is sorted, so a k-way merge orders them without sorting everything again
+        result, seen = [], set()
+        for item in heapq.merge(*per_file, key=lambda item: item.date):
+            identifier = (item.date, item.message)
+            if identifier not in seen:
+                seen.add(identifier)
+                result.append(item)
+        return result[-limit:]
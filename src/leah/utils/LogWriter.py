@@ -0,0 +1,197 @@
+import atexit
+import glob
+import gzip
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List
+
+from leah.config.GlobalConfig import GlobalConfig
+
+
+class LogWriter:
+    """
+    Appends log entries to files from a background thread.
+
+    Callers only put entries on a bounded in-memory queue, so logging never waits on the
+    disk. The writer thread drains the queue every flush_interval seconds (or as soon as
+    it holds max_batch entries) and writes all pending entries of a file with a single
+    append. When the queue is full entries are dropped rather than blocking the caller.
+
+    Files written with rotate=True are rotated when they reach max_bytes or when the
+    date changes: the file is renamed with a timestamp suffix, compressed with gzip and
+    only the newest backup_count segments are kept.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, queue_size: int = 10000, flush_interval: float = 1.0, max_batch: int = 1000,
+                 max_bytes: int = 10485760, backup_count: int = 10, compress: bool = True):
+        """
+        Initialize the writer and start its thread.
+
+        Args:
+            queue_size (int): Maximum number of entries waiting to be written
+            flush_interval (float): Seconds between writes of the queued entries
+            max_batch (int): Number of queued entries that triggers a write before the interval
+            max_bytes (int): Size at which rotated files are rotated, 0 to only rotate by date
+            backup_count (int): Number of rotated segments kept per file
+            compress (bool): Whether rotated segments are compressed with gzip
+        """
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.dropped = 0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def get_instance(cls) -> 'LogWriter':
+        """
+        Get the shared writer, configured from the log_writer section of config.json.
+
+        Returns:
+            LogWriter: The singleton instance
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    config = GlobalConfig().get_log_writer_config()
+                    cls._instance = LogWriter(
+                        queue_size=config.get('queue_size', 10000),
+                        flush_interval=config.get('flush_interval', 1.0),
+                        max_batch=config.get('max_batch', 1000),
+                        max_bytes=config.get('max_bytes', 10485760),
+                        backup_count=config.get('backup_count', 10),
+                        compress=config.get('compress', True))
+                    atexit.register(cls._instance.shutdown)
+        return cls._instance
+
+    def write(self, file_path: str, entry: str, rotate: bool = False) -> None:
+        """
+        Queue entry to be appended to file_path, without waiting for the write.
+
+        Args:
+            file_path (str): The log file, created along with its directory if needed
+            entry (str): The text to append, including its trailing newline
+            rotate (bool): Whether the file is rotated by size and date
+        """
+        if self._stopped:
+            self._write_batch({file_path: [entry]}, {file_path} if rotate else set())
+            return
+        try:
+            self.queue.put_nowait((file_path, entry, rotate))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                print(f"Log queue is full, dropped {self.dropped} log entries")
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Wait until everything queued so far has been written.
+
+        Returns:
+            bool: True if the entries were written within timeout
+        """
+        if self._stopped or threading.current_thread() is self._thread:
+            return True
+        done = threading.Event()
+        try:
+            self.queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def shutdown(self) -> None:
+        """Write the queued entries and stop the writer thread."""
+        if self._stopped:
+            return
+        self.flush()
+        self._stopped = True
+        self.queue.put(None)
+        self._thread.join(timeout=10)
+
+    def _run(self) -> None:
+        while True:
+            batch: Dict[str, List[str]] = OrderedDict()
+            rotated, waiters = set(), []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            count = 0
+            while count < self.max_batch:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    # Flush requests are answered once everything queued before them is written
+                    waiters.append(item)
+                    break
+                file_path, entry, rotate = item
+                batch.setdefault(file_path, []).append(entry)
+                if rotate:
+                    rotated.add(file_path)
+                count += 1
+            if batch:
+                self._write_batch(batch, rotated)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+    def _write_batch(self, batch: Dict[str, List[str]], rotated: set) -> None:
+        for file_path, entries in batch.items():
+            try:
+                if file_path in rotated:
+                    self._rotate_if_needed(file_path)
+                directory = os.path.dirname(file_path)
+                if directory and not os.path.exists(directory):
+                    os.makedirs(directory, exist_ok=True)
+                with open(file_path, 'a', encoding='utf-8') as file:
+                    file.write("".join(entries))
+            except Exception as e:
+                print(f"Error writing log {file_path}: {e}")
+
+    def _rotate_if_needed(self, file_path: str) -> None:
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return
+        if stat.st_size == 0:
+            return
+        last_write = datetime.fromtimestamp(stat.st_mtime)
+        too_large = self.max_bytes and stat.st_size >= self.max_bytes
+        if not too_large and last_write.date() == datetime.now().date():
+            return
+        base, ext = os.path.splitext(file_path)
+        stamp = last_write.strftime('%Y-%m-%d_%H-%M-%S')
+        segment, n = f"{base}.{stamp}{ext}", 1
+        while os.path.exists(segment) or os.path.exists(segment + ".gz"):
+            segment, n = f"{base}.{stamp}-{n}{ext}", n + 1
+        os.replace(file_path, segment)
+        if self.compress:
+            with open(segment, 'rb') as source, gzip.open(segment + ".gz", 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.remove(segment)
+        self._remove_old_segments(base, ext)
+
+    def _remove_old_segments(self, base: str, ext: str) -> None:
+        segments = glob.glob(f"{glob.escape(base)}.*{ext}") + glob.glob(f"{glob.escape(base)}.*{ext}.gz")
+        segments.sort(key=lambda segment: os.stat(segment).st_mtime_ns)
+        for segment in segments[:max(len(segments) - self.backup_count, 0)]:
+            try:
+                os.remove(segment)
+            except OSError as e:
+                print(f"Error removing old log segment {segment}: {e}")
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from leah.utils.ConversationStore import ConversationStore
+from leah.utils.NoteVersionStore import atomic_write
+
+MEMORIES_NOTE = "memories.txt"
+STATE_FILE = "memory_builder.json"
+
+NOTE_INSTRUCTIONS = """
+    - Make sure to keep a profile of the user and their interests.
+    - Make sure to keep a profile of your own knowledge, particularily any information about the user.
+    - Make sure to keep a profile of your self and you relationship with the user.
+    - These notes are written from your own perspective and about the user.
+    - Remove duplicate information.
+    - Make sure to include any files that are relevant to the conversation.
+    - Use a format that is easy for you to use for reference later.
+    - Don't include any other text than the notes."""
+
+
+def delta_template(persona: str, memories: str, conversation: str) -> str:
+    return f"""You are {persona}. You are a rigorous and detailed note taker.
+
+Your current notes:
+
+START OF CURRENT NOTES
+{memories}
+END OF CURRENT NOTES
+
+The new part of the conversation:
+
+START OF CONVERSATION
+{conversation}
+END OF CONVERSATION
+
+Instructions:
+
+    - Create detailed notes about the new part of the conversation only.
+    - Do not repeat anything that is already in the current notes.{NOTE_INSTRUCTIONS}
+    - The reply should be no longer than 200 words.
+"""
+
+
+def fold_template(persona: str, notes: List[str]) -> str:
+    joined = "\n\n".join(notes)
+    return f"""You are {persona}. You are a rigorous and detailed note taker.
+
+Here are notes you took over time, oldest first:
+
+START OF NOTES
+{joined}
+END OF NOTES
+
+Instructions:
+
+    - Combine the notes above into one set of notes, newer information replaces older information.{NOTE_INSTRUCTIONS}
+    - The reply should be no longer than 500 words.
+"""
+
+
+class MemoryBuilder:
+    """
+    Keeps a persona's memories note up to date with its conversations, incrementally.
+
+    For every conversation the id of the last summarized message is kept as a watermark,
+    so a run only sends the messages added since then (plus the current notes) to the
+    LLM, which writes a short summary of them. Summaries form a hierarchy: new ones go
+    to level 0, and once a level holds fanout summaries they are folded into a single
+    summary one level up; the top level is folded into itself. The memories note is
+    the levels rendered oldest first, so the cost of a run depends on the new messages
+    and the bounded size of the notes, not on the length of the conversation.
+    """
+
+    _locks: Dict[str, threading.Lock] = {}
+    _locks_lock = threading.Lock()
+
+    def __init__(self, config_manager, persona: str, summarize: Optional[Callable[[str], str]] = None,
+                 fanout: int = 6, max_levels: int = 3, max_delta_chars: int = 24000):
+        """
+        Initialize the builder.
+
+        Args:
+            config_manager (LocalConfigManager): The config manager of the user and persona
+            persona (str): The persona whose memories are built
+            summarize (Callable[[str], str]): Sends a prompt to the LLM, defaults to the persona's LlmConnector
+            fanout (int): Number of summaries on a level that are folded into one
+            max_levels (int): Number of summary levels
+            max_delta_chars (int): New messages are summarized in slices of at most this many characters
+        """
+        self.config_manager = config_manager
+        self.persona = persona
+        self.notes_manager = config_manager.get_notes_manager()
+        self.fanout = max(2, fanout)
+        self.max_levels = max(1, max_levels)
+        self.max_delta_chars = max_delta_chars
+        if summarize is None:
+            from leah.llm.LlmConnector import LlmConnector
+            summarize = LlmConnector(config_manager, persona).query
+        self.summarize = summarize
+        self.state_path = os.path.join(self.notes_manager.memories_directory, STATE_FILE)
+        with self._locks_lock:
+            # One update at a time per memories note
+            self._lock = self._locks.setdefault(os.path.abspath(self.state_path), threading.Lock())
+
+    def update(self, conversation_id: str) -> bool:
+        """
+        Summarize the messages of a conversation added since the last update.
+
+        Returns:
+            bool: True if there were new messages and the memories note was updated
+        """
+        history = ConversationStore(self.config_manager.get_file_manager()).load_conversation(conversation_id) or []
+        with self._lock:
+            state = self._load_state()
+            watermark = state["watermarks"].get(conversation_id)
+            delta = self._messages_after(history, watermark)
+            if not delta:
+                return False
+            for text in self._slices(delta):
+                summary = self.summarize(delta_template(self.persona, self.render(state), text)).strip()
+                if summary:
+                    state["levels"][0].append(summary)
+                    self._fold(state)
+            state["watermarks"][conversation_id] = delta[-1].id
+            self.notes_manager.put_note(MEMORIES_NOTE, self.render(state))
+            self._save_state(state)
+            return True
+
+    def render(self, state: Dict) -> str:
+        """Render the summary levels as the memories note, oldest (highest level) first."""
+        entries = [entry for level in reversed(state["levels"]) for entry in level]
+        return "\n\n".join(entries) if entries else "No previous notes."
+
+    def _fold(self, state: Dict) -> None:
+        levels = state["levels"]
+        for i in range(self.max_levels):
+            if len(levels[i]) < self.fanout:
+                continue
+            folded = self.summarize(fold_template(self.persona, levels[i])).strip()
+            if not folded:
+                continue
+            if i + 1 < self.max_levels:
+                levels[i + 1].append(folded)
+                levels[i] = []
+            else:
+                levels[i] = [folded]
+
+    def _messages_after(self, history: List, watermark: Optional[str]) -> List:
+        messages = [message for message in history
+                    if message.type in ("human", "ai") and message.id and getattr(message, "name", None) != "hidden"]
+        if watermark:
+            for i, message in enumerate(messages):
+                if message.id == watermark:
+                    return messages[i + 1:]
+            # The history is trimmed from the front, so a missing watermark means every message left is new
+        return messages
+
+    def _slices(self, messages: List) -> List[str]:
+        slices, current, size = [], [], 0
+        for message in messages:
+            line = ("User: " if message.type == "human" else "You: ") + message.text()
+            if current and size + len(line) > self.max_delta_chars:
+                slices.append("\n\n".join(current))
+                current, size = [], 0
+            current.append(line[:self.max_delta_chars])
+            size += len(line)
+        if current:
+            slices.append("\n\n".join(current))
+        return slices
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            # Start from the existing memories note, built before summaries were kept
+            memories = self.notes_manager.get_note(MEMORIES_NOTE)
+            state = {"watermarks": {}, "levels": [[] for _ in range(self.max_levels)]}
+            if memories and memories.strip() != "No previous notes.":
+                state["levels"][-1].append(memories.strip())
+        while len(state["levels"]) < self.max_levels:
+            state["levels"].append([])
+        return state
+
+    def _save_state(self, state: Dict) -> None:
+        atomic_write(self.state_path, json.dumps(state, indent=2).encode('utf-8'))
@@ -0,0 +1,257 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+LINE_PATTERN = re.compile(r'[^\n]*\n|[^\n]+')
+MIN_CHUNK_SIZE = 256
+AVERAGE_CHUNK_SIZE = 1024
+MAX_CHUNK_SIZE = 8192
+
+
+def split_chunks(content: str) -> List[str]:
+    """
+    Split content into chunks at content-defined line boundaries.
+
+    A chunk ends after a line whose CRC falls below a threshold proportional to the line's
+    length, so where chunks end depends only on the nearby text: prepending, inserting or
+    removing lines changes the chunks around the edit and leaves the others identical.
+    Chunks average AVERAGE_CHUNK_SIZE characters and lines longer than MAX_CHUNK_SIZE are
+    cut into pieces.
+    """
+    chunks, current, size = [], [], 0
+    for line in LINE_PATTERN.findall(content):
+        for start in range(0, len(line), MAX_CHUNK_SIZE):
+            piece = line[start:start + MAX_CHUNK_SIZE]
+            current.append(piece)
+            size += len(piece)
+            if size >= MAX_CHUNK_SIZE or (
+                    size >= MIN_CHUNK_SIZE and zlib.crc32(piece.encode('utf-8')) % AVERAGE_CHUNK_SIZE < len(piece)):
+                chunks.append("".join(current))
+                current, size = [], 0
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Write data to path through a temporary file, so readers never see a partial file."""
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class NoteVersionStore:
+    """
+    Version history of notes, stored as content-addressed chunks.
+
+    A version is split into content-defined chunks (see split_chunks), and each chunk is
+    stored once under the hash of its text as a zlib-compressed object, so saving a note
+    that changed in one place stores about one new object. Each note has a version index
+    with one JSON line per version; after the first, a line only lists the chunk hashes
+    that differ from the previous version (a "delta" of the common prefix length, common
+    suffix length and the hashes in between). Objects and rewritten indexes are written
+    atomically.
+
+    Old versions are pruned by a retention policy: the newest keep_versions versions are
+    kept, versions older than keep_days days are dropped (the newest version always
+    stays), and objects that no version refers to any more are deleted. Pruning reads the
+    index of every note, so it waits until prune_batch versions can be dropped.
+
+    Use NoteVersionStore.open(directory) to share one store per directory within a process.
+    """
+
+    _stores: Dict[str, 'NoteVersionStore'] = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, directory: str, keep_versions: int = 100, keep_days: float = 0, prune_batch: int = 10):
+        """
+        Initialize the store.
+
+        Args:
+            directory (str): The directory holding the objects and version indexes
+            keep_versions (int): Number of versions kept per note, 0 to keep all
+            keep_days (float): Versions older than this many days are dropped, 0 to keep them
+            prune_batch (int): Number of versions that must be due for removal before pruning runs
+        """
+        self.directory = directory
+        self.objects_directory = os.path.join(directory, "objects")
+        self.versions_directory = os.path.join(directory, "versions")
+        self.keep_versions = keep_versions
+        self.keep_days = keep_days
+        self.prune_batch = max(1, prune_batch)
+        self._lock = threading.RLock()
+        os.makedirs(self.objects_directory, exist_ok=True)
+        os.makedirs(self.versions_directory, exist_ok=True)
+
+    @classmethod
+    def open(cls, directory: str, keep_versions: int = 100, keep_days: float = 0,
+             prune_batch: int = 10) -> 'NoteVersionStore':
+        """Return the shared store for directory, opening it on first use."""
+        directory = os.path.abspath(directory)
+        with cls._stores_lock:
+            store = cls._stores.get(directory)
+            if store is None:
+                store = cls(directory, keep_versions, keep_days, prune_batch)
+                cls._stores[directory] = store
+            return store
+
+    def save(self, note_name: str, content: str, timestamp: Optional[float] = None) -> int:
+        """
+        Record content as the newest version of a note, unless it equals the newest version.
+
+        Returns:
+            int: The version number
+        """
+        with self._lock:
+            # Objects are written under the lock so garbage collection cannot remove one before it is referenced
+            hashes = [self._put_object(chunk) for chunk in split_chunks(content)]
+            versions = self._read_versions(note_name)
+            if versions and versions[-1]["chunks"] == hashes:
+                return versions[-1]["version"]
+            record = {"version": versions[-1]["version"] + 1 if versions else 1,
+                      "timestamp": timestamp if timestamp is not None else time.time(),
+                      "size": len(content), "chunks": hashes}
+            line = self._encode(record, versions[-1] if versions else None)
+            with open(self._versions_path(note_name), 'a+b') as file:
+                # Start a new line if a crash cut the last append short
+                if file.tell() > 0:
+                    file.seek(-1, os.SEEK_END)
+                    if file.read(1) != b"\n":
+                        line = "\n" + line
+                file.write(line.encode('utf-8'))
+            versions.append(record)
+            if self._expired(versions):
+                self._prune(note_name, versions)
+            return record["version"]
+
+    def versions(self, note_name: str) -> List[Dict]:
+        """
+        List the stored versions of a note, oldest first.
+
+        Returns:
+            List[Dict]: The version number, timestamp and size of each version
+        """
+        with self._lock:
+            return [{"version": record["version"], "timestamp": record["timestamp"], "size": record["size"]}
+                    for record in self._read_versions(note_name)]
+
+    def get(self, note_name: str, version: Optional[int] = None) -> Optional[str]:
+        """Return the content of a version of a note, the newest if version is None, or None if there is no such version."""
+        with self._lock:
+            versions = self._read_versions(note_name)
+            if version is None:
+                record = versions[-1] if versions else None
+            else:
+                record = next((record for record in versions if record["version"] == version), None)
+            if record is None:
+                return None
+            return "".join(self._get_object(digest) for digest in record["chunks"])
+
+    def notes(self) -> List[str]:
+        """Return the names of the notes that have versions."""
+        return sorted(os.path.splitext(name)[0] for name in os.listdir(self.versions_directory) if name.endswith(".jsonl"))
+
+    def _expired(self, versions: List[Dict]) -> bool:
+        if self.keep_versions and len(versions) >= self.keep_versions + self.prune_batch:
+            return True
+        if not self.keep_days or len(versions) <= 1:
+            return False
+        cutoff = time.time() - self.keep_days * 86400
+        expired = sum(1 for record in versions[:-1] if record["timestamp"] < cutoff)
+        # A note that is rarely saved is still pruned once its oldest version is twice as old as allowed
+        return expired >= self.prune_batch or versions[0]["timestamp"] < cutoff - self.keep_days * 86400
+
+    def _prune(self, note_name: str, versions: List[Dict]) -> None:
+        kept = versions[-self.keep_versions:] if self.keep_versions else list(versions)
+        if self.keep_days:
+            cutoff = time.time() - self.keep_days * 86400
+            kept = [record for record in kept[:-1] if record["timestamp"] >= cutoff] + kept[-1:]
+        lines = [self._encode(record, previous) for previous, record in zip([None] + kept[:-1], kept)]
+        atomic_write(self._versions_path(note_name), "".join(lines).encode('utf-8'))
+        dropped = {digest for record in versions for digest in record["chunks"]}
+        dropped -= {digest for record in kept for digest in record["chunks"]}
+        if dropped:
+            self._collect_garbage(dropped)
+
+    @staticmethod
+    def _encode(record: Dict, previous: Optional[Dict]) -> str:
+        """Return the index line of record, as a delta from the previous version if there is one."""
+        if previous is None:
+            return json.dumps(record) + "\n"
+        chunks, base = record["chunks"], previous["chunks"]
+        prefix = 0
+        while prefix < min(len(chunks), len(base)) and chunks[prefix] == base[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < min(len(chunks), len(base)) - prefix and chunks[-1 - suffix] == base[-1 - suffix]:
+            suffix += 1
+        stored = {key: value for key, value in record.items() if key != "chunks"}
+        stored["base"] = previous["version"]
+        stored["delta"] = [prefix, suffix, chunks[prefix:len(chunks) - suffix]]
+        return json.dumps(stored) + "\n"
+
+    def _collect_garbage(self, candidates: set) -> None:
+        """Delete the candidate objects that no version of any note refers to."""
+        for name in self.notes():
+            for record in self._read_versions(name):
+                candidates.difference_update(record["chunks"])
+                if not candidates:
+                    return
+        for digest in candidates:
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def _put_object(self, chunk: str) -> str:
+        data = chunk.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, zlib.compress(data))
+        return digest
+
+    def _get_object(self, digest: str) -> str:
+        with open(self._object_path(digest), 'rb') as file:
+            return zlib.decompress(file.read()).decode('utf-8')
+
+    def _read_versions(self, note_name: str) -> List[Dict]:
+        versions = []
+        try:
+            with open(self._versions_path(note_name), 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash mid-append
+                        continue
+                    if "delta" in record:
+                        # A delta is only valid against the version it was computed from
+                        if not versions or versions[-1]["version"] != record.pop("base"):
+                            continue
+                        prefix, suffix, middle = record.pop("delta")
+                        base = versions[-1]["chunks"]
+                        record["chunks"] = base[:prefix] + middle + base[len(base) - suffix:]
+                    versions.append(record)
+        except FileNotFoundError:
+            pass
+        return versions
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_directory, digest[:2], digest[2:])
+
+    def _versions_path(self, note_name: str) -> str:
+        return os.path.join(self.versions_directory, note_name + ".jsonl")
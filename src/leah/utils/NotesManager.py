@@ -1,6 +1,20 @@
 import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from leah.config.GlobalConfig import GlobalConfig
+from leah.utils.InvertedIndex import InvertedIndex, SearchHit
+from leah.utils.NoteVersionStore import NoteVersionStore, atomic_write
+
+BACKUP_PATTERN = re.compile(r'^(.+)_(\d{14})\.note$')
 
 class NotesManager:
+    # Backup directories whose legacy backups were already imported by this process
+    _imported_directories = set()
+    _import_lock = threading.Lock()
+
     def __init__(self, config_manager):
         """
         Initialize the NotesManager with a LocalConfigManager instance.
@@ -19,14 +33,24 @@ class NotesManager:
         self.memories_directory = os.path.join(self.notes_directory, "memories")
         if not os.path.exists(self.memories_directory):
             os.makedirs(self.memories_directory, exist_ok=True)
-        if not os.path.exists(os.path.join(self.backup_directory, "memories")):
-            os.makedirs(os.path.join(self.backup_directory, "memories"), exist_ok=True)
+        # Every version written through put_note is kept in a deduplicated version store
+        notes_config = GlobalConfig().get_notes_config()
+        self.versions = NoteVersionStore.open(self.backup_directory,
+                                              keep_versions=notes_config.get('keep_versions', 100),
+                                              keep_days=notes_config.get('keep_days', 0),
+                                              prune_batch=notes_config.get('prune_batch', 10))
+        # get_notes_manager() creates a NotesManager per call, so only the first one imports
+        with NotesManager._import_lock:
+            if self.versions.directory not in NotesManager._imported_directories:
+                self._import_backups()
+                NotesManager._imported_directories.add(self.versions.directory)
+        # The full-text index lives next to the notes directory so it is never listed as a note
+        self.index = InvertedIndex.open(self.config_manager.get_path("notes_index.db"))
 
     def get_note(self, note_name: str) -> str:
         """Retrieve the content of a specific note file."""
-        if not note_name.endswith(".note"):
-            note_name += ".note"
-        note_path = os.path.join(self.notes_directory, note_name)
+        # Names are resolved like put_note does, so a note can be read back under the name it was written with
+        note_path = os.path.join(self.notes_directory, self._note_file_name(note_name))
         if os.path.exists(note_path):
             with open(note_path, 'r', encoding='utf-8') as file:
                 return file.read()
@@ -36,19 +60,51 @@ class NotesManager:
     def put_note(self, note_name: str, content: str) -> None:
         """Store content into a specific note file."""
         # Check if note exists and create backup if it does
-        note_name = os.path.basename(note_name).strip()
-        if not note_name.endswith(".note"):
-            note_name += ".note"
+        note_name = self._note_file_name(note_name)
         note_path = os.path.join(self.notes_directory, note_name)
-        if os.path.exists(note_path):
-            from datetime import datetime
-            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-            backup_name = f"{os.path.splitext(note_name)[0]}_{timestamp}.note"
-            backup_path = os.path.join(self.backup_directory, backup_name)
-            with open(note_path, 'r', encoding='utf-8') as src, open(backup_path, 'w', encoding='utf-8') as dst:
-                dst.write(src.read())
-        with open(note_path, 'w', encoding='utf-8') as file:
-            file.write(content)
+        if os.path.exists(note_path) and not self.versions.versions(note_name):
+            # Keep the content written before the note had a history
+            with open(note_path, 'r', encoding='utf-8') as file:
+                self.versions.save(note_name, file.read(), os.path.getmtime(note_path))
+        atomic_write(note_path, content.encode('utf-8'))
+        self.versions.save(note_name, content)
+        self._index_note(note_name, content, os.path.getmtime(note_path))
+
+    def get_note_history(self, note_name: str) -> List[Dict]:
+        """
+        List the stored versions of a note, oldest first.
+
+        Returns:
+            List[Dict]: The version number, timestamp and size of each version
+        """
+        return self.versions.versions(self._note_file_name(note_name))
+
+    def get_note_version(self, note_name: str, version: int) -> Optional[str]:
+        """Retrieve the content of a stored version of a note, or None if there is no such version."""
+        return self.versions.get(self._note_file_name(note_name), version)
+
+    def _note_file_name(self, note_name: str) -> str:
+        note_name = os.path.basename(note_name).strip()
+        return note_name if note_name.endswith(".note") else note_name + ".note"
+
+    def _import_backups(self) -> None:
+        """Move the full-copy backups written before the version store existed into it."""
+        backups = []
+        store_directories = (self.versions.objects_directory, self.versions.versions_directory)
+        for root, dirs, files in os.walk(self.backup_directory):
+            # Do not descend into the version store, it grows with the history
+            dirs[:] = [name for name in dirs if os.path.join(os.path.abspath(root), name) not in store_directories]
+            for name in files:
+                match = BACKUP_PATTERN.match(name)
+                if match:
+                    backups.append((match.group(2), match.group(1) + ".note", os.path.join(root, name)))
+        for timestamp, note_name, backup_path in sorted(backups):
+            with open(backup_path, 'r', encoding='utf-8', errors='replace') as file:
+                content = file.read()
+            self.versions.save(note_name, content, datetime.strptime(timestamp, '%Y%m%d%H%M%S').timestamp())
+            os.remove(backup_path)
+        if backups:
+            print(f"Moved {len(backups)} note backups into the version store")
 
     def get_all_notes(self) -> list[str]:
         """Retrieve the names of all note files."""
@@ -78,5 +134,35 @@ class NotesManager:
         # Sort notes by size in descending order
         notes_with_size.sort(key=lambda x: x[1], reverse=True)
         # Return filenames with extensions, limited by max_notes if provided
-        return [note[0] for note in notes_with_size[:max_notes]] 
-    
\ No newline at end of file
+        return [note[0] for note in notes_with_size[:max_notes]]
+
+    def search_notes(self, query: str, limit: int = 10) -> List[SearchHit]:
+        """
+        Search the names and contents of all notes.
+
+        Args:
+            query (str): Words to search for, "quoted phrases" must match in order
+            limit (int): Maximum number of notes to return
+
+        Returns:
+            List[SearchHit]: The best matching notes with a snippet of each, best first
+        """
+        self.sync_index()
+        return self.index.search(query, limit=limit)
+
+    def sync_index(self) -> None:
+        """Index notes that were written or removed without going through put_note."""
+        indexed = self.index.timestamps()
+        for note_name in self.get_all_notes():
+            note_path = os.path.join(self.notes_directory, note_name)
+            mtime = os.path.getmtime(note_path)
+            if indexed.pop(note_name, None) != mtime:
+                with open(note_path, 'r', encoding='utf-8') as file:
+                    self._index_note(note_name, file.read(), mtime)
+        for note_name in indexed:
+            self.index.remove(note_name)
+
+    def _index_note(self, note_name: str, content: str, mtime: float) -> None:
+        # Index the words of the name too, so searching for a note by name keeps working
+        title = re.sub(r'[_\-.]+', ' ', os.path.splitext(note_name)[0])
+        self.index.add(note_name, title + "\n" + content, timestamp=mtime)
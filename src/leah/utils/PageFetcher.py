@@ -0,0 +1,302 @@
+import codecs
+import hashlib
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Union
+
+import html2text
+import lxml.etree
+import lxml.html
+import requests
+from lxml_html_clean import Cleaner
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from leah.config.GlobalConfig import GlobalConfig
+from leah.utils.BrowserPool import BrowserPool
+from leah.utils.CacheManager import CacheManager
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
+
+# Status codes that usually mean the site wants a real browser rather than that the page is missing
+BROWSER_STATUS_CODES = {403, 429, 503}
+
+# Markers of single page apps that render their content with JavaScript
+JS_APP_MARKERS = ('id="root"', 'id="app"', 'id="__next"', 'ng-app', 'data-reactroot')
+
+# Content types other than HTML that are returned as text, anything else is described instead
+TEXT_CONTENT_TYPES = ('text/', 'json', 'xml', 'javascript', 'yaml', 'csv')
+
+META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.IGNORECASE)
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+
+def extract_main_content(html: Union[str, bytes], base_url: str, encoding: str = 'utf-8') -> str:
+    """Extract the main content as markdown from HTML content, using lxml.html.clean. Bytes are decoded with encoding."""
+    try:
+        if isinstance(html, bytes):
+            html = html.decode(encoding, errors='replace')
+        # lxml refuses str input that still declares its encoding
+        document = lxml.html.fromstring(XML_DECLARATION.sub('', html))
+
+        # Use lxml's Cleaner to clean the document
+        cleaner = Cleaner()
+        cleaner.javascript = True  # Remove JavaScript
+        cleaner.style = True       # Remove styles
+        cleaner.links = False      # Remove links
+        cleaned_content = cleaner.clean_html(document)
+
+        main_content = lxml.html.tostring(cleaned_content, encoding='unicode', pretty_print=True)
+
+        # Limit the number of tokens to 1024
+        tokens = main_content.split()
+        print("Tokens: ", len(tokens))
+        limited_content = ' '.join(tokens[:15000])
+
+        # Convert limited content to markdown
+        h = html2text.HTML2Text()
+        h.ignore_links = False
+        h.body_width = 0  # Don't wrap text
+        markdown_content = h.handle(limited_content)
+
+        return markdown_content
+    except Exception as e:
+        print(f"Error in extract_main_content: {e}")
+        return str(e)
+
+def fetch_url_with_selenium(url: str, find_element: Callable = None, user_driver: WebDriver = None):
+    if user_driver:
+        return read_page_with_driver(user_driver, url, find_element)
+    # Borrow a warm browser from the shared pool instead of starting Chrome for every fetch
+    with BrowserPool.get_instance().lease() as driver:
+        return read_page_with_driver(driver, url, find_element)
+
+def read_page_with_driver(driver: WebDriver, url: str, find_element: Callable = None):
+    # Fetch the URL
+    driver.get(url)
+
+    # Attempt to find the main content section
+    if find_element:
+        main_content_elements = find_element(driver)
+        if main_content_elements:
+            return "\n".join([extract_main_content(element.get_attribute('innerHTML'), url) for element in main_content_elements])
+
+    try:
+        main_content_element = driver.find_element(By.TAG_NAME, 'main')
+    except:
+        try:
+            main_content_element = driver.find_element(By.TAG_NAME, 'article')
+        except:
+            try:
+                main_content_element = driver.find_element(By.CLASS_NAME, 'content')
+            except:
+                main_content_element = driver.find_element(By.TAG_NAME, 'body')
+
+    # Extract the page source from the main content with proper encoding
+    html = main_content_element.get_attribute('innerHTML')
+
+    # Extract main content
+    main_content = extract_main_content(html, url)
+    return main_content
+
+
+class PageFetcher:
+    """
+    Fetches web pages as markdown, trying the cheapest method first.
+
+    Pages are requested over a pooled requests session, and only handed to the
+    headless browser pool when the response looks like it needs JavaScript to render
+    or the site refuses plain HTTP clients. The extracted markdown is cached by URL:
+    within fresh_ttl it is returned without touching the network, and until
+    stale_ttl it is revalidated with a conditional GET (ETag/Last-Modified) so an
+    unchanged page is not downloaded or converted again.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, cache_manager: Optional[CacheManager] = None, fresh_ttl: int = 900, stale_ttl: int = 86400,
+                 timeout: float = 15, min_text_chars: int = 500):
+        """
+        Initialize the fetcher.
+
+        Args:
+            cache_manager (CacheManager): Cache for extracted pages, a default one is created if None
+            fresh_ttl (int): Seconds a cached page is returned without revalidation
+            stale_ttl (int): Seconds a cached page is kept for conditional requests
+            timeout (float): Timeout in seconds for plain HTTP requests
+            min_text_chars (int): Pages with less visible text than this may be rendered by JavaScript
+        """
+        self.cache_manager = cache_manager if cache_manager is not None else CacheManager(default_expiration=stale_ttl)
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.min_text_chars = min_text_chars
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml,text/plain;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+        })
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @classmethod
+    def get_instance(cls) -> 'PageFetcher':
+        """
+        Get the shared fetcher, configured from the page_fetcher section of config.json.
+
+        Returns:
+            PageFetcher: The singleton instance
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    config = GlobalConfig().get_page_fetcher_config()
+                    cls._instance = PageFetcher(
+                        fresh_ttl=config.get('fresh_ttl', 900),
+                        stale_ttl=config.get('stale_ttl', 86400),
+                        timeout=config.get('timeout', 15),
+                        min_text_chars=config.get('min_text_chars', 500))
+        return cls._instance
+
+    def fetch(self, url: str) -> str:
+        """
+        Get the main content of a page as markdown.
+
+        Args:
+            url (str): The page to fetch
+
+        Returns:
+            str: The page content as markdown
+        """
+        cache_key = f"page_{hashlib.md5(url.encode()).hexdigest()}"
+        entry = self.cache_manager.get(cache_key)
+        if entry is not None and time.time() - entry['fetched_at'] < self.fresh_ttl:
+            return entry['markdown']
+
+        try:
+            # Streamed so that the body of binary content is never downloaded
+            response = self.session.get(url, headers=self._conditional_headers(entry), timeout=self.timeout, stream=True)
+        except requests.RequestException as e:
+            print(f"HTTP fetch of {url} failed, using the browser: {e}")
+            response = None
+
+        if response is not None and response.status_code == 304 and entry is not None:
+            response.close()
+            # The cached entry may be shared with other readers, so store an updated copy
+            self.cache_manager.set(cache_key, dict(entry, fetched_at=time.time()))
+            return entry['markdown']
+
+        # Decoded once here and shared by _needs_browser and _extract
+        text = self._decode(response) if response is not None and self._is_text(response) else None
+        if response is None or self._needs_browser(response, text):
+            if response is not None:
+                response.close()
+            markdown = fetch_url_with_selenium(url)
+        else:
+            markdown = self._extract(response, text)
+            if not response.ok:
+                # Return the error page as the browser would, but do not cache it
+                return markdown
+
+        self.cache_manager.set(cache_key, {
+            'markdown': markdown,
+            'etag': response.headers.get('ETag') if response is not None else None,
+            'last_modified': response.headers.get('Last-Modified') if response is not None else None,
+            'fetched_at': time.time(),
+        })
+        return markdown
+
+    def _conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _needs_browser(self, response: requests.Response, html: Optional[str] = None) -> bool:
+        """Guess whether the response was refused or only contains the shell of a JavaScript rendered page."""
+        if response.status_code in BROWSER_STATUS_CODES:
+            return True
+        if not response.ok or not self._is_html(response):
+            return False
+        if html is None:
+            html = self._decode(response)
+        lowered = html.lower()
+        if '<noscript' in lowered and 'javascript' in lowered.split('<noscript', 1)[1][:1000]:
+            return True
+        try:
+            document = lxml.html.fromstring(XML_DECLARATION.sub('', html))
+        except Exception:
+            return True
+        for element in document.xpath('//script|//style|//noscript|//template'):
+            element.drop_tree()
+        text = ' '.join(document.text_content().split())
+        if len(text) >= self.min_text_chars:
+            return False
+        return '<script' in lowered or any(marker in html for marker in JS_APP_MARKERS)
+
+    def _is_html(self, response: requests.Response) -> bool:
+        content_type = response.headers.get('Content-Type', '').lower()
+        return not content_type or 'html' in content_type
+
+    def _is_text(self, response: requests.Response) -> bool:
+        content_type = response.headers.get('Content-Type', '').lower()
+        return self._is_html(response) or any(marker in content_type for marker in TEXT_CONTENT_TYPES)
+
+    def _encoding(self, response: requests.Response) -> str:
+        """
+        Pick the encoding of a text response: the charset of the Content-Type header, then a
+        <meta> charset in HTML, then UTF-8 if the body is valid UTF-8, then requests' guess.
+        """
+        candidates = []
+        if 'charset=' in response.headers.get('Content-Type', '').lower():
+            candidates.append(response.encoding)
+        if self._is_html(response):
+            match = META_CHARSET.search(response.content[:4096])
+            if match:
+                candidates.append(match.group(1).decode('ascii'))
+        for candidate in candidates:
+            try:
+                return codecs.lookup(candidate).name
+            except (LookupError, TypeError):
+                continue
+        try:
+            response.content.decode('utf-8')
+            return 'utf-8'
+        except UnicodeDecodeError:
+            return response.apparent_encoding or 'utf-8'
+
+    def _decode(self, response: requests.Response) -> str:
+        return response.content.decode(self._encoding(response), errors='replace')
+
+    def _extract(self, response: requests.Response, text: Optional[str] = None) -> str:
+        if not self._is_text(response):
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+            length = response.headers.get('Content-Length')
+            # The body was not read, so release the connection
+            response.close()
+            size = f" of {length} bytes" if length else ""
+            return f"{response.url} is a {content_type} file{size}, which has no text content to read."
+        html = self._decode(response) if text is None else text
+        if not self._is_html(response):
+            return html
+        if not html.strip():
+            return ""
+        try:
+            document = lxml.html.fromstring(XML_DECLARATION.sub('', html))
+        except lxml.etree.ParserError:
+            return extract_main_content(html, response.url)
+        # Prefer the same sections the browser path looks for
+        for query in ('//main', '//article', '//*[contains(concat(" ", normalize-space(@class), " "), " content ")]', '//body'):
+            elements = document.xpath(query)
+            if elements:
+                return extract_main_content(lxml.html.tostring(elements[0], encoding='unicode'), response.url)
+        return extract_main_content(html, response.url)
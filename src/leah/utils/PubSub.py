@@ -2,13 +2,15 @@ import uuid
 import threading
 import json
 import os
-from typing import Callable, Dict, List, Optional, Any, Generator
+from typing import Callable, Dict, Iterable, List, Optional, Any, Generator, Tuple
 from collections import defaultdict
 from queue import Queue
 import time
 import shutil
+from datetime import datetime
 
 from leah.config.LocalConfigManager import LocalConfigManager
+from leah.utils.InvertedIndex import CorpusStatistics, InvertedIndex, SearchHit, parse_query
 from leah.utils.Message import Message, MessageType
 
 
@@ -72,6 +74,12 @@ class PubSub:
     """A simple publish-subscribe implementation for message distribution."""
     
     _instance = None
+    # Serializes appends to the channel history files
+    _store_lock = threading.Lock()
+    # Channel indexes known to hold the whole history, and a lock per index being backfilled
+    _backfilled: set = set()
+    _backfill_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+    _backfill_locks_lock = threading.Lock()
     
     def __new__(cls):
         """Ensure only one instance of PubSub exists."""
@@ -105,6 +113,36 @@ class PubSub:
         safe_channel = channel_id.replace('/', '_').replace('\\', '_').replace('#',"group_").replace("@","user_").replace("->","to")
         return self.config_manager.get_path(f"channels/{safe_channel}/messages.json")
 
+    def get_channel_index(self, channel_id: str) -> InvertedIndex:
+        """
+        Get the full-text index of a channel's messages.
+
+        The index is kept up to date as messages are stored. Channels that have history
+        from before indexing was added are indexed the first time they are used. The
+        backfill is marked complete in the index only after it finishes, so one cut short
+        by a crash is redone, and concurrent callers wait for it instead of searching a
+        partial index.
+        """
+        index_path = os.path.join(os.path.dirname(self._get_channel_storage_path(channel_id)), "index.db")
+        index = InvertedIndex.open(index_path)
+        if index.db_path in PubSub._backfilled:
+            return index
+        with PubSub._backfill_locks_lock:
+            lock = PubSub._backfill_locks[index.db_path]
+        with lock:
+            if index.get_setting("backfilled") is None:
+                # Adding a message again replaces it, so redoing part of a backfill is harmless
+                for message in self.get_channel_messages(channel_id):
+                    self._index_message(index, message)
+                index.set_setting("backfilled", "1")
+            PubSub._backfilled.add(index.db_path)
+        return index
+
+    def _index_message(self, index: InvertedIndex, message: Message) -> None:
+        data = json.dumps({"from_user": message.from_user, "via_channel": message.via_channel,
+                           "type": message.type.value, "thread": message.thread})
+        index.add(message.id, message.content or "", timestamp=float(message.sent_at), data=data)
+
     def _store_message(self, channel_id: str, message: Message) -> None:
         """Store a message in the channel's message history"""
         if message.type == MessageType.HANGUP:
@@ -116,8 +154,40 @@ class PubSub:
         
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(storage_path), exist_ok=True)
-        
-        # Load existing messages
+
+        with self._store_lock:
+            self._append_message(storage_path, message.to_dict())
+
+        self._index_message(self.get_channel_index(channel_id), message)
+
+    def _append_message(self, storage_path: str, message_dict: Dict[str, Any]) -> None:
+        """
+        Append a message to a channel history file without rewriting it.
+
+        The file stays a JSON array: the closing bracket at the end of the file is
+        overwritten with the new message and a new closing bracket.
+        """
+        entry = "  " + json.dumps(message_dict, indent=2).replace("\n", "\n  ")
+        try:
+            with open(storage_path, 'rb+') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                # The closing bracket and the end of the last message are within the last few bytes
+                f.seek(max(0, size - 64))
+                tail = f.read()
+                stripped = tail.rstrip()
+                if stripped.endswith(b"]"):
+                    body = stripped[:-1].rstrip()
+                    if body.endswith((b"}", b"[")):
+                        f.seek(size - len(tail) + len(body))
+                        separator = "\n" if body.endswith(b"[") else ",\n"
+                        f.write((separator + entry + "\n]").encode('utf-8'))
+                        f.truncate()
+                        return
+        except FileNotFoundError:
+            pass
+
+        # Missing or unreadable history, rewrite it like before
         messages = []
         if os.path.exists(storage_path):
             try:
@@ -125,14 +195,62 @@ class PubSub:
                     messages = json.load(f)
             except json.JSONDecodeError:
                 pass
-        
-        # Add new message
-        messages.append(message.to_dict())
-        
-        # Save messages back to file
+        messages.append(message_dict)
         with open(storage_path, 'w') as f:
             json.dump(messages, f, indent=2)
 
+    def search_messages(self, channels: Iterable[str], query: str, limit: int = 20,
+                        since: Optional[float] = None, until: Optional[float] = None) -> List[Tuple[Message, SearchHit]]:
+        """
+        Search the message history of one or more channels.
+
+        Args:
+            channels (Iterable[str]): The channels to search
+            query (str): Words to search for, "quoted phrases" must match in order
+            limit (int): Maximum number of messages to return
+            since (float): Only messages sent at or after this timestamp
+            until (float): Only messages sent at or before this timestamp
+
+        Returns:
+            List[Tuple[Message, SearchHit]]: The best matching messages, best first
+        """
+        indexes = {channel_id: self.get_channel_index(channel_id) for channel_id in dict.fromkeys(channels)
+                   if os.path.exists(self._get_channel_storage_path(channel_id))}
+        # Every channel has its own index, score them all with the combined statistics so the scores compare
+        terms, _ = parse_query(query)
+        statistics = CorpusStatistics.combine(index.statistics(terms) for index in indexes.values())
+        results = []
+        for channel_id, index in indexes.items():
+            for hit in index.search(query, limit=limit, since=since, until=until, snippet_width=400, statistics=statistics):
+                data = json.loads(hit.data) if hit.data else {}
+                message = Message(
+                    from_user=data.get("from_user", ""),
+                    via_channel=data.get("via_channel", channel_id),
+                    content=hit.text,
+                    type=MessageType(data.get("type", MessageType.CHANNEL.value)),
+                    thread=data.get("thread", None)
+                )
+                message.id = hit.doc_id
+                message.sent_at = hit.timestamp
+                results.append((message, hit))
+        results.sort(key=lambda result: result[1].score, reverse=True)
+        return results[:limit]
+
+    @staticmethod
+    def format_search_results(results: List[Tuple[Message, SearchHit]], include_channel: bool = True) -> str:
+        """Describe search results for an LLM, one block per message with a snippet of its content."""
+        blocks = []
+        for message, hit in results:
+            try:
+                formatted_date = datetime.fromtimestamp(float(message.sent_at)).strftime("%B %d, %Y at %I:%M:%S %p")
+            except (ValueError, TypeError):
+                formatted_date = str(message.sent_at)
+            block = f"From: {message.from_user}\nTime: {formatted_date}\n"
+            if include_channel:
+                block += f"Channel: {message.via_channel}\n"
+            blocks.append(block + f"Message: {hit.snippet}\n---\n")
+        return "".join(blocks)
+
     def bind_channels(self, channel_in, channel_out):
         self.junction_actor.join(channel_in, channel_out)
 
@@ -203,6 +321,7 @@ class PubSub:
         # Now clear the messages
         with open(storage_path, 'w') as f:
             json.dump([], f)
+        self.get_channel_index(channel_id).clear()
 
     def subscribe(self, channel_id: str, callback: Callable) -> None:
         """
@@ -0,0 +1,128 @@
+import functools
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from leah.utils.CacheManager import CacheManager
+
+
+class _Call:
+    """A computation in flight and the outcome shared with every caller waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one computation.
+
+    The first caller for a key runs the function; callers that arrive while it is
+    running block until it finishes and receive the same result, or the same
+    exception. Once the call completes the key is forgotten, so later calls run again.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) unless a call for key is already in flight, then wait for that one.
+
+        Args:
+            key (str): Identifies calls that are interchangeable
+            fn (Callable): The function to run
+
+        Returns:
+            Any: The result of the single call made for key
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
+
+
+def call_key(namespace: str, args: tuple, kwargs: dict) -> str:
+    """Build a stable key for a call from its arguments."""
+    digest = hashlib.md5(repr((args, sorted(kwargs.items()))).encode('utf-8')).hexdigest()
+    return f"{namespace}_{digest}"
+
+
+def single_flight(namespace: str, cache_expiration: Optional[int] = None) -> Callable:
+    """
+    Decorator that coalesces concurrent identical calls, and optionally caches their results.
+
+    Place it below @tool so the tool schema is still built from the wrapped function's
+    signature and docstring:
+
+        @tool
+        @single_flight("web_search", cache_expiration=14400)
+        def web_search(query: str) -> str:
+            ...
+
+    Args:
+        namespace (str): Prefix for the call keys, also used as the cache key prefix
+        cache_expiration (int): If set, results are stored in the shared CacheManager for this many seconds
+
+    Returns:
+        Callable: The decorator
+    """
+    flight = SingleFlight()
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = call_key(namespace, args, kwargs)
+            if cache_expiration is None:
+                return flight.do(key, fn, *args, **kwargs)
+
+            cache_manager = CacheManager(default_expiration=cache_expiration)
+            cached = cache_manager.get(key)
+            if cached is not None:
+                return cached
+
+            def compute():
+                # A call that just finished may have filled the cache after the first check
+                cached = cache_manager.get(key)
+                if cached is not None:
+                    return cached
+                result = fn(*args, **kwargs)
+                if result is not None:
+                    cache_manager.set(key, result)
+                return result
+
+            return flight.do(key, compute)
+
+        wrapper.single_flight = flight
+        return wrapper
+
+    return decorator
@@ -0,0 +1,78 @@
+import re
+from typing import List, Optional
+
+
+class SpeechSegmenter:
+    """
+    Splits streamed text into chunks for speech synthesis.
+
+    The first chunk is released at the first sentence (or clause) boundary after a few
+    words so audio can start while the reply is still being generated. Each following
+    chunk is allowed to grow, up to max_chunk characters, so that once playback has
+    started fewer and longer clips are synthesized.
+    """
+
+    SENTENCE_END = re.compile(r'[.!?]+["\')\]]*(?=\s)|\n\s*\n')
+    CLAUSE_END = re.compile(r'[,;:](?=\s)')
+
+    def __init__(self, first_chunk: int = 40, max_chunk: int = 256, growth: float = 2.0):
+        """
+        Initialize the segmenter.
+
+        Args:
+            first_chunk (int): Minimum number of characters in the first chunk
+            max_chunk (int): Number of characters later chunks grow to
+            growth (float): Factor the minimum chunk size grows by after each chunk
+        """
+        self.max_chunk = max_chunk
+        self.growth = growth
+        self.min_chunk = first_chunk
+        self.buffer = ""
+        self.chunks_emitted = 0
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add streamed text and return the chunks that are ready to be spoken.
+        """
+        self.buffer += text
+        chunks = []
+        while True:
+            chunk = self._next_chunk()
+            if chunk is None:
+                break
+            chunks.append(chunk)
+        return chunks
+
+    def flush(self) -> List[str]:
+        """
+        Return whatever is left in the buffer once the stream has ended.
+        """
+        chunk = self.buffer.strip()
+        self.buffer = ""
+        if not chunk:
+            return []
+        self.chunks_emitted += 1
+        return [chunk]
+
+    def _next_chunk(self) -> Optional[str]:
+        if len(self.buffer.strip()) < self.min_chunk:
+            return None
+        end = self._find_boundary(self.SENTENCE_END)
+        if end is None and self.chunks_emitted == 0:
+            end = self._find_boundary(self.CLAUSE_END)
+        if end is None and len(self.buffer) > self.max_chunk * 2:
+            # No punctuation in a long run of text, cut at the last space that fits
+            end = self.buffer.rfind(" ", 0, self.max_chunk) + 1 or self.max_chunk
+        if end is None:
+            return None
+
+        chunk, self.buffer = self.buffer[:end].strip(), self.buffer[end:]
+        if not chunk:
+            return None
+        self.chunks_emitted += 1
+        self.min_chunk = min(self.max_chunk, int(self.min_chunk * self.growth))
+        return chunk
+
+    def _find_boundary(self, pattern: re.Pattern) -> Optional[int]:
+        match = pattern.search(self.buffer, max(0, self.min_chunk - 1))
+        return match.end() if match else None
@@ -0,0 +1,313 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Generator, Iterable, List, Optional, Set
+
+import numpy as np
+
+from leah.config.GlobalConfig import GlobalConfig
+from leah.utils.FileSearch import BINARY_SNIFF_BYTES, DEFAULT_SKIP_DIRS, FileSearch
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+    import sre_constants
+    import sre_parse
+
+
+def is_binary(path: str) -> bool:
+    """Treat a file as binary if its first few kilobytes contain a NUL byte."""
+    try:
+        with open(path, 'rb') as f:
+            return b'\0' in f.read(BINARY_SNIFF_BYTES)
+    except OSError:
+        return True
+
+
+def trigrams(data: bytes) -> np.ndarray:
+    """Return the distinct case-folded byte trigrams of data, packed into integers."""
+    if len(data) < 3:
+        return np.empty(0, dtype=np.uint32)
+    values = np.frombuffer(data.lower(), dtype=np.uint8).astype(np.uint32)
+    return np.unique((values[:-2] << 16) | (values[1:-1] << 8) | values[2:])
+
+
+def required_literals(pattern: str) -> List[str]:
+    """
+    Find literal strings that every match of a regular expression must contain.
+
+    Only literals that are always matched are returned, e.g. "foo" and "bar" for
+    "foo.*bar", and nothing for "foo|bar". An empty list means the regex cannot be
+    prefiltered.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (sre_constants.error, re.error):
+        return []
+    literals: List[str] = []
+
+    def walk(items) -> None:
+        run = []
+        for op, value in items:
+            if op == sre_constants.LITERAL:
+                run.append(chr(value))
+                continue
+            if run:
+                literals.append("".join(run))
+                run = []
+            if op == sre_constants.SUBPATTERN:
+                walk(value[-1])
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and value[0] >= 1:
+                walk(value[2])
+        if run:
+            literals.append("".join(run))
+
+    walk(parsed)
+    return [literal for literal in literals if len(literal.encode('utf-8')) >= 3]
+
+
+class TrigramIndex:
+    """
+    A persistent trigram index for searching the contents of a directory tree.
+
+    Every text file under the root is reduced to the set of its case-folded byte
+    trigrams, stored as one blob per file in SQLite. In memory the blobs are merged into
+    a sorted (trigram, file) array, so a search binary-searches the trigrams of the
+    literal (or of the literals a regex requires) to find the few files that can match,
+    and only those are read. Binary files are detected by sniffing and skipped, and file and directory
+    names are indexed so name searches need no walk either. Files too large to index are
+    always read by a search, so enabling the index never loses matches.
+
+    The index is brought up to date by an mtime scan of the tree (honouring .gitignore
+    files, see FileSearch.walk), repeated by a background thread every refresh_interval
+    seconds.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+    _disabled = False
+
+    def __init__(self, root: str, index_path: str, max_file_size: int = 1048576, refresh_interval: float = 60,
+                 skip_dirs: Iterable[str] = DEFAULT_SKIP_DIRS):
+        """
+        Initialize the index.
+
+        Args:
+            root (str): The directory tree to index
+            index_path (str): The SQLite database to store the index in
+            max_file_size (int): Larger files are not indexed
+            refresh_interval (float): Seconds between background rescans, 0 to only scan on refresh()
+            skip_dirs (Iterable[str]): Directory names that are never indexed
+        """
+        self.root = os.path.abspath(root)
+        self.max_file_size = max_file_size
+        self.refresh_interval = refresh_interval
+        self.skip_dirs = set(skip_dirs)
+        self.ready = threading.Event()
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        self._conn = sqlite3.connect(index_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files (file_id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, name TEXT NOT NULL, "
+            "is_dir INTEGER NOT NULL, mtime REAL, size INTEGER, indexed INTEGER NOT NULL, trigrams BLOB)")
+        self._postings = None
+
+    @classmethod
+    def get_instance(cls) -> Optional['TrigramIndex']:
+        """
+        Get the shared index configured in the file_index section of config.json.
+
+        Returns:
+            Optional[TrigramIndex]: The index, or None if no root is configured
+        """
+        if cls._instance is None and not cls._disabled:
+            config = GlobalConfig().get_file_index_config()
+            if not config.get('root'):
+                cls._disabled = True
+                return None
+            with cls._instance_lock:
+                if cls._instance is None:
+                    root = os.path.expanduser(config['root'])
+                    index_path = config.get('index_path') or os.path.join(
+                        GlobalConfig().get_home_config_directory(), "file_index.db")
+                    index = TrigramIndex(root, os.path.expanduser(index_path),
+                                         max_file_size=config.get('max_file_size', 1048576),
+                                         refresh_interval=config.get('refresh_interval', 60))
+                    index.start()
+                    cls._instance = index
+        return cls._instance
+
+    def covers(self, path: str) -> bool:
+        """Return True if path is inside the indexed tree and the first scan has finished."""
+        path = os.path.abspath(path)
+        return self.ready.is_set() and (path == self.root or path.startswith(self.root + os.sep))
+
+    def start(self) -> None:
+        """Scan the tree now and then keep rescanning it in the background."""
+        def run():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Error refreshing file index for {self.root}: {e}")
+                if not self.refresh_interval:
+                    return
+                time.sleep(self.refresh_interval)
+        threading.Thread(target=run, daemon=True, name="TrigramIndex").start()
+
+    def refresh(self) -> int:
+        """
+        Bring the index up to date with the tree, reindexing files whose mtime or size changed.
+
+        Returns:
+            int: The number of files that were (re)indexed
+        """
+        with self._refresh_lock:
+            with self._lock:
+                known = {path: (file_id, mtime, size) for file_id, path, mtime, size in
+                         self._conn.execute("SELECT file_id, path, mtime, size FROM files")}
+            changed = 0
+            for path, is_dir, stat in self._scan(self.root):
+                entry = known.pop(path, None)
+                if entry is not None and entry[1] == stat.st_mtime and entry[2] == stat.st_size:
+                    continue
+                self._index_entry(path, is_dir, stat, entry[0] if entry else None)
+                changed += 1
+            with self._lock:
+                for file_id, _, _ in known.values():
+                    self._conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+                if changed or known or self._postings is None:
+                    self._postings = None
+                    self._load_postings()
+            self.ready.set()
+            return changed
+
+    def search_names(self, terms: List[str], path: str, case_sensitive: bool = False) -> List[str]:
+        """Return the indexed files and directories under path whose name contains any of the terms."""
+        prefix = self._prefix(path)
+        if not case_sensitive:
+            terms = [term.lower() for term in terms]
+        matches = []
+        with self._lock:
+            rows = self._conn.execute("SELECT path, name FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+            for file_path, name in rows:
+                compare_name = name if case_sensitive else name.lower()
+                if any(term in compare_name for term in terms):
+                    matches.append(file_path)
+        return sorted(matches)
+
+    def search(self, pattern: str, path: str, case_sensitive: bool = False, regex: bool = False,
+               max_results: Optional[int] = 200) -> Generator[str, None, None]:
+        """
+        Search the contents of the files under path, reading only the files the index cannot rule out.
+
+        Args:
+            pattern (str): A literal string, or a regular expression if regex is True
+            path (str): Only files under this path are searched
+            case_sensitive (bool): Whether the match is case sensitive
+            regex (bool): Whether pattern is a regular expression
+            max_results (int): Stop after this many matching lines, None for no limit
+
+        Yields:
+            str: Matches in the format "absolute_path:line_number:matching_line"
+        """
+        literals = required_literals(pattern) if regex else [pattern]
+        # Trigrams are folded with ASCII rules only, so other literals cannot prefilter a case-insensitive search
+        literals = [literal for literal in literals if case_sensitive or literal.isascii()]
+        # Files are matched exactly as FileSearch matches them, so results and line numbers agree with a walk
+        file_search = FileSearch.get_instance()
+        needle, matcher, fold = file_search._matcher(pattern, case_sensitive, regex)
+        deadline = time.monotonic() + file_search.timeout
+        count = 0
+        for file_path in self._candidates(literals, path):
+            if time.monotonic() > deadline:
+                print(f"Indexed search for {pattern!r} in {path} stopped after {file_search.timeout} seconds")
+                return
+            remaining = None if max_results is None else max_results - count
+            for result in file_search._search_file(file_path, needle, matcher, fold, remaining, deadline):
+                yield result
+                count += 1
+                if max_results is not None and count >= max_results:
+                    return
+
+    def _candidates(self, literals: List[str], path: str) -> List[str]:
+        """Return the files under path that can contain all literals, including every file that is not indexed."""
+        prefix = self._prefix(path)
+        wanted: Set[int] = set()
+        for literal in literals:
+            wanted.update(int(trigram) for trigram in trigrams(literal.encode('utf-8')))
+        with self._lock:
+            if not wanted:
+                rows = self._conn.execute(
+                    "SELECT path FROM files WHERE is_dir = 0 AND substr(path, 1, ?) = ? ORDER BY path",
+                    (len(prefix), prefix))
+                return [file_path for (file_path,) in rows]
+            # Large and binary files have no trigrams, FileSearch skips the binaries when reading them
+            unindexed = [file_path for (file_path,) in self._conn.execute(
+                "SELECT path FROM files WHERE is_dir = 0 AND indexed = 0 AND substr(path, 1, ?) = ?",
+                (len(prefix), prefix))]
+            keys, file_ids_by_key = self._load_postings()
+            # Intersect the posting lists, smallest first
+            postings = []
+            for trigram in wanted:
+                trigram = np.uint32(trigram)
+                start, end = np.searchsorted(keys, trigram, side='left'), np.searchsorted(keys, trigram, side='right')
+                postings.append(file_ids_by_key[start:end])
+            postings.sort(key=len)
+            file_ids = postings[0]
+            for posting in postings[1:]:
+                if len(file_ids) == 0:
+                    break
+                file_ids = np.intersect1d(file_ids, posting, assume_unique=True)
+            paths = unindexed
+            for file_id in file_ids.tolist():
+                row = self._conn.execute("SELECT path FROM files WHERE file_id = ?", (file_id,)).fetchone()
+                if row is not None and row[0].startswith(prefix):
+                    paths.append(row[0])
+            return sorted(paths)
+
+    def _load_postings(self):
+        """Merge the per-file trigram blobs into arrays sorted by trigram, once per change."""
+        if self._postings is None:
+            keys, file_ids = [], []
+            for file_id, blob in self._conn.execute("SELECT file_id, trigrams FROM files WHERE indexed = 1"):
+                grams = np.frombuffer(blob, dtype=np.uint32)
+                keys.append(grams)
+                file_ids.append(np.full(len(grams), file_id, dtype=np.int64))
+            keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.uint32)
+            file_ids = np.concatenate(file_ids) if file_ids else np.empty(0, dtype=np.int64)
+            order = np.argsort(keys, kind='stable')
+            self._postings = (keys[order], file_ids[order])
+        return self._postings
+
+    def _prefix(self, path: str) -> str:
+        path = os.path.abspath(path)
+        return path if path.endswith(os.sep) else path + os.sep
+
+    def _scan(self, directory: str):
+        for entry in FileSearch(skip_dirs=self.skip_dirs).walk(directory):
+            try:
+                yield entry.path, entry.is_dir(), entry.stat()
+            except OSError:
+                continue
+
+    def _index_entry(self, path: str, is_dir: bool, stat: os.stat_result, file_id: Optional[int]) -> None:
+        grams = None
+        if not is_dir and stat.st_size <= self.max_file_size and not is_binary(path):
+            try:
+                with open(path, 'rb') as f:
+                    grams = trigrams(f.read())
+            except OSError:
+                grams = None
+        with self._lock:
+            if file_id is not None:
+                self._conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+            self._conn.execute(
+                "INSERT INTO files (path, name, is_dir, mtime, size, indexed, trigrams) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, os.path.basename(path), int(is_dir), stat.st_mtime, stat.st_size, int(grams is not None),
+                 grams.astype(np.uint32).tobytes() if grams is not None else None))
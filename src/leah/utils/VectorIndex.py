@@ -0,0 +1,250 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class VectorIndex:
+    """
+    A persistent vector index for chunks of files.
+
+    Vectors are stored L2-normalized in a memory-mapped float32 matrix
+    (vectors.f32), so cosine similarity is a single matrix-vector product. A SQLite
+    table maps each matrix row to the file path, mtime and content hash of its chunk.
+    Updating a file only embeds chunks whose hash is not already in the index, and
+    rows of removed chunks are reused by later inserts.
+
+    The index is safe to use from several threads of one process.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, index_dir: str, dim: int):
+        """
+        Open (or create) an index.
+
+        Args:
+            index_dir (str): Directory holding the matrix and metadata files
+            dim (int): Vector dimension. An existing index with a different dimension is reset.
+        """
+        self.index_dir = index_dir
+        self.dim = dim
+        self._lock = threading.RLock()
+        os.makedirs(index_dir, exist_ok=True)
+        self.matrix_path = os.path.join(index_dir, "vectors.f32")
+        self._conn = sqlite3.connect(os.path.join(index_dir, "meta.db"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "row INTEGER PRIMARY KEY, path TEXT, mtime REAL, chunk_hash TEXT, text TEXT, active INTEGER NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_path ON chunks (path)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_hash ON chunks (chunk_hash)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL)")
+
+        stored_dim = self._conn.execute("SELECT value FROM settings WHERE name = 'dim'").fetchone()
+        if stored_dim is not None and int(stored_dim[0]) != dim:
+            print(f"Vector index {index_dir} was built with dimension {stored_dim[0]}, rebuilding for {dim}")
+            self._reset()
+        self._conn.execute("INSERT OR REPLACE INTO settings (name, value) VALUES ('dim', ?)", (str(dim),))
+
+        self._rows = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM chunks").fetchone()[0]
+        self._open_matrix(max(self.INITIAL_CAPACITY, self._rows))
+        self._active = np.zeros(self._capacity, dtype=bool)
+        for (row,) in self._conn.execute("SELECT row FROM chunks WHERE active = 1"):
+            self._active[row] = True
+
+    @staticmethod
+    def stored_dim(index_dir: str) -> Optional[int]:
+        """Return the dimension of an existing index in index_dir, or None if there is none."""
+        path = os.path.join(index_dir, "meta.db")
+        if not os.path.exists(path):
+            return None
+        conn = sqlite3.connect(path)
+        try:
+            row = conn.execute("SELECT value FROM settings WHERE name = 'dim'").fetchone()
+            return int(row[0]) if row else None
+        except sqlite3.Error:
+            return None
+        finally:
+            conn.close()
+
+    @staticmethod
+    def chunk_hash(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def needs_update(self, path: str, mtime: float) -> bool:
+        """Return True if path has not been indexed at this mtime."""
+        row = self._conn.execute("SELECT mtime FROM files WHERE path = ?", (path,)).fetchone()
+        return row is None or row[0] != mtime
+
+    def missing_hashes(self, chunk_hashes: Sequence[str]) -> List[str]:
+        """Return the chunk hashes that have no vector in the index yet."""
+        known = set()
+        for chunk_hash in set(chunk_hashes):
+            if self._conn.execute("SELECT 1 FROM chunks WHERE chunk_hash = ? AND active = 1 LIMIT 1", (chunk_hash,)).fetchone():
+                known.add(chunk_hash)
+        return [chunk_hash for chunk_hash in dict.fromkeys(chunk_hashes) if chunk_hash not in known]
+
+    def indexed_paths(self) -> List[str]:
+        return [path for (path,) in self._conn.execute("SELECT path FROM files")]
+
+    def update_file(self, path: str, mtime: float, chunks: Sequence[str],
+                    embed: Callable[[List[str]], Sequence[Sequence[float]]]) -> int:
+        """
+        Replace the chunks indexed for path.
+
+        Chunks that are already indexed (for this or any other file) keep their vectors;
+        only new chunk texts are passed to embed.
+
+        Args:
+            path (str): The file the chunks belong to
+            mtime (float): The file's modification time
+            chunks (Sequence[str]): The file's chunks
+            embed (Callable): Embeds a list of texts
+
+        Returns:
+            int: The number of chunks that were embedded
+        """
+        with self._lock:
+            hashes = [self.chunk_hash(chunk) for chunk in chunks]
+            existing = {chunk_hash: row for row, chunk_hash in self._conn.execute(
+                "SELECT row, chunk_hash FROM chunks WHERE path = ? AND active = 1", (path,))}
+
+            keep = {chunk_hash: existing[chunk_hash] for chunk_hash in hashes if chunk_hash in existing}
+            stale = [row for chunk_hash, row in existing.items() if chunk_hash not in keep]
+
+            new_chunks: Dict[str, str] = {}
+            for chunk, chunk_hash in zip(chunks, hashes):
+                if chunk_hash not in keep:
+                    new_chunks.setdefault(chunk_hash, chunk)
+
+            vectors = self.known_vectors(list(new_chunks))
+            to_embed = [chunk_hash for chunk_hash in new_chunks if chunk_hash not in vectors]
+            if to_embed:
+                embedded = embed([new_chunks[chunk_hash] for chunk_hash in to_embed])
+                for chunk_hash, vector in zip(to_embed, embedded):
+                    vectors[chunk_hash] = self._normalize(vector)
+
+            self._conn.execute("BEGIN")
+            try:
+                for row in stale:
+                    self._conn.execute("UPDATE chunks SET active = 0, path = NULL, text = NULL WHERE row = ?", (row,))
+                    self._active[row] = False
+                free_rows = iter([row for (row,) in self._conn.execute(
+                    "SELECT row FROM chunks WHERE active = 0 AND path IS NULL")])
+                for chunk_hash, chunk in new_chunks.items():
+                    row = next(free_rows, None)
+                    if row is None:
+                        row = self._append_row()
+                    self._matrix[row] = vectors[chunk_hash]
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO chunks (row, path, mtime, chunk_hash, text, active) VALUES (?, ?, ?, ?, ?, 1)",
+                        (row, path, mtime, chunk_hash, chunk))
+                    self._active[row] = True
+                self._conn.execute("UPDATE chunks SET mtime = ? WHERE path = ?", (mtime, path))
+                self._conn.execute("INSERT OR REPLACE INTO files (path, mtime) VALUES (?, ?)", (path, mtime))
+                self._matrix.flush()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return len(to_embed)
+
+    def remove_file(self, path: str) -> None:
+        with self._lock:
+            rows = [row for (row,) in self._conn.execute("SELECT row FROM chunks WHERE path = ?", (path,))]
+            self._conn.execute("UPDATE chunks SET active = 0, path = NULL, text = NULL WHERE path = ?", (path,))
+            self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            self._active[rows] = False
+
+    def search(self, query_vector: Sequence[float], k: int = 3,
+               paths: Optional[Iterable[str]] = None) -> List[Tuple[float, str, str]]:
+        """
+        Find the chunks most similar to a query vector.
+
+        Args:
+            query_vector (Sequence[float]): The embedded query
+            k (int): Maximum number of results
+            paths (Iterable[str]): Only chunks of these paths, None for all indexed paths
+
+        Returns:
+            List[Tuple[float, str, str]]: (cosine similarity, path, chunk text), best first
+        """
+        with self._lock:
+            rows = self._rows
+            if rows == 0 or k <= 0:
+                return []
+            allowed = self._active[:rows] if paths is None else self._path_mask(paths, rows)
+            k = min(k, int(allowed.sum()))
+            if k == 0:
+                return []
+            scores = self._matrix[:rows] @ self._normalize(query_vector)
+            scores[~allowed] = -np.inf
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results = []
+            for row in top:
+                path, text = self._conn.execute("SELECT path, text FROM chunks WHERE row = ?", (int(row),)).fetchone()
+                results.append((float(scores[row]), path, text))
+            return results
+
+    def _path_mask(self, paths: Iterable[str], rows: int) -> np.ndarray:
+        mask = np.zeros(rows, dtype=bool)
+        paths = list(dict.fromkeys(paths))
+        # Stay below SQLite's limit on the number of parameters
+        for start in range(0, len(paths), 500):
+            chunk = paths[start:start + 500]
+            selected = [row for (row,) in self._conn.execute(
+                f"SELECT row FROM chunks WHERE active = 1 AND path IN ({','.join('?' * len(chunk))})", chunk)]
+            mask[selected] = True
+        return mask & self._active[:rows]
+
+    def __len__(self) -> int:
+        return int(self._active[:self._rows].sum())
+
+    def known_vectors(self, chunk_hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Return copies of the vectors of the chunk hashes that are indexed under any path."""
+        vectors = {}
+        with self._lock:
+            for chunk_hash in dict.fromkeys(chunk_hashes):
+                row = self._conn.execute(
+                    "SELECT row FROM chunks WHERE chunk_hash = ? AND active = 1 LIMIT 1", (chunk_hash,)).fetchone()
+                if row is not None:
+                    vectors[chunk_hash] = np.array(self._matrix[row[0]])
+        return vectors
+
+    def _normalize(self, vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _append_row(self) -> int:
+        row = self._rows
+        if row >= self._capacity:
+            self._open_matrix(self._capacity * 2)
+            active = np.zeros(self._capacity, dtype=bool)
+            active[:len(self._active)] = self._active
+            self._active = active
+        self._rows += 1
+        return row
+
+    def _open_matrix(self, capacity: int) -> None:
+        if getattr(self, "_matrix", None) is not None:
+            self._matrix.flush()
+            del self._matrix
+        size = capacity * self.dim * 4
+        with open(self.matrix_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._capacity = capacity
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _reset(self) -> None:
+        self._conn.execute("DELETE FROM chunks")
+        self._conn.execute("DELETE FROM files")
+        if os.path.exists(self.matrix_path):
+            os.remove(self.matrix_path)
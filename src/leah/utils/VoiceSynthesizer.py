@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+
+class VoiceSynthesizer:
+    """
+    Synthesizes speech clips with edge-tts on a pool of worker threads.
+
+    Clips are content addressed: the filename is derived from a hash of the voice
+    and the text, so a phrase that has been spoken before is served straight from
+    the voice directory. Requests for a clip that is still being synthesized share
+    the in-flight job instead of starting a second synthesis.
+
+    Every clip returned by submit is pinned until the client has fetched it (release)
+    or pin_seconds have passed, so eviction never deletes a clip a client is about to
+    request.
+    """
+
+    def __init__(self, voice_dir: str, workers: int = 4, max_cache_bytes: int = 256 * 1024 * 1024,
+                 pin_seconds: float = 600):
+        """
+        Initialize the synthesizer.
+
+        Args:
+            voice_dir (str): Directory the generated mp3 files are written to
+            workers (int): Number of clips that may be synthesized concurrently
+            max_cache_bytes (int): Size budget for the voice directory, the least recently
+                                   used clips are evicted once it is exceeded (0 disables eviction)
+            pin_seconds (float): How long a submitted clip is kept from eviction if it is never released
+        """
+        self.voice_dir = voice_dir
+        self.max_cache_bytes = max_cache_bytes
+        self.pin_seconds = pin_seconds
+        os.makedirs(self.voice_dir, exist_ok=True)
+        self._jobs: Dict[str, Future] = {}
+        # filename -> (number of unreleased submits, time the latest pin expires)
+        self._pins: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self._cache_bytes = None
+        self._loops = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="VoiceSynthesizer")
+
+    @staticmethod
+    def clip_name(text: str, voice: str) -> str:
+        """Return the content addressed filename for a clip of text spoken with voice."""
+        digest = hashlib.sha256(f"{voice}\0{text}".encode('utf-8')).hexdigest()[:32]
+        return f"{voice}_{digest}.mp3"
+
+    def get_path(self, filename: str) -> str:
+        return os.path.join(self.voice_dir, os.path.basename(filename))
+
+    def submit(self, text: str, voice: str) -> Optional[str]:
+        """
+        Queue a clip for synthesis and return its filename straight away.
+
+        If the clip already exists on disk or is being synthesized, no new work is queued.
+        The clip is pinned until release is called for it or pin_seconds have passed.
+
+        Returns:
+            Optional[str]: The clip filename, or None if there is nothing to speak
+        """
+        if not text or not text.strip():
+            return None
+        filename = self.clip_name(text, voice)
+        with self._lock:
+            count, _ = self._pins.get(filename, (0, 0))
+            self._pins[filename] = (count + 1, time.monotonic() + self.pin_seconds)
+            if filename in self._jobs:
+                return filename
+            if self.touch(filename):
+                return filename
+            self._jobs[filename] = self._executor.submit(self._run, filename, text, voice)
+        return filename
+
+    def wait(self, filename: str, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the clip is available on disk.
+
+        Returns:
+            bool: True if the clip exists, False if it is unknown or synthesis failed
+        """
+        with self._lock:
+            job = self._jobs.get(filename)
+        if job is not None:
+            try:
+                job.result(timeout=timeout)
+            except Exception as e:
+                print(f"Error waiting for voice {filename}: {e}")
+                return False
+        return os.path.exists(self.get_path(filename))
+
+    def release(self, filename: str) -> None:
+        """Unpin a clip returned by submit once it has been served."""
+        with self._lock:
+            count, expires = self._pins.get(filename, (0, 0))
+            if count > 1:
+                self._pins[filename] = (count - 1, expires)
+            else:
+                self._pins.pop(filename, None)
+
+    def touch(self, filename: str) -> bool:
+        """Mark a clip as recently used. Returns False if the clip does not exist."""
+        try:
+            os.utime(self.get_path(filename))
+            return True
+        except OSError:
+            return False
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _run(self, filename: str, text: str, voice: str) -> None:
+        voice_file_path = self.get_path(filename)
+        temp_path = f"{voice_file_path}.{uuid.uuid4().hex}.part"
+        try:
+            print(f"Generating voice for {filename} as {voice_file_path}")
+            self._synthesize(text, voice, temp_path)
+            os.replace(temp_path, voice_file_path)
+            self._account(os.path.getsize(voice_file_path))
+        except Exception as e:
+            print(f"Error generating voice for {filename}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        finally:
+            with self._lock:
+                self._jobs.pop(filename, None)
+
+    def _synthesize(self, text: str, voice: str, path: str) -> None:
+        """Write the spoken text to path. Each worker thread keeps its own event loop."""
+        import edge_tts
+        loop = getattr(self._loops, "loop", None)
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self._loops.loop = loop
+        communicate = edge_tts.Communicate(text=text, voice=voice)
+        loop.run_until_complete(communicate.save(path))
+
+    def _account(self, added_bytes: int) -> None:
+        if self.max_cache_bytes <= 0:
+            return
+        with self._lock:
+            if self._cache_bytes is None:
+                self._cache_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._cache_bytes += added_bytes
+            if self._cache_bytes > self.max_cache_bytes:
+                self._evict()
+
+    def _scan(self):
+        for entry in os.scandir(self.voice_dir):
+            if entry.is_file() and entry.name.endswith(".mp3"):
+                stat = entry.stat()
+                yield entry.name, stat.st_size, stat.st_mtime
+
+    def _evict(self) -> None:
+        """Delete the least recently used unpinned clips until the directory is back under 90% of the budget."""
+        now = time.monotonic()
+        # Drop the pins of clips that were never fetched
+        self._pins = {name: pin for name, pin in self._pins.items() if pin[1] > now}
+        clips = sorted(self._scan(), key=lambda clip: clip[2])
+        total = sum(size for _, size, _ in clips)
+        target = self.max_cache_bytes * 0.9
+        for name, size, _ in clips:
+            if total <= target:
+                break
+            if name in self._jobs or name in self._pins:
+                continue
+            try:
+                os.remove(os.path.join(self.voice_dir, name))
+                total -= size
+            except OSError:
+                pass
+        self._cache_bytes = total
@@ -11,23 +11,26 @@ from leah.llm.ChatApp import ChatApp
 from leah.utils.Message import MessageType
 from leah.utils.SubscriptionService import SubscriptionService
 from leah.utils.PubSub import PubSub
+from leah.utils.BrowserPool import BrowserPool
+from leah.utils.TrigramIndex import TrigramIndex
 from leah.utils.ConversationStore import ConversationStore
 from leah.config.GlobalConfig import GlobalConfig
 from leah.config.LocalConfigManager import LocalConfigManager
 from leah.utils.LogItem import LogItem, LogCollection
 from leah.utils.LogManager import LogManager
+from leah.utils.MemoryBuilder import MEMORIES_NOTE, MemoryBuilder
 from leah.utils.NotesManager import NotesManager
+from leah.utils.SpeechSegmenter import SpeechSegmenter
+from leah.utils.TextNormalizer import normalize_for_speech
+from leah.utils.VoiceSynthesizer import VoiceSynthesizer
 from leah.llm.StreamProcessor import StreamProcessor
 from leah.actors.PersonaActor import PersonaActor
 from urllib.parse import urlparse
-import asyncio
-import edge_tts
 import hashlib
 import json
 import mimetypes
 import os
 import queue
-import random
 import re
 import threading
 import tiktoken
@@ -69,6 +72,12 @@ system_actor.listen()
 task_actor = TaskActor()
 task_actor.listen()
 
+# Start the shared headless browsers now so the first page fetch does not wait for Chrome
+BrowserPool.get_instance()
+
+# Build the file search index in the background, if a root is configured
+TrigramIndex.get_instance()
+
 subscription_service = SubscriptionService()
 subscription_service.bind_subscribers()
 
@@ -116,7 +125,6 @@ indexing_queue = queue.Queue()
 
 def watch_indexing_queue():
     while True:
-        time.sleep(5)
         try:
             username, persona, query, full_response = indexing_queue.get()
             run_indexer(username, persona, query, full_response)
@@ -163,96 +171,22 @@ def add_to_memory_builder_queue(username, persona, conversation_id):
 
     memory_builder_queue.put((username, persona, conversation_id))
 
-def memory_template(memories: str) -> str:
-    return f"""
-Previous notes:
-
-START OF PREVIOUS NOTES
-{memories}
-END OF PREVIOUS NOTES
-
-Instructions:
-
-    - Create detailed notes about the conversation and combine them with the previous notes above.
-    - Make sure to keep a profile of the user and their interests.
-    - Make sure to keep a profile of your own knowledge, particularily any information about the user.
-    - Make sure to keep a profile of your self and you relationship with the user.
-    - These notes are written from your own perspective and about the user.
-    - Remove duplicate information.
-    - Make sure to include any files that are relevant to the conversation.
-    - Use a format that is easy for you to use for reference later.
-    - The reply should be no longer than 500 words.
-    - Don't include any other text than the notes.
-"""
-
 def memory_builder(username, persona, convo_id):
     print("Running memory builder")
     config_manager = LocalConfigManager(username, persona)
-    notesManager = config_manager.get_notes_manager()
-    memories = notesManager.get_note(f"memories/memories.txt")
-    if not memories:
-        notesManager.put_note(f"memories/memories.txt", "No previous notes.")
-    memories = notesManager.get_note(f"memories/memories.txt")
-   
-    prompt = memory_template(memories)
-    
-    orig_chatapp = ChatApp(config_manager, persona, convo_id)
-    history = orig_chatapp.history
-
-    chatapp = ChatApp(config_manager, persona)
-    chatapp.history = history
-
-    chatapp.set_system_content(f"You are {persona}. You are a rigorous and detailed note taker.\n\n" + prompt)
-    result = ChatApp.unstream(chatapp.stream("Generate new notes based on the conversation and the previous notes. Response should be no longer than 500 words and be in a human readable format.", use_tools=False))
-
-    notesManager.put_note(f"memories/memories.txt", result)
+    MemoryBuilder(config_manager, persona).update(convo_id)
  
 def run_indexer(username, persona, query, full_response): 
-    print("Running indexer")
     config_manager = LocalConfigManager(username, persona)
-    convo = (query + "\n" + full_response).split(" ")
-    if len(convo) > 300:
-        convo = convo[:299]
-    convo = " ".join(convo)
-    script = f"""
-Return five index terms relevant to the conversation below. Return the only the terms as a comma seperated list.
-
-The conversation:
-
-{convo}
-""" 
-    chatapp = ChatApp(config_manager,"summer")
-    result = ChatApp.unstream(chatapp.stream(script, use_tools=False))
-    terms = result.split(",")
-    print("Logging terms: " + terms)
-    logger = config_manager.get_log_manager()
-    for term in terms:
-        term = term.strip()
-        logger.log_index_item(term, "[USER] " + query)
-        logger.log_index_item(term, "[ASSISTANT] " + full_response)
-
-
-voice_files = {}
-voice_queue = queue.Queue()
-
-def voice_generator():
-    while True:
-        try:
-            time.sleep(1)
-            while not voice_queue.empty():
-                voice_filename, plain_text_content, voice = voice_queue.get()
-                voice_dir = os.path.join(WEB_DIR, 'voice')
-                voice_file_path = os.path.join(voice_dir, voice_filename)
-                if not os.path.exists(voice_file_path):
-                   print(f"Generating voice for {voice_filename} as {voice_file_path}")
-                   async def generate_voice():
-                     communicate = edge_tts.Communicate(text=plain_text_content, voice=voice)
-                     await communicate.save(voice_file_path)
-                   asyncio.run(generate_voice())
-                   del voice_files[voice_filename]         
-        except Exception as e:
-            print(f"Error in voice_generator: {e}")
-threading.Thread(target=voice_generator, daemon=True).start()
+    terms = config_manager.get_log_manager().index_exchange(query, full_response)
+    print("Indexed exchange under: " + ", ".join(terms))
+
+
+tts_config = config.get_tts_config()
+voice_synthesizer = VoiceSynthesizer(os.path.join(WEB_DIR, 'voice'),
+                                     workers=int(tts_config.get("workers", 4)),
+                                     max_cache_bytes=int(tts_config.get("max_cache_bytes", 256 * 1024 * 1024)),
+                                     pin_seconds=float(tts_config.get("pin_seconds", 600)))
 
 def token_required(f):
     @wraps(f)
@@ -317,37 +251,6 @@ def serve_image(username, persona, filename):
     image_dir = os.path.join(config_manager.get_persona_path("images"))
     return send_from_directory(image_dir, filename)
 
-# Function to strip markdown
-def strip_markdown(text):
-    """Remove markdown formatting from text."""
-    # Remove code blocks
-    text = re.sub(r'```[\s\S]*?```', '', text)
-    # Remove inline code
-    text = re.sub(r'`[^`]*`', '', text)
-    # Remove bold and italic
-    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-    text = re.sub(r'\*([^*]+)\*', r'\1', text)
-    text = re.sub(r'__([^_]+)__', r'\1', text)
-    text = re.sub(r'_([^_]+)_', r'\1', text)
-    return text.strip()
-
-def filter_emojis(text: str) -> str:
-    """Remove emojis from text."""
-    emoji_pattern = re.compile("["
-        u"\U0001F600-\U0001F64F"  # emoticons
-        u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-        u"\U0001F680-\U0001F6FF"  # transport & map symbols
-        u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
-        u"\U00002702-\U000027B0"
-        u"\U000024C2-\U0001F251"
-        "]+", flags=re.UNICODE)
-    return emoji_pattern.sub('', text)
-
-def filter_urls(text: str) -> str:
-    """Replace URLs with a placeholder text."""
-    url_pattern = r'https?://\S+'
-    return re.sub(url_pattern, 'URL', text)
-
 def context_template(message: str, context: str, extracted_url: str) -> str:
     now = datetime.now()
     today = now.strftime("%B %d, %Y")
@@ -364,21 +267,27 @@ Answer the query based on the context.
 """
 
 
-def generate_voice_file(plain_text_content, username, persona):
+def generate_voice_file(plain_text_content, persona):
     config = GlobalConfig()
     voice = config.get_voice(persona)
-    voice_dir = os.path.join(WEB_DIR, 'voice')
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S"+str(random.randint(0, 1000000)))
-    voice_file_path = os.path.join(voice_dir, f'{voice}_{username}_{timestamp}.mp3')
-    plain_text_content = strip_markdown(plain_text_content)
-    plain_text_content = filter_emojis(plain_text_content)
-    plain_text_content = filter_urls(plain_text_content)
-    # Remove '#' character
-    plain_text_content = plain_text_content.replace('#', '')
-    filename = os.path.basename(voice_file_path)
-    voice_files[filename] = (plain_text_content, voice)
-    voice_queue.put((filename, plain_text_content, voice))
-    return filename
+    return voice_synthesizer.submit(normalize_for_speech(plain_text_content), voice)
+
+def voice_chunk_event(chunk, persona, seq):
+    voice_filename = generate_voice_file(chunk, persona)
+    if not voice_filename:
+        return None
+    voice_file_info = {"type": "audio", "filename": voice_filename, "seq": seq}
+    return f"data: {json.dumps(voice_file_info)}\n\n"
+
+def message_voice_events(message, persona):
+    """Queue synthesis for every chunk of a published message and yield an audio event per chunk."""
+    channel = message.from_user if message.type == MessageType.DIRECT else message.via_channel
+    speech_segmenter = SpeechSegmenter()
+    chunks = speech_segmenter.feed(message.content) + speech_segmenter.flush()
+    for seq, chunk in enumerate(chunks):
+        voice_filename = generate_voice_file(chunk, persona)
+        if voice_filename:
+            yield f"data: {json.dumps({'type': 'audio', 'filename': voice_filename, 'seq': seq, 'channel': channel, 'message_id': message.id})}\n\n"
 
 def system_message(message: str) -> str:
     json_message = json.dumps({'type': 'system', 'content': message})
@@ -400,6 +309,8 @@ def subscribe():
     username = g.username
     subscription_service = SubscriptionService()
     subscription_service.subscribe("@"+username, "#system")
+    speak = request.args.get('voice', '') in ('1', 'true')
+    personas = GlobalConfig().get_personas()
     def generate_stream():    
         try:
             while True:
@@ -414,6 +325,9 @@ def subscribe():
                         yield "data: " + json.dumps(item.to_dict()) + "\n\n"
                     else:
                         yield "data: " + json.dumps(item.to_dict()) + "\n\n"
+                        persona = item.from_user.lstrip("@")
+                        if speak and persona in personas:
+                            yield from message_voice_events(item, persona)
                         yield f"data: {json.dumps({'conversation_id': '', 'type': 'break', 'content': ''})}\n\n"
                         yield f"data: {json.dumps({'conversation_id': '', 'type': 'end', 'content': ''})}\n\n"
         except Exception as e:
@@ -501,7 +415,7 @@ def query():
 
 
         notesManager = config_manager.get_notes_manager()
-        memories = notesManager.get_note(f"memories/memories.txt")
+        memories = notesManager.get_note(MEMORIES_NOTE)
         
         if memories:
             memories = "These are your memories from previous conversations: \n\n" + memories
@@ -510,7 +424,8 @@ def query():
         
         full_response = ""
         chatapp = ChatApp(config_manager, persona, conversation_id)
-        voice_buffer = ""
+        speech_segmenter = SpeechSegmenter()
+        voice_seq = 0
  
         original_query = data.get('query', '')
         if data.get('context',''):
@@ -536,15 +451,13 @@ def query():
                 continue
             elif type == "content":
                 if content:
-                    voice_buffer += content
                     full_response += content
-                    if voice_buffer.endswith(('.', '!', '?')) and len(voice_buffer) > 256:
-                        # Generate voice for the complete sentence
-                        voice_filename = generate_voice_file(voice_buffer, username, persona)
-                        voice_file_info = {"filename": voice_filename}
-                        yield f"data: {json.dumps(voice_file_info)}\n\n"
-                        # Reset the buffer
-                        voice_buffer = ""
+                    # Start synthesis as soon as a chunk is ready so audio can begin before the reply is complete
+                    for chunk in speech_segmenter.feed(content):
+                        voice_event = voice_chunk_event(chunk, persona, voice_seq)
+                        if voice_event:
+                            voice_seq += 1
+                            yield voice_event
                     if time.time() - last_send_time > 0.2 and len(send_buffer) > 128:
                         send_buffer += content
                         yield f"data: {json.dumps({'content': send_buffer})}\n\n"
@@ -556,10 +469,11 @@ def query():
         if send_buffer:
             yield f"data: {json.dumps({'content': send_buffer})}\n\n"
 
-        if voice_buffer:
-            voice_filename = generate_voice_file(voice_buffer, username, persona)
-            voice_file_info = {"filename": voice_filename}
-            yield f"data: {json.dumps(voice_file_info)}\n\n"
+        for chunk in speech_segmenter.flush():
+            voice_event = voice_chunk_event(chunk, persona, voice_seq)
+            if voice_event:
+                voice_seq += 1
+                yield voice_event
         
 
         yield f"data: {json.dumps({'type': 'end', 'content': 'END OF RESPONSE'})}\n\n"
@@ -568,7 +482,7 @@ def query():
         log_manager.log_chat("assistant", full_response)
         # Add the current request to the cleanup queue after the response is sent
         update_post_request_queue(username, persona, conversation_id)
-        # indexing_queue.put((username, persona, original_query, full_response))
+        indexing_queue.put((username, persona, original_query, full_response))
 
 
 
@@ -593,17 +507,15 @@ def query():
 
 @app.route('/voice/<voice_filename>')
 def serve_voice(voice_filename):
-    voice_dir = os.path.join(WEB_DIR, 'voice')
-    voice_file_path = os.path.join(voice_dir, voice_filename)
-    if not os.path.exists(voice_file_path):
-        plain_text_content, voice = voice_files[voice_filename]
-        print(f"Just in time Generating voice for {voice_filename} as {voice_file_path}")
-        async def generate_voice():
-            communicate = edge_tts.Communicate(text=plain_text_content, voice=voice)
-            await communicate.save(voice_file_path)
-        asyncio.run(generate_voice())
-        del voice_files[voice_filename]
-    return send_from_directory(voice_dir, voice_filename)
+    # Waits on the in-flight synthesis instead of generating the clip a second time
+    if not voice_synthesizer.wait(voice_filename, timeout=60):
+        return jsonify({"error": "Voice file not found"}), 404
+    voice_synthesizer.touch(voice_filename)
+    try:
+        # The file is open once the response exists, so the clip may be evicted after release
+        return send_from_directory(voice_synthesizer.voice_dir, voice_filename)
+    finally:
+        voice_synthesizer.release(voice_filename)
 
 @app.route('/personas', methods=['GET'])
 @token_required
@@ -626,6 +538,12 @@ def get_personas():
     out = {"personas": personas, "channels": channels}
     return jsonify(out)
 
+
+@app.route('/persona_metrics', methods=['GET'])
+@token_required
+def get_persona_metrics():
+    # Queue depths of the persona message executors, per channel
+    return jsonify({persona: actor.get_metrics() for persona, actor in actors.items()})
     
 @app.route('/avatars/<requested_avatar>')
 def serve_avatar(requested_avatar):
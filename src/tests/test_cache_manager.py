@@ -0,0 +1,69 @@
+import unittest
+import tempfile
+import time
+from leah.utils.CacheManager import CacheManager, CacheStore
+
+class DummyConfig:
+    def get_cache_config(self):
+        return {}
+
+class DummyConfigManager:
+    def __init__(self, root):
+        self.root = root
+
+    def get_path(self, filename):
+        return f"{self.root}/{filename}"
+
+    def get_config(self):
+        return DummyConfig()
+
+class TestCacheManager(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = CacheManager(DummyConfigManager(self.temp_dir.name))
+
+    def tearDown(self):
+        CacheManager._stores.pop(self.cache.store.cache_dir, None)
+        self.temp_dir.cleanup()
+
+    def test_set_get_delete(self):
+        self.cache.set("key", {"value": 1})
+        self.assertEqual(self.cache.get("key"), {"value": 1})
+        self.assertTrue(self.cache.delete("key"))
+        self.assertFalse(self.cache.delete("key"))
+        self.assertEqual(self.cache.get("key", "default"), "default")
+
+    def test_instances_share_store(self):
+        self.cache.set("key", "shared")
+        other = CacheManager(DummyConfigManager(self.temp_dir.name))
+        self.assertIs(other.store, self.cache.store)
+        self.assertEqual(other.get("key"), "shared")
+
+    def test_expiration(self):
+        self.cache.set("key", "value", expiration=-1)
+        self.assertIsNone(self.cache.get("key"))
+        self.cache.set("other", "value", expiration=-1)
+        self.cache.delete_expired()
+        self.assertEqual(self.cache.stats()["disk_bytes"], 0)
+
+    def test_reads_from_disk_after_memory_eviction(self):
+        store = CacheStore(self.temp_dir.name + "/small", max_memory_entries=1)
+        store.set("a", "first", 60)
+        store.set("b", "second", 60)
+        self.assertEqual(store.get("a"), "first")
+        self.assertEqual(store.stats()["disk_hits"], 1)
+        self.assertEqual(store.get("a"), "first")
+        self.assertEqual(store.stats()["memory_hits"], 1)
+
+    def test_disk_budget_evicts_least_recently_used(self):
+        store = CacheStore(self.temp_dir.name + "/budget", max_disk_bytes=3000)
+        for i in range(5):
+            store.set(f"key{i}", "x" * 1000, 60)
+            time.sleep(0.01)
+        stats = store.stats()
+        self.assertLessEqual(stats["disk_bytes"], 3000)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertEqual(store.get("key4"), "x" * 1000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import threading
+import time
+import unittest
+from leah.utils.ChannelExecutor import ChannelExecutor
+
+class TestChannelExecutor(unittest.TestCase):
+    def test_orders_channels_and_runs_them_in_parallel(self):
+        handled = []
+        running = set()
+        interleaved = []
+        overlap = threading.Event()
+        lock = threading.Lock()
+
+        def handler(item):
+            channel, number = item
+            with lock:
+                if channel in running:
+                    interleaved.append(item)
+                running.add(channel)
+                if len(running) > 1:
+                    overlap.set()
+            time.sleep(0.01)
+            with lock:
+                running.discard(channel)
+                handled.append(item)
+
+        executor = ChannelExecutor(handler, max_workers=2)
+        for number in range(5):
+            executor.submit("#a", ("#a", number))
+            executor.submit("#b", ("#b", number))
+        deadline = time.time() + 5
+        while not executor.idle() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(overlap.is_set())
+        self.assertEqual(interleaved, [])
+        for channel in ("#a", "#b"):
+            self.assertEqual([number for c, number in handled if c == channel], list(range(5)))
+        metrics = executor.metrics()
+        self.assertEqual((metrics["processed"], metrics["queued"], metrics["channels"]), (10, 0, {}))
+
+    def test_failures_do_not_stop_the_channel(self):
+        handled = []
+
+        def handler(item):
+            if item == 1:
+                raise ValueError("boom")
+            handled.append(item)
+
+        executor = ChannelExecutor(handler, max_workers=1)
+        for item in range(3):
+            executor.submit("#a", item)
+        deadline = time.time() + 5
+        while not executor.idle() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(handled, [0, 2])
+        self.assertEqual(executor.metrics()["failed"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
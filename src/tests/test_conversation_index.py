@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+from leah.utils.ConversationIndex import ConversationIndex
+
+class TestConversationIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index = ConversationIndex(os.path.join(self.temp_dir.name, "conversations.db"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_keywords_and_search(self):
+        terms = self.index.add_exchange("What is the capital of France?", "The capital of France is Paris.")
+        self.assertIn("france", terms)
+        self.assertNotIn("the", terms)
+        self.index.add_exchange("How do I bake bread?", "Knead the dough and let it rise.", ["Baking"])
+        self.assertEqual([hit.text for hit in self.index.search(["baking"])],
+                         ["[USER] How do I bake bread?\n[ASSISTANT] Knead the dough and let it rise."])
+        # Words that are not keywords are still found in the full text
+        self.assertEqual(len(self.index.search(["dough"])), 1)
+
+    def test_exchanges_stored_once(self):
+        self.index.add_exchange("Hello", "Hi there, how can I help?")
+        self.index.add_exchange("Hello", "Hi there, how can I help?", ["greeting"])
+        self.assertEqual(len(self.index.index), 1)
+        self.assertIn("greeting", self.index.top_keywords())
+
+    def test_import_term_logs(self):
+        index_dir = os.path.join(self.temp_dir.name, "index")
+        os.makedirs(index_dir)
+        for term in ("tomatoes", "garden"):
+            with open(os.path.join(index_dir, term + ".log"), "w") as f:
+                f.write("[2025-01-02_03-04-05] [USER] How do I grow tomatoes?\n"
+                        "[2025-01-02_03-04-06] [ASSISTANT] Plant them in full sun.\\nWater daily.\n")
+        self.assertEqual(self.index.import_term_logs(index_dir), 2)
+        self.assertEqual(len(self.index.index), 1)
+        hits = self.index.search(["garden"])
+        self.assertEqual(hits[0].text, "[USER] How do I grow tomatoes?\n[ASSISTANT] Plant them in full sun.\nWater daily.")
+
+if __name__ == '__main__':
+    unittest.main()
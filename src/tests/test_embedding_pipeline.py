@@ -0,0 +1,161 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+import numpy as np
+from leah.config.GlobalConfig import GlobalConfig
+from leah.llm.TokenRateLimiter import TokenRateLimiter
+from leah.tools.notesrag import NotesRag
+from leah.utils.EmbeddingPipeline import EmbeddingPipeline, HashingEmbedder
+
+class FlakyEmbedder(HashingEmbedder):
+    def __init__(self, failures):
+        super().__init__(dim=32)
+        self.failures = failures
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("temporarily unavailable")
+        return super().embed_documents(texts)
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__(dim=64)
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return super().embed_documents(texts)
+
+class RateLimitedEmbedder(HashingEmbedder):
+    rate_limit_key = "test-embeddings"
+
+    def __init__(self):
+        super().__init__(dim=8)
+        self.batches = 0
+
+    def embed_documents(self, texts):
+        self.batches += 1
+        # Keep the request in flight long enough for the other batches to check the limit
+        threading.Event().wait(0.2)
+        return super().embed_documents(texts)
+
+class StopWaiting(Exception):
+    pass
+
+class TestEmbeddingPipeline(unittest.TestCase):
+    def test_hashing_embedder_is_normalized_and_deterministic(self):
+        embedder = HashingEmbedder(dim=64)
+        vector = np.array(embedder.embed_query("water the tomatoes"))
+        self.assertAlmostEqual(float(np.linalg.norm(vector)), 1.0, places=5)
+        self.assertEqual(embedder.embed_documents(["water the tomatoes"])[0], vector.tolist())
+        self.assertEqual(np.count_nonzero(embedder.embed_query("")), 0)
+
+    def test_batches_keep_input_order(self):
+        embedder = HashingEmbedder(dim=64)
+        texts = [f"text number {i}" for i in range(23)]
+        pipeline = EmbeddingPipeline(embedder, batch_size=4, concurrency=3)
+        self.assertEqual(pipeline.embed(texts), embedder.embed_documents(texts))
+        self.assertEqual(pipeline.embed([]), [])
+
+    def test_failed_batches_are_retried(self):
+        with mock.patch("leah.utils.EmbeddingPipeline.time.sleep"):
+            pipeline = EmbeddingPipeline(FlakyEmbedder(failures=2), batch_size=10, concurrency=1, max_retries=2)
+            self.assertEqual(len(pipeline.embed(["a", "b"])), 2)
+            pipeline = EmbeddingPipeline(FlakyEmbedder(failures=3), batch_size=10, concurrency=1, max_retries=2)
+            with self.assertRaises(RuntimeError):
+                pipeline.embed(["a"])
+
+    def test_concurrent_batches_stay_within_the_rate_limit(self):
+        limiter = TokenRateLimiter()
+        limiter._token_usage.pop("test-embeddings", None)
+        embedder = RateLimitedEmbedder()
+
+        def stop(seconds):
+            raise StopWaiting()
+        # Each batch of one 160 character text is estimated at 40 tokens, so two fit in 100 tokens a minute
+        with mock.patch.object(GlobalConfig, "get_connector_rate_limit", return_value=100), \
+                mock.patch("leah.utils.EmbeddingPipeline.time.sleep", stop):
+            pipeline = EmbeddingPipeline(embedder, batch_size=1, concurrency=4, max_retries=0)
+            with self.assertRaises(StopWaiting):
+                pipeline.embed(["x" * 160] * 4)
+        self.assertEqual(embedder.batches, 2)
+        self.assertEqual(sum(tokens for _, tokens in limiter._token_usage.pop("test-embeddings")), 80)
+
+    def test_reserve_tokens_is_atomic(self):
+        limiter = TokenRateLimiter()
+        limiter._token_usage.pop("test-reserve", None)
+        barrier = threading.Barrier(8, timeout=5)
+        results = []
+
+        def reserve():
+            barrier.wait()
+            results.append(limiter.reserve_tokens("test-reserve", 40))
+        with mock.patch.object(GlobalConfig, "get_connector_rate_limit", return_value=100):
+            threads = [threading.Thread(target=reserve) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        limiter._token_usage.pop("test-reserve", None)
+        self.assertEqual(results.count(True), 2)
+
+class TestNotesRagIndexing(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.embedder = CountingEmbedder()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, content, mtime):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def rag(self, files):
+        return NotesRag(files, index_dir=os.path.join(self.temp_dir.name, "index"), embedder=self.embedder,
+                        chunk_size=1000, chunk_overlap=0)
+
+    def test_only_changed_chunks_are_embedded(self):
+        now = time.time()
+        a = self.write("a.txt", "Tomatoes need sun.", now)
+        rag = self.rag([a])
+        self.assertEqual(self.embedder.embedded, ["Tomatoes need sun."])
+        self.assertEqual(rag.update_files([a]), 0)
+        self.write("a.txt", "Tomatoes need water.", now + 1)
+        self.assertEqual(rag.update_files([a]), 1)
+        self.assertEqual(rag.similarity_search("tomatoes water", k=1)[0].page_content, "Tomatoes need water.")
+
+    def test_chunk_moving_between_files_of_a_group(self):
+        now = time.time()
+        a = self.write("a.txt", "Shared chunk about tomatoes.", now)
+        b = self.write("b.txt", "Something else entirely.", now)
+        rag = self.rag([a, b])
+        # File a drops the chunk and file b picks it up in the same indexing run
+        self.write("a.txt", "New text in a.", now + 1)
+        self.write("b.txt", "Shared chunk about tomatoes.", now + 1)
+        self.embedder.embedded = []
+        self.assertEqual(rag.update_files([a, b]), 1)
+        self.assertEqual(self.embedder.embedded, ["New text in a."])
+        hit = rag.similarity_search("tomatoes", k=1)[0]
+        self.assertEqual((hit.metadata["source"], hit.page_content), (b, "Shared chunk about tomatoes."))
+
+    def test_search_only_returns_the_instance_files(self):
+        now = time.time()
+        a = self.write("a.txt", "Tomatoes need sun.", now)
+        c = self.write("c.txt", "Tomatoes need water.", now)
+        self.rag([a, c])
+        rag = self.rag([a])
+        self.assertEqual({hit.metadata["source"] for hit in rag.similarity_search("tomatoes", k=3)}, {a})
+        rag.add_documents(["Tomatoes grow in summer."])
+        self.assertEqual(len(rag.similarity_search("tomatoes", k=3)), 2)
+
+if __name__ == '__main__':
+    unittest.main()
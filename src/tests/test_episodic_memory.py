@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+from leah.utils.EpisodicMemory import EpisodicMemory, SUMMARY, format_memories
+
+DAY = 86400
+NOW = 1000 * DAY
+
+class TestEpisodicMemory(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.memory = EpisodicMemory(os.path.join(self.temp_dir.name, "memories.db"), half_life_days=30, recency_weight=0.5)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_recall_ranks_relevance_and_recency(self):
+        self.memory.add("The user's cat is called Miso.", timestamp=NOW - 400 * DAY)
+        self.memory.add("The user adopted a second cat.", timestamp=NOW - DAY)
+        self.memory.add("We talked about the weather in Oslo.", timestamp=NOW - DAY)
+        hits = self.memory.recall("what is my cat called?", k=2, now=NOW)
+        # The old memory matches more terms and is still recalled despite its age
+        self.assertEqual(hits[0].text, "The user's cat is called Miso.")
+        self.assertEqual(hits[1].text, "The user adopted a second cat.")
+
+    def test_recall_fills_with_recent_memories(self):
+        self.memory.add("First", timestamp=NOW - 2 * DAY)
+        self.memory.add("Second", timestamp=NOW - DAY)
+        self.assertEqual([hit.text for hit in self.memory.recall("hello", k=1, now=NOW)], ["Second"])
+        self.assertEqual(len(self.memory.recall('"unmatched quote', k=5, now=NOW)), 2)
+
+    def test_set_summary_replaces_paragraphs(self):
+        self.memory.set_summary("User likes tea.\n\nUser lives in Oslo.", timestamp=1)
+        self.memory.set_summary("User likes coffee.\n\nUser lives in Oslo.", timestamp=2)
+        hits = self.memory.index.recent(10, SUMMARY)
+        self.assertEqual({(hit.text, hit.timestamp) for hit in hits}, {("User likes coffee.", 2), ("User lives in Oslo.", 1)})
+        self.assertIn("[", format_memories(hits))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from leah.utils.ExpiringIdSet import ExpiringIdSet
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestExpiringIdSet(unittest.TestCase):
+    def test_add_reports_duplicates(self):
+        ids = ExpiringIdSet(max_size=10)
+        self.assertTrue(ids.add("a"))
+        self.assertFalse(ids.add("a"))
+        self.assertIn("a", ids)
+        self.assertNotIn("b", ids)
+
+    def test_oldest_ids_are_dropped_when_full(self):
+        ids = ExpiringIdSet(max_size=2)
+        ids.add("a")
+        ids.add("b")
+        ids.add("a")
+        ids.add("c")
+        self.assertEqual(len(ids), 2)
+        self.assertNotIn("b", ids)
+        self.assertIn("a", ids)
+
+    def test_ids_expire_after_ttl(self):
+        clock = FakeClock()
+        ids = ExpiringIdSet(max_size=10, ttl=5, clock=clock)
+        ids.add("a")
+        clock.now = 3
+        ids.add("b")
+        clock.now = 6
+        self.assertNotIn("a", ids)
+        self.assertIn("b", ids)
+        self.assertTrue(ids.add("a"))
+
+if __name__ == '__main__':
+    unittest.main()
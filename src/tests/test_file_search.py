@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from leah.utils.FileSearch import FileSearch, IgnoreRules
+
+class TestFileSearch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.write(".gitignore", "*.log\nbuild/\n!keep.log\n")
+        self.write("src/main.py", "print('Hello')\n# hello again\n")
+        self.write("src/debug.log", "hello from the log\n")
+        self.write("src/keep.log", "hello, kept\n")
+        self.write("build/out.txt", "hello from build\n")
+        self.write("node_modules/lib.js", "hello from node\n")
+        with open(os.path.join(self.root, "image.bin"), "wb") as f:
+            f.write(b"hello\0binary")
+        self.search = FileSearch(workers=2)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def test_walk_respects_ignore_rules(self):
+        paths = sorted(os.path.relpath(entry.path, self.root) for entry in self.search.walk(self.root))
+        self.assertEqual(paths, [".gitignore", "image.bin", "src", os.path.join("src", "keep.log"), os.path.join("src", "main.py")])
+
+    def test_content_search(self):
+        main = os.path.join(self.root, "src", "main.py")
+        results = list(self.search.search("hello", self.root))
+        self.assertEqual(results, [os.path.join(self.root, "src", "keep.log") + ":1:hello, kept",
+                                   main + ":1:print('Hello')", main + ":2:# hello again"])
+        self.assertEqual(list(self.search.search("Hello", self.root, case_sensitive=True)), [main + ":1:print('Hello')"])
+        self.assertEqual(list(self.search.search(r"^# \w+", self.root, regex=True)), [main + ":2:# hello again"])
+        self.assertEqual(len(list(self.search.search("hello", self.root, max_results=2))), 2)
+
+    def test_non_ascii_content(self):
+        self.write("notes/cafe.txt", "Café Über alles\nplain line\n")
+        path = os.path.join(self.root, "notes", "cafe.txt")
+        self.assertEqual(list(self.search.search(r"caf\w", self.root, regex=True)), [path + ":1:Café Über alles"])
+        self.assertEqual(list(self.search.search(r"^\w+ .ber", self.root, regex=True)), [path + ":1:Café Über alles"])
+        self.assertEqual(list(self.search.search("über", self.root)), [path + ":1:Café Über alles"])
+        self.assertEqual(list(self.search.search("CAFÉ", self.root)), [path + ":1:Café Über alles"])
+        self.assertEqual(list(self.search.search("über", self.root, case_sensitive=True)), [])
+
+    def test_case_folding_across_chunks(self):
+        self.write("long.txt", "x" * 10 + "\nabc HeLLo\n" + "y" * 20 + "hello\n")
+        path = os.path.join(self.root, "long.txt")
+        with mock.patch("leah.utils.FileSearch.FOLD_CHUNK_BYTES", 8):
+            results = list(self.search.search("HELLO", path))
+        self.assertEqual(results, [path + ":2:abc HeLLo", path + ":3:" + "y" * 20 + "hello"])
+
+    def test_find_names(self):
+        self.assertEqual(list(self.search.find_names(["MAIN"], self.root)), [os.path.join(self.root, "src", "main.py")])
+
+    def test_anchored_rules(self):
+        rules = IgnoreRules(tuple(IgnoreRules.parse(["/docs/**/*.md", "tmp"], "/repo")))
+        self.assertTrue(rules.ignored("/repo/docs/a/b.md", False))
+        self.assertFalse(rules.ignored("/repo/src/docs/b.md", False))
+        self.assertTrue(rules.ignored("/repo/src/tmp", True))
+
+if __name__ == '__main__':
+    unittest.main()
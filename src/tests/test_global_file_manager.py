@@ -63,6 +63,22 @@ class TestGlobalFileManager(unittest.TestCase):
         lines = self.read_file()
         self.assertEqual(lines, ['line1', 'line2', 'line4'])
 
+    def test_append_file_lines(self):
+        result = self.gfm.append_file_lines(self.test_file, ['line5', 'line6'])
+        self.assertEqual(self.read_file(), ['line1', 'line2', 'line3', 'line4', 'line5', 'line6'])
+        self.assertIn('appended the lines', result)
+        with open(self.test_file, 'a', encoding='utf-8') as f:
+            f.write('\n')
+        self.gfm.append_file_lines(self.test_file, ['line7'])
+        self.assertEqual(self.read_file()[-2:], ['line6', 'line7'])
+
+    def test_edit_file(self):
+        self.gfm.edit_file(self.test_file, 6, 5, 'LINE2')
+        self.assertEqual(self.read_file(), ['line1', 'LINE2', 'line3', 'line4'])
+        self.gfm.edit_file(self.test_file, 100, 0, '!')
+        self.assertEqual(self.read_file()[-1], 'line4!')
+        self.assertEqual([name for name in os.listdir(self.write_root) if name.endswith('.tmp')], [])
+
 
     def test_get_file_lines(self):
         # Write a file with known lines
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from leah.utils.InvertedIndex import InvertedIndex, make_snippet
+from leah.utils.NotesManager import NotesManager
+
+class DummyConfigManager:
+    def __init__(self, root):
+        self.root = root
+
+    def get_path(self, filename):
+        return os.path.join(self.root, filename)
+
+class TestInvertedIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index = InvertedIndex(os.path.join(self.temp_dir.name, "index.db"))
+        self.index.add("garden", "Tomatoes need sun. Water the tomatoes every morning.", timestamp=1)
+        self.index.add("car", "The car needs new tires before winter.", timestamp=2)
+        self.index.add("trip", "Bring sun cream and a water bottle on the trip.", timestamp=3)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_ranking(self):
+        hits = self.index.search("tomatoes water")
+        self.assertEqual([hit.doc_id for hit in hits], ["garden", "trip"])
+        self.assertEqual(self.index.search("tires")[0].doc_id, "car")
+        self.assertEqual(self.index.search("unknown"), [])
+
+    def test_phrase_and_time_range(self):
+        self.assertEqual([hit.doc_id for hit in self.index.search('"water bottle"')], ["trip"])
+        self.assertEqual([hit.doc_id for hit in self.index.search("water", since=2)], ["trip"])
+        self.assertEqual([hit.doc_id for hit in self.index.search("sun water", require_all=True, until=2)], ["garden"])
+
+    def test_replace_and_remove(self):
+        self.index.add("car", "Sold the car.", timestamp=4)
+        self.assertEqual(self.index.search("tires"), [])
+        self.assertTrue(self.index.remove("car"))
+        self.assertEqual(len(self.index), 2)
+        reopened = InvertedIndex(self.index.db_path)
+        self.assertEqual(len(reopened), 2)
+
+    def test_snippet(self):
+        text = "filler " * 100 + "the important part" + " filler" * 100
+        snippet = make_snippet(text, ["important"], width=60)
+        self.assertIn("important", snippet)
+        self.assertTrue(snippet.startswith("...") and snippet.endswith("..."))
+
+class TestNotesSearch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.notes = NotesManager(DummyConfigManager(self.temp_dir.name))
+
+    def tearDown(self):
+        InvertedIndex._indexes.pop(self.notes.index.db_path, None)
+        self.temp_dir.cleanup()
+
+    def test_search_contents_and_names(self):
+        self.notes.put_note("shopping_list", "Milk, eggs and bread")
+        self.notes.put_note("ideas", "Build a bird house")
+        self.assertEqual([hit.doc_id for hit in self.notes.search_notes("eggs")], ["shopping_list.note"])
+        self.assertEqual([hit.doc_id for hit in self.notes.search_notes("shopping")], ["shopping_list.note"])
+
+    def test_sync_picks_up_external_changes(self):
+        with open(os.path.join(self.notes.notes_directory, "manual.note"), "w") as f:
+            f.write("Written by hand")
+        self.assertEqual([hit.doc_id for hit in self.notes.search_notes("hand")], ["manual.note"])
+        os.remove(os.path.join(self.notes.notes_directory, "manual.note"))
+        self.assertEqual(self.notes.search_notes("hand"), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+from leah.utils.LineIndex import LineIndex
+
+class TestLineIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "test.log")
+        with open(self.path, "w", encoding="utf-8", newline="") as f:
+            f.write("".join(f"line {i} é\r\n" for i in range(1, 3001)) + "last")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_read_lines(self):
+        index = LineIndex.for_file(self.path)
+        self.assertEqual(index.line_count, 3001)
+        self.assertEqual(index.read_lines(2048, 2050), ["line 2048 é\n", "line 2049 é\n", "line 2050 é\n"])
+        self.assertEqual(index.read_lines(3000), ["line 3000 é\n", "last"])
+        self.assertEqual(list(index.iter_lines(3000)), [(3000, "line 3000 é"), (3001, "last")])
+
+    def test_read_chars(self):
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            content = f.read()
+        index = LineIndex.for_file(self.path)
+        self.assertEqual(index.read_chars(20000, 50), content[20000:20050])
+        self.assertEqual(index.read_chars(len(content) - 3, 50), "ast")
+
+    def test_invalidated_when_file_changes(self):
+        index = LineIndex.for_file(self.path)
+        self.assertIs(LineIndex.for_file(self.path), index)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\nmore")
+        index = LineIndex.for_file(self.path)
+        self.assertEqual(index.line_count, 3002)
+        self.assertEqual(index.read_lines(3002), ["more"])
+
+if __name__ == '__main__':
+    unittest.main()
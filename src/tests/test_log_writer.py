@@ -0,0 +1,122 @@
+import glob
+import gzip
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from leah.utils.LogQuery import LogQuery, reverse_lines
+from leah.utils.LogWriter import LogWriter
+
+class TestLogWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "logs", "chat.log")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def segments(self, pattern="chat.*.log*"):
+        return glob.glob(os.path.join(self.temp_dir.name, "logs", pattern))
+
+    def read(self, path):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            return f.read()
+
+    def test_flush_makes_queued_entries_visible(self):
+        writer = LogWriter(flush_interval=60)
+        writer.write(self.path, "first\n")
+        writer.write(self.path, "second\n")
+        self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(writer.flush())
+        self.assertEqual(self.read(self.path), "first\nsecond\n")
+        writer.shutdown()
+        # Entries written after shutdown are written right away
+        writer.write(self.path, "third\n")
+        self.assertEqual(self.read(self.path), "first\nsecond\nthird\n")
+
+    def test_rotates_by_size_and_keeps_backup_count_segments(self):
+        writer = LogWriter(flush_interval=60, max_bytes=100, backup_count=3)
+        entries = [f"entry {i:02d} " + "x" * 50 + "\n" for i in range(12)]
+        for entry in entries:
+            writer.write(self.path, entry, rotate=True)
+            self.assertTrue(writer.flush())
+            # Segments are ordered by modification time, which must differ between rotations
+            time.sleep(0.02)
+        writer.shutdown()
+        segments = self.segments()
+        self.assertEqual(len(segments), 3)
+        self.assertTrue(all(segment.endswith(".log.gz") for segment in segments))
+        self.assertEqual(self.read(self.path), "".join(entries[10:]))
+        segments.sort(key=os.path.getmtime)
+        self.assertEqual("".join(self.read(segment) for segment in segments), "".join(entries[4:10]))
+
+    def test_rotates_by_date(self):
+        writer = LogWriter(flush_interval=60, compress=False)
+        writer.write(self.path, "yesterday\n", rotate=True)
+        self.assertTrue(writer.flush())
+        yesterday = time.time() - 86400
+        os.utime(self.path, (yesterday, yesterday))
+        writer.write(self.path, "today\n", rotate=True)
+        # Files written without rotate are never rotated
+        other = os.path.join(self.temp_dir.name, "logs", "other.log")
+        writer.write(other, "kept\n")
+        self.assertTrue(writer.flush())
+        writer.shutdown()
+        stamp = time.strftime('%Y-%m-%d_%H-%M-%S', time.localtime(yesterday))
+        segment = os.path.join(self.temp_dir.name, "logs", f"chat.{stamp}.log")
+        self.assertEqual(self.segments(), [segment])
+        self.assertEqual(self.read(segment), "yesterday\n")
+        self.assertEqual(self.read(self.path), "today\n")
+        self.assertEqual(self.segments("other.*.log*"), [])
+
+class TestLogQuery(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "chat.log")
+
+    def tearDown(self):
+        LogQuery._cache.pop(self.path, None)
+        self.temp_dir.cleanup()
+
+    def write(self, content):
+        with open(self.path, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+
+    def test_reverse_lines_across_blocks(self):
+        lines = [f"line {i} " + "é" * (i % 5) for i in range(50)]
+        self.write("\n".join(lines) + "\n")
+        for block_size in (1, 3, 7, 64, 65536):
+            self.assertEqual(list(reverse_lines(self.path, block_size)), lines[::-1])
+
+    def test_reverse_lines_without_trailing_newline(self):
+        self.write("first\n\nsecond\nlast")
+        for block_size in (1, 4, 5, 65536):
+            self.assertEqual(list(reverse_lines(self.path, block_size)), ["last", "second", "first"])
+        self.write("only")
+        self.assertEqual(list(reverse_lines(self.path, 2)), ["only"])
+        self.write("")
+        self.assertEqual(list(reverse_lines(self.path, 2)), [])
+
+    def test_tail_items(self):
+        lines = [f"[2026-01-01_10-00-{i:02d}] user message {i}\\nwrapped" for i in range(30)]
+        self.write("\n".join(lines[:10]) + "\nnot an entry\n" + "\n".join(lines[10:]))
+        query = LogQuery()
+        self.assertEqual(query.tail_items(self.path, 0), [])
+        with mock.patch.object(LogQuery, "TAIL_THRESHOLD", 0):
+            tail = query.tail_items(self.path, 25)
+            self.assertNotIn(self.path, LogQuery._cache)
+        # The last line has no newline yet, so it may still be being written
+        self.assertEqual([item.message for item in tail], [f"message {i}\nwrapped" for i in range(4, 29)])
+        self.assertEqual([(item.date, item.message) for item in tail],
+                         [(item.date, item.message) for item in query.file_items(self.path)[-25:]])
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n")
+        LogQuery._cache.pop(self.path)
+        with mock.patch.object(LogQuery, "TAIL_THRESHOLD", 0):
+            self.assertEqual(query.tail_items(self.path, 1)[0].message, "message 29\nwrapped")
+        self.assertEqual(len(query.tail_items(self.path, 100)), 30)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from langchain_core.messages import AIMessage, HumanMessage
+from leah.utils.ConversationStore import ConversationStore
+from leah.utils.InvertedIndex import InvertedIndex
+from leah.utils.MemoryBuilder import MEMORIES_NOTE, MemoryBuilder
+from leah.utils.NotesManager import NotesManager
+from leah.utils.NoteVersionStore import NoteVersionStore
+
+class DummyFileManager:
+    def __init__(self):
+        self.files = {}
+
+    def get_file(self, name):
+        return self.files.get(name)
+
+    def put_file(self, name, content):
+        self.files[name] = content
+
+class DummyConfigManager:
+    def __init__(self, root):
+        self.root = root
+        self.file_manager = DummyFileManager()
+
+    def get_path(self, filename):
+        return os.path.join(self.root, filename)
+
+    def get_notes_manager(self):
+        return NotesManager(self)
+
+    def get_file_manager(self):
+        return self.file_manager
+
+class TestMemoryBuilder(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_manager = DummyConfigManager(self.temp_dir.name)
+        self.notes = self.config_manager.get_notes_manager()
+        self.store = ConversationStore(self.config_manager.get_file_manager())
+        self.prompts = []
+        self.builder = MemoryBuilder(self.config_manager, "leah", self.summarize, fanout=3, max_levels=2)
+        self.history = []
+
+    def tearDown(self):
+        InvertedIndex._indexes.pop(self.notes.index.db_path, None)
+        NoteVersionStore._stores.pop(self.notes.versions.directory, None)
+        self.temp_dir.cleanup()
+
+    def summarize(self, prompt):
+        self.prompts.append(prompt)
+        return "folded" if "Combine the notes" in prompt else f"summary {len(self.prompts)}"
+
+    def add_turn(self, i):
+        self.history += [HumanMessage(f"question {i}", id=f"h{i}"), AIMessage(f"answer {i}", id=f"a{i}")]
+        self.store.save_conversation("convo", self.history)
+
+    def test_only_new_turns_are_summarized(self):
+        self.add_turn(1)
+        self.assertTrue(self.builder.update("convo"))
+        self.add_turn(2)
+        self.assertTrue(self.builder.update("convo"))
+        self.assertFalse(self.builder.update("convo"))
+        self.assertIn("question 1", self.prompts[0])
+        self.assertNotIn("question 1", self.prompts[1])
+        self.assertIn("question 2", self.prompts[1])
+        self.assertEqual(self.notes.get_note(MEMORIES_NOTE), "summary 1\n\nsummary 2")
+
+    def test_summaries_are_folded(self):
+        for i in range(3):
+            self.add_turn(i)
+            self.builder.update("convo")
+        self.assertEqual(len(self.prompts), 4)
+        self.assertEqual(self.notes.get_note(MEMORIES_NOTE), "folded")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import threading
+import time
+import unittest
+from leah.actors.MemoryConsolidator import MemoryConsolidator
+
+class FastConsolidator(MemoryConsolidator):
+    POLL_INTERVAL = 0.01
+    RETRY_DELAY = 0.2
+
+class FakePersona:
+    def __init__(self):
+        self.memories = "Old memories."
+        self.prompts = []
+        self.idle = True
+        self.summarized = threading.Event()
+
+    def summarize(self, prompt):
+        self.prompts.append(prompt)
+        self.summarized.set()
+        return f"Memories {len(self.prompts)}"
+
+    def store(self, memories):
+        self.memories = memories
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+class TestMemoryConsolidator(unittest.TestCase):
+    def setUp(self):
+        self.persona = FakePersona()
+
+    def consolidator(self, **kwargs):
+        return FastConsolidator("test", self.persona.summarize, lambda: self.persona.memories, self.persona.store,
+                                lambda: self.persona.idle, **kwargs)
+
+    def test_full_batch_is_consolidated_in_one_request(self):
+        self.persona.idle = False
+        consolidator = self.consolidator(batch_size=3, idle_seconds=60, max_delay=60)
+        for i in range(3):
+            consolidator.add(f"Exchange {i}")
+        self.assertTrue(wait_for(lambda: consolidator.consolidations == 1))
+        self.assertEqual(len(self.persona.prompts), 1)
+        prompt = self.persona.prompts[0]
+        self.assertTrue(prompt.startswith("Old memories.\n\nExchange 0\n\nExchange 1\n\nExchange 2"))
+        self.assertEqual(self.persona.memories, "Memories 1")
+        self.assertEqual(consolidator.pending(), 0)
+
+    def test_waits_for_idle_time(self):
+        self.persona.idle = False
+        consolidator = self.consolidator(batch_size=10, idle_seconds=0.2, max_delay=60)
+        consolidator.add("Exchange 1")
+        consolidator.add("Exchange 2")
+        self.assertFalse(self.persona.summarized.wait(0.4))
+        self.persona.idle = True
+        started = time.monotonic()
+        self.assertTrue(self.persona.summarized.wait(5))
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+        self.assertTrue(wait_for(lambda: consolidator.consolidations == 1))
+        self.assertIn("Exchange 1\n\nExchange 2", self.persona.prompts[0])
+
+    def test_max_delay_applies_while_busy(self):
+        self.persona.idle = False
+        consolidator = self.consolidator(batch_size=10, idle_seconds=60, max_delay=0.2)
+        consolidator.add("Exchange")
+        self.assertTrue(wait_for(lambda: consolidator.consolidations == 1))
+        self.assertEqual(len(self.persona.prompts), 1)
+
+    def test_flush_and_failures(self):
+        consolidator = self.consolidator(batch_size=10, idle_seconds=60, max_delay=60)
+        consolidator.flush()
+        self.assertEqual(self.persona.prompts, [])
+        consolidator.add("Exchange")
+        consolidator.flush()
+        self.assertEqual((len(self.persona.prompts), self.persona.memories), (1, "Memories 1"))
+
+        def fail(prompt):
+            raise RuntimeError("rate limited")
+        consolidator.summarize = fail
+        consolidator.add("Another exchange")
+        consolidator.flush()
+        self.assertEqual(self.persona.memories, "Memories 1")
+        self.assertEqual(consolidator.consolidations, 1)
+        # The failed batch waits for a retry
+        self.assertEqual(consolidator.pending(), 1)
+
+    def test_failed_batch_is_retried(self):
+        self.persona.idle = False
+        consolidator = self.consolidator(batch_size=2, idle_seconds=60, max_delay=60)
+        failures = []
+
+        def summarize(prompt):
+            if not failures:
+                failures.append(time.monotonic())
+                raise RuntimeError("rate limited")
+            return self.persona.summarize(prompt)
+        consolidator.summarize = summarize
+        consolidator.add("Exchange 1")
+        consolidator.add("Exchange 2")
+        self.assertTrue(wait_for(lambda: failures))
+        consolidator.add("Exchange 3")
+        self.assertTrue(wait_for(lambda: consolidator.consolidations == 1))
+        self.assertGreaterEqual(time.monotonic() - failures[0], 0.15)
+        self.assertEqual(len(self.persona.prompts), 1)
+        self.assertIn("Exchange 1\n\nExchange 2\n\nExchange 3", self.persona.prompts[0])
+        self.assertEqual(consolidator.pending(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
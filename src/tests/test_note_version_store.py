@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+import uuid
+from unittest import mock
+from leah.utils.InvertedIndex import InvertedIndex
+from leah.utils.NoteVersionStore import AVERAGE_CHUNK_SIZE, MAX_CHUNK_SIZE, NoteVersionStore, split_chunks
+from leah.utils.NotesManager import NotesManager
+
+class DummyConfigManager:
+    def __init__(self, root):
+        self.root = root
+
+    def get_path(self, filename):
+        return os.path.join(self.root, filename)
+
+class TestNoteVersionStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = NoteVersionStore(self.temp_dir.name, keep_versions=3)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def objects(self):
+        return sum(len(files) for _, _, files in os.walk(self.store.objects_directory))
+
+    def size(self):
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, files in os.walk(self.store.directory) for name in files)
+
+    def reminders(self, count):
+        return "".join(f"Reminder: item {i},When: tomorrow, Stored at: 2025-01-01 10:00:00, ID: {uuid.UUID(int=i)}\n"
+                       for i in range(count))
+
+    def test_split_chunks(self):
+        content = self.reminders(500) + "A line without a newline"
+        chunks = split_chunks(content)
+        self.assertEqual("".join(chunks), content)
+        self.assertTrue(all(chunk.endswith("\n") for chunk in chunks[:-1]))
+        self.assertTrue(all(len(chunk) <= 2 * MAX_CHUNK_SIZE for chunk in chunks))
+        # Prepending a line only changes the chunks at the start
+        prepended = split_chunks("Reminder: a new one\n" + content)
+        self.assertEqual(prepended[-len(chunks) + 2:], chunks[2:])
+        self.assertEqual(split_chunks("x" * (MAX_CHUNK_SIZE + 10)), ["x" * MAX_CHUNK_SIZE, "x" * 10])
+        self.assertEqual(split_chunks(""), [])
+
+    def test_prepending_stores_about_the_prepended_text(self):
+        note = self.reminders(1000)
+        self.store.save("reminders.note", note)
+        for i in range(3):
+            before = self.size()
+            line = f"Reminder: new item {i},When: now, Stored at: 2025-01-02 09:00:00, ID: {uuid.UUID(int=10000 + i)}\n"
+            note = line + note
+            self.store.save("reminders.note", note)
+            # One new chunk of about AVERAGE_CHUNK_SIZE (compressed) and a short index line, not the whole note
+            self.assertLess(self.size() - before, len(line) + AVERAGE_CHUNK_SIZE)
+            self.assertEqual(self.store.get("reminders.note"), note)
+
+    def test_versions_share_unchanged_chunks(self):
+        base = self.reminders(200)
+        self.assertEqual(self.store.save("memories.note", base), 1)
+        self.assertEqual(self.store.save("memories.note", base), 1)
+        objects = self.objects()
+        self.assertEqual(self.store.save("memories.note", base + "One more line"), 2)
+        self.assertEqual(self.objects(), objects + 1)
+        self.assertEqual(self.store.get("memories.note", 1), base)
+        self.assertEqual(self.store.get("memories.note"), base + "One more line")
+        self.assertEqual([entry["version"] for entry in self.store.versions("memories.note")], [1, 2])
+        with open(self.store._versions_path("memories.note")) as f:
+            self.assertIn('"delta"', f.readlines()[1])
+
+    def test_interrupted_append_does_not_corrupt_later_versions(self):
+        self.store.save("todo.note", "First version")
+        with open(self.store._versions_path("todo.note"), "a") as f:
+            f.write('{"version": 2, "timest')
+        self.store.save("todo.note", "Second version")
+        self.store.save("todo.note", "Third version")
+        self.assertEqual([self.store.get("todo.note", version) for version in (1, 2, 3)],
+                         ["First version", "Second version", "Third version"])
+
+    def test_retention_removes_unreferenced_objects(self):
+        store = NoteVersionStore(self.temp_dir.name, keep_versions=3, prune_batch=1)
+        for i in range(5):
+            store.save("todo.note", f"Shared\n\nVersion {i}")
+        self.assertEqual([entry["version"] for entry in store.versions("todo.note")], [3, 4, 5])
+        self.assertIsNone(store.get("todo.note", 1))
+        self.assertEqual(store.get("todo.note", 3), "Shared\n\nVersion 2")
+        self.assertEqual(self.objects(), 3)
+
+    def test_pruning_runs_in_batches(self):
+        store = NoteVersionStore(self.temp_dir.name, keep_versions=3, prune_batch=4)
+        with mock.patch.object(store, "_collect_garbage", wraps=store._collect_garbage) as collect:
+            for i in range(10):
+                store.save("todo.note", f"Version {i}")
+            # Pruned once, when the seventh version was saved
+            self.assertEqual(collect.call_count, 1)
+            self.assertEqual([entry["version"] for entry in store.versions("todo.note")], [5, 6, 7, 8, 9, 10])
+            store.save("todo.note", "Version 10")
+        self.assertEqual(collect.call_count, 2)
+        self.assertEqual([entry["version"] for entry in store.versions("todo.note")], [9, 10, 11])
+        self.assertEqual(self.objects(), 3)
+
+class TestNotesManagerHistory(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        backup_directory = os.path.join(self.temp_dir.name, "notes", "backup")
+        os.makedirs(backup_directory)
+        with open(os.path.join(backup_directory, "ideas_20250101120000.note"), "w") as f:
+            f.write("An old idea")
+        self.notes = NotesManager(DummyConfigManager(self.temp_dir.name))
+
+    def tearDown(self):
+        InvertedIndex._indexes.pop(self.notes.index.db_path, None)
+        NoteVersionStore._stores.pop(self.notes.versions.directory, None)
+        self.temp_dir.cleanup()
+
+    def test_put_note_keeps_history(self):
+        self.assertFalse(any(name.endswith(".note") for name in os.listdir(self.notes.backup_directory)))
+        self.notes.put_note("ideas", "A new idea")
+        self.notes.put_note("ideas", "A better idea")
+        self.assertEqual(self.notes.get_note("ideas"), "A better idea")
+        self.assertEqual([entry["version"] for entry in self.notes.get_note_history("ideas")], [1, 2, 3])
+        self.assertEqual(self.notes.get_note_version("ideas", 1), "An old idea")
+        self.assertEqual(self.notes.get_note_version("ideas.note", 2), "A new idea")
+
+    def test_backups_are_imported_once(self):
+        self.notes.put_note("ideas", "A new idea")
+        with mock.patch("leah.utils.NotesManager.os.walk") as walk:
+            NotesManager(DummyConfigManager(self.temp_dir.name))
+        walk.assert_not_called()
+        self.assertEqual(len(self.notes.get_note_history("ideas")), 2)
+
+if __name__ == '__main__':
+    unittest.main()
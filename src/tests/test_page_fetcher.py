@@ -0,0 +1,131 @@
+import hashlib
+import tempfile
+import time
+import unittest
+from unittest import mock
+import requests
+from leah.utils.CacheManager import CacheManager
+from leah.utils.PageFetcher import PageFetcher, extract_main_content
+
+class DummyConfig:
+    def get_cache_config(self):
+        return {}
+
+class DummyConfigManager:
+    def __init__(self, root):
+        self.root = root
+
+    def get_path(self, filename):
+        return f"{self.root}/{filename}"
+
+    def get_config(self):
+        return DummyConfig()
+
+class FakeResponse(requests.Response):
+    def __init__(self, content, content_type, status_code=200, url="https://example.com/page"):
+        super().__init__()
+        self._content = content
+        self.status_code = status_code
+        self.url = url
+        if content_type:
+            self.headers['Content-Type'] = content_type
+        self.encoding = requests.utils.get_encoding_from_headers(self.headers)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append((url, kwargs))
+        return self.response
+
+def page(body, head=""):
+    return f"<html><head>{head}</head><body><main>{body}</main></body></html>"
+
+class TestPageFetcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = CacheManager(DummyConfigManager(self.temp_dir.name))
+        self.fetcher = PageFetcher(cache_manager=self.cache, min_text_chars=10)
+
+    def tearDown(self):
+        CacheManager._stores.pop(self.cache.store.cache_dir, None)
+        self.temp_dir.cleanup()
+
+    def test_declared_encodings(self):
+        text = "Crème brûlée für alle"
+        response = FakeResponse(page(text).encode('iso-8859-1'), 'text/html; charset=ISO-8859-1')
+        self.assertIn(text, self.fetcher._extract(response))
+        response = FakeResponse(page(text, '<meta charset="windows-1252">').encode('cp1252'), 'text/html')
+        self.assertIn(text, self.fetcher._extract(response))
+        response = FakeResponse(page(text).encode('utf-8'), 'text/html')
+        self.assertIn(text, self.fetcher._extract(response))
+
+    def test_plain_text_without_charset_is_not_read_as_latin_1(self):
+        response = FakeResponse("Grüße aus Köln".encode('utf-8'), 'text/plain')
+        self.assertEqual(self.fetcher._extract(response), "Grüße aus Köln")
+        response = FakeResponse(b'{"name": "caf\xc3\xa9"}', 'application/json')
+        self.assertEqual(self.fetcher._extract(response), '{"name": "café"}')
+
+    def test_binary_content_is_described(self):
+        response = FakeResponse(b"%PDF-1.7 \x00\x01", 'application/pdf', url="https://example.com/report.pdf")
+        response.headers['Content-Length'] = '12'
+        self.fetcher.session = FakeSession(response)
+        description = self.fetcher.fetch("https://example.com/report.pdf")
+        self.assertEqual(description, "https://example.com/report.pdf is a application/pdf file of 12 bytes, "
+                                      "which has no text content to read.")
+        self.assertTrue(response.closed)
+        self.assertTrue(self.fetcher.session.requests[0][1]['stream'])
+        self.assertIn("image/png file", self.fetcher._extract(FakeResponse(b"\x89PNG", 'image/png')))
+
+    def test_fetch_caches_the_page(self):
+        self.fetcher.session = FakeSession(FakeResponse(page("Enough text to skip the browser").encode(), 'text/html'))
+        self.assertIn("Enough text", self.fetcher.fetch("https://example.com/page"))
+        self.fetcher.session = FakeSession(None)
+        self.assertIn("Enough text", self.fetcher.fetch("https://example.com/page"))
+        self.assertEqual(self.fetcher.session.requests, [])
+
+    def test_empty_error_page(self):
+        response = FakeResponse(b"", 'text/html', status_code=404)
+        self.fetcher.session = FakeSession(response)
+        self.assertEqual(self.fetcher.fetch("https://example.com/missing"), "")
+        self.assertEqual(self.fetcher._extract(FakeResponse(b"  \n", 'text/html')), "")
+        self.assertIsNone(self.cache.get(f"page_{hashlib.md5(b'https://example.com/missing').hexdigest()}"))
+
+    def test_browser_path_closes_the_response(self):
+        response = FakeResponse(b"Forbidden", 'text/html', status_code=403)
+        self.fetcher.session = FakeSession(response)
+        with mock.patch("leah.utils.PageFetcher.fetch_url_with_selenium", return_value="Rendered") as browser:
+            self.assertEqual(self.fetcher.fetch("https://example.com/page"), "Rendered")
+        browser.assert_called_once_with("https://example.com/page")
+        self.assertTrue(response.closed)
+
+    def test_body_is_decoded_once(self):
+        self.fetcher.session = FakeSession(FakeResponse(page("Enough text to skip the browser").encode(), 'text/html'))
+        with mock.patch.object(self.fetcher, "_decode", wraps=self.fetcher._decode) as decode:
+            self.assertIn("Enough text", self.fetcher.fetch("https://example.com/page"))
+        self.assertEqual(decode.call_count, 1)
+
+    def test_revalidation_does_not_mutate_the_cached_entry(self):
+        key = f"page_{hashlib.md5(b'https://example.com/page').hexdigest()}"
+        entry = {'markdown': "Cached page", 'etag': '"v1"', 'last_modified': None, 'fetched_at': time.time() - 3600}
+        self.cache.set(key, entry)
+        cached = self.cache.get(key)
+        self.fetcher.session = FakeSession(FakeResponse(b"", 'text/html', status_code=304))
+        self.assertEqual(self.fetcher.fetch("https://example.com/page"), "Cached page")
+        self.assertEqual(self.fetcher.session.requests[0][1]['headers'], {'If-None-Match': '"v1"'})
+        self.assertEqual(cached['fetched_at'], entry['fetched_at'])
+        self.assertGreater(self.cache.get(key)['fetched_at'], entry['fetched_at'])
+
+    def test_extract_main_content(self):
+        self.assertIn("Straße", extract_main_content("<p>Straße</p>", "https://example.com"))
+        self.assertIn("Straße", extract_main_content("<p>Straße</p>".encode('cp1252'), "https://example.com", 'cp1252'))
+        self.assertIn("Hello", extract_main_content('<?xml version="1.0" encoding="utf-8"?><p>Hello</p>', "https://example.com"))
+
+if __name__ == '__main__':
+    unittest.main()
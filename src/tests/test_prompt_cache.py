@@ -0,0 +1,118 @@
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import leah.actions  # noqa: F401 (loads the actions before LlmConnector, which imports them back)
+from leah.config.GlobalConfig import GlobalConfig
+from leah.llm.LlmConnector import LlmConnector
+from leah.llm.PromptCache import PromptCache
+from leah.utils.CacheManager import CacheManager
+
+class DummyConfig:
+    def get_cache_config(self):
+        return {}
+
+class DummyConfigManager:
+    def __init__(self, root):
+        self.root = root
+
+    def get_path(self, filename):
+        return f"{self.root}/{filename}"
+
+    def get_config(self):
+        return DummyConfig()
+
+class ShippedConfigManager:
+    """Reads the personas from the shipped config.json without creating a user directory."""
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    def get_config(self):
+        return GlobalConfig()
+
+class FakeConnector(LlmConnector):
+    def __init__(self, temperature, tools=None):
+        self.connector_type = "ollama"
+        self.model = "test-model"
+        self.temperature = temperature
+        self.tools = tools or []
+        self.calls = 0
+
+    def _query(self, query, low_priority=False):
+        self.calls += 1
+        return f"response {self.calls}"
+
+class TestPromptCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = PromptCache(ttl=60, max_response_chars=20, config_manager=DummyConfigManager(self.temp_dir.name))
+        self.original_instance = PromptCache._instance
+        PromptCache._instance = self.cache
+
+    def tearDown(self):
+        PromptCache._instance = self.original_instance
+        CacheManager._stores.pop(f"{self.temp_dir.name}/cache", None)
+        self.temp_dir.cleanup()
+
+    def test_key_keeps_internal_whitespace(self):
+        key = self.cache.key("ollama", "model", 0, "Translate:\n    def f():\n        return 1")
+        self.assertEqual(key, self.cache.key("ollama", "model", 0, "  Translate:\n    def f():\n        return 1\n"))
+        self.assertNotEqual(key, self.cache.key("ollama", "model", 0, "Translate: def f(): return 1"))
+        self.assertNotEqual(key, self.cache.key("ollama", "model", 1, "Translate:\n    def f():\n        return 1"))
+
+    def test_get_or_compute(self):
+        self.assertEqual(self.cache.get_or_compute("k", lambda: "first"), "first")
+        self.assertEqual(self.cache.get_or_compute("k", lambda: "second"), "first")
+        # Empty and overly long responses are returned but not cached
+        self.assertEqual(self.cache.get_or_compute("long", lambda: "x" * 21), "x" * 21)
+        self.assertIsNone(self.cache.get("long"))
+        self.assertEqual(self.cache.get_or_compute("empty", lambda: ""), "")
+        self.assertIsNone(self.cache.get("empty"))
+
+    def test_concurrent_requests_share_one_call(self):
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return "shared"
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get_or_compute("k", compute)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((len(calls), results), (1, ["shared"] * 4))
+
+    def test_query_only_caches_deterministic_personas(self):
+        deterministic = FakeConnector(temperature=0)
+        self.assertEqual(deterministic.query("Hello"), "response 1")
+        self.assertEqual(deterministic.query("Hello"), "response 1")
+        sampled = FakeConnector(temperature=1)
+        self.assertEqual([sampled.query("Hello"), sampled.query("Hello")], ["response 1", "response 2"])
+        with_tools = FakeConnector(temperature=0, tools=["search"])
+        self.assertEqual([with_tools.query("Hi"), with_tools.query("Hi")], ["response 1", "response 2"])
+        self.assertEqual([sampled.query("Hi", use_cache=True), sampled.query("Hi", use_cache=True)],
+                         ["response 3", "response 3"])
+
+    def test_utility_tools_are_served_from_the_cache(self):
+        from leah.tools import super_duper_llm_tools
+        calls = []
+
+        def fake_query(connector, query, low_priority=False):
+            calls.append((connector.persona, connector.temperature))
+            return "A short summary"
+        with mock.patch.object(super_duper_llm_tools, "LocalConfigManager", ShippedConfigManager), \
+                mock.patch("leah.llm.LlmConnector.ChatGoogleGenerativeAI"), \
+                mock.patch.object(LlmConnector, "_query", fake_query):
+            first = super_duper_llm_tools.summarize_text.invoke({"text_to_summarize": "A long text about tomatoes."})
+            second = super_duper_llm_tools.summarize_text.invoke({"text_to_summarize": "A long text about tomatoes."})
+        self.assertEqual(first, second)
+        self.assertIn("A short summary", first)
+        self.assertEqual(calls, [("utility", 0)])
+
+if __name__ == '__main__':
+    unittest.main()
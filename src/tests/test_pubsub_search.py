@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from leah.actions.ChannelAction import ChannelAction
+from leah.utils.InvertedIndex import InvertedIndex
+from leah.utils.Message import Message, MessageType
+from leah.utils.PubSub import PubSub
+
+class DummyConfigManager:
+    def __init__(self, root):
+        self.root = root
+
+    def get_path(self, filename):
+        return os.path.join(self.root, filename)
+
+class TestPubSubSearch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pubsub = PubSub()
+        self.original_config_manager = self.pubsub.config_manager
+        self.pubsub.config_manager = DummyConfigManager(self.temp_dir.name)
+
+    def tearDown(self):
+        self.pubsub.config_manager = self.original_config_manager
+        for path in list(InvertedIndex._indexes):
+            if path.startswith(self.temp_dir.name):
+                InvertedIndex._indexes.pop(path)
+                PubSub._backfilled.discard(path)
+        self.temp_dir.cleanup()
+
+    def store(self, channel, content, sender="@ann"):
+        message = Message(sender, channel, content, MessageType.CHANNEL)
+        self.pubsub._store_message(channel, message)
+        return message
+
+    def legacy_channel(self, channel, contents):
+        """Write a history file as it was before channels were indexed."""
+        messages = [Message("@ann", channel, content, MessageType.CHANNEL) for content in contents]
+        path = self.pubsub._get_channel_storage_path(channel)
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            json.dump([message.to_dict() for message in messages], f)
+        return messages
+
+    def test_interrupted_backfill_is_completed(self):
+        messages = self.legacy_channel("#old", ["tomatoes one", "tomatoes two", "tomatoes three"])
+        # A backfill that died after the first message left an index without the marker
+        index_path = os.path.join(os.path.dirname(self.pubsub._get_channel_storage_path("#old")), "index.db")
+        self.pubsub._index_message(InvertedIndex.open(index_path), messages[0])
+        self.assertEqual(len(self.pubsub.search_messages(["#old"], "tomatoes")), 3)
+        self.assertEqual(InvertedIndex.open(index_path).get_setting("backfilled"), "1")
+
+    def test_concurrent_callers_wait_for_the_backfill(self):
+        self.legacy_channel("#old", [f"tomatoes {i}" for i in range(5)])
+        started, release = threading.Event(), threading.Event()
+        index_message = self.pubsub._index_message
+
+        def slow_index_message(index, message):
+            started.set()
+            release.wait(5)
+            index_message(index, message)
+        sizes = []
+        with mock.patch.object(self.pubsub, "_index_message", slow_index_message):
+            backfill = threading.Thread(target=self.pubsub.get_channel_index, args=("#old",))
+            backfill.start()
+            self.assertTrue(started.wait(5))
+            reader = threading.Thread(target=lambda: sizes.append(len(self.pubsub.get_channel_index("#old"))))
+            reader.start()
+            reader.join(0.2)
+            self.assertTrue(reader.is_alive())
+            release.set()
+            backfill.join()
+            reader.join()
+        self.assertEqual(sizes, [5])
+
+    def test_history_file_is_appended_and_stays_valid_json(self):
+        first = self.store("#garden", "Water the tomatoes")
+        second = self.store("#garden", "Line one\nline two \"quoted\"")
+        path = self.pubsub._get_channel_storage_path("#garden")
+        with open(path) as f:
+            self.assertEqual([item["id"] for item in json.load(f)], [first.id, second.id])
+        self.assertEqual([m.content for m in self.pubsub.get_channel_messages("#garden")],
+                         ["Water the tomatoes", "Line one\nline two \"quoted\""])
+        # A file written by json.dump (the previous format) is appended to the same way
+        with open(path, "w") as f:
+            json.dump([first.to_dict()], f, indent=2)
+        self.store("#garden", "Harvest on Sunday")
+        self.assertEqual(len(self.pubsub.get_channel_messages("#garden")), 2)
+
+    def test_scores_are_comparable_across_channels(self):
+        # Tomatoes are rare in the small channel and common in the large one, so scoring each
+        # channel with its own statistics would put the weak small channel match first
+        self.store("#small", "tomatoes are mentioned once here among many other unrelated words")
+        self.store("#small", "the car needs new tires")
+        self.store("#small", "bring a water bottle")
+        for i in range(30):
+            self.store("#large", f"message number {i} about tomatoes")
+        best = self.store("#large", "tomatoes tomatoes tomatoes")
+        results = self.pubsub.search_messages(["#small", "#large"], "tomatoes")
+        self.assertEqual([message.id for message, _ in results][0], best.id)
+        self.assertEqual(len(results), 20)
+        self.assertEqual(results[0][0].via_channel, "#large")
+        self.assertEqual(self.pubsub.search_messages(["#missing"], "tomatoes"), [])
+
+    def test_channel_action_search(self):
+        self.store("#garden", "Water the tomatoes every morning")
+        self.store("#garden", "The car needs new tires")
+        action = ChannelAction(None, "leah", "", None)
+        # PubSub() runs __init__ again, which resets the config manager of the shared instance
+        action.pubsub.config_manager = DummyConfigManager(self.temp_dir.name)
+        output = list(action.search_messages({"channel": "garden", "terms": "tomatoes, morning"}))
+        self.assertEqual(output[0][0], "system")
+        self.assertIn("Found 1 matching messages in #garden", output[-1][1])
+        self.assertIn("Message: Water the tomatoes every morning", output[-1][1])
+        output = list(action.search_messages({"channel": "#garden", "terms": "bicycle"}))
+        self.assertEqual(output[-1], ("result", "I found no messages containing the terms: bicycle"))
+        self.assertEqual(list(action.search_messages({"channel": "@ann", "terms": "x"}))[-1][1],
+                         "I cannot search direct message channels. Channel must not start with '@'")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import threading
+import time
+import unittest
+from leah.utils.SingleFlight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_result(self):
+        flight = SingleFlight()
+        calls = []
+
+        def slow_search(query):
+            calls.append(query)
+            time.sleep(0.1)
+            return f"results for {query}"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("key", slow_search, "weather")))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, ["weather"])
+        self.assertEqual(results, ["results for weather"] * 5)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_errors_are_shared_and_not_remembered(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("upstream error")
+
+        with self.assertRaises(ValueError):
+            flight.do("key", fail)
+        self.assertEqual(flight.do("key", lambda: "recovered"), "recovered")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from leah.utils.SpeechSegmenter import SpeechSegmenter
+
+class TestSpeechSegmenter(unittest.TestCase):
+    def test_first_chunk_is_released_at_first_sentence(self):
+        segmenter = SpeechSegmenter(first_chunk=10, max_chunk=100)
+        self.assertEqual(segmenter.feed("Hello there"), [])
+        self.assertEqual(segmenter.feed(", my friend. How are"), ["Hello there, my friend."])
+        self.assertEqual(segmenter.feed(" you?"), [])
+        self.assertEqual(segmenter.flush(), ["How are you?"])
+        self.assertEqual(segmenter.flush(), [])
+
+    def test_first_chunk_may_end_at_a_clause(self):
+        segmenter = SpeechSegmenter(first_chunk=10, max_chunk=100)
+        self.assertEqual(segmenter.feed("Well, let me think about that, "), ["Well, let me think about that,"])
+
+    def test_later_chunks_grow(self):
+        segmenter = SpeechSegmenter(first_chunk=10, max_chunk=100, growth=2.0)
+        chunks = segmenter.feed("One two three. Four five. Six seven eight nine. Ten eleven twelve thirteen. ")
+        self.assertEqual(chunks, ["One two three.", "Four five. Six seven eight nine."])
+        # The third sentence is shorter than the grown minimum and waits for more text
+        self.assertEqual(segmenter.min_chunk, 40)
+        self.assertEqual(segmenter.flush(), ["Ten eleven twelve thirteen."])
+
+    def test_long_text_without_punctuation_is_cut_at_a_space(self):
+        segmenter = SpeechSegmenter(first_chunk=10, max_chunk=20)
+        chunks = segmenter.feed("word " * 12)
+        self.assertTrue(chunks)
+        self.assertTrue(all(len(chunk) <= 20 and not chunk.endswith(" ") for chunk in chunks))
+        self.assertEqual(" ".join(chunks + segmenter.flush()).split(), ["word"] * 12)
+
+    def test_decimal_points_do_not_split(self):
+        segmenter = SpeechSegmenter(first_chunk=5, max_chunk=100)
+        self.assertEqual(segmenter.feed("It costs 3.50 dollars"), [])
+        self.assertEqual(segmenter.flush(), ["It costs 3.50 dollars"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+from leah.utils.TextNormalizer import TextNormalizer, filter_emojis, filter_urls, normalize_for_speech, strip_markdown
+
+class TestTextNormalizer(unittest.TestCase):
+    def setUp(self):
+        self.normalizer = TextNormalizer()
+
+    def test_plain_text_is_unchanged(self):
+        text = "The meeting is at three o'clock, see you there."
+        self.assertEqual(self.normalizer.normalize(text), text)
+
+    def test_strip_markdown(self):
+        text = "Run `ls` first.\n```bash\nrm -rf /\n```\nThis is **bold**, *italic*, __strong__ and _em_."
+        self.assertEqual(strip_markdown(text), "Run  first.\n\nThis is bold, italic, strong and em.")
+
+    def test_filter_emojis(self):
+        self.assertEqual(filter_emojis("Great job 🎉 ☕"), "Great job  ")
+
+    def test_filter_urls(self):
+        self.assertEqual(filter_urls("See https://example.com/a_b?c=1 now"), "See URL now")
+        self.assertEqual(filter_urls("No links here"), "No links here")
+
+    def test_normalize_for_speech(self):
+        text = "## Plan 🌞\nCheck **https://example.com/docs** for the `schedule` #today "
+        self.assertEqual(normalize_for_speech(text), "Plan \nCheck URL for the  today")
+
+    def test_normalize_strips_surrounding_whitespace(self):
+        self.assertEqual(self.normalizer.normalize("Done. #"), "Done.")
+        self.assertEqual(self.normalizer.normalize("  ## \n"), "")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from leah.utils.TrigramIndex import TrigramIndex, required_literals
+
+class TestTrigramIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "root")
+        os.makedirs(os.path.join(self.root, "src"))
+        self.write("src/app.py", "import os\n\ndef load_config(path):\n    return open(path).read()\n")
+        self.write("src/util.py", "def helper():\n    return 42\n")
+        with open(os.path.join(self.root, "data.bin"), "wb") as f:
+            f.write(b"load_config\0\1\2")
+        self.index = TrigramIndex(self.root, os.path.join(self.temp_dir.name, "index.db"), refresh_interval=0)
+        self.index.refresh()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.root, name), "w") as f:
+            f.write(content)
+
+    def test_literal_search_skips_binaries(self):
+        results = list(self.index.search("LOAD_CONFIG", self.root))
+        self.assertEqual(results, [os.path.join(self.root, "src/app.py") + ":3:def load_config(path):"])
+        self.assertEqual(list(self.index.search("load_config", self.root, case_sensitive=True)), results)
+        self.assertEqual(list(self.index.search("LOAD_CONFIG", self.root, case_sensitive=True)), [])
+
+    def test_regex_search(self):
+        self.assertEqual(required_literals(r"def \w+\(path"), ["def ", "(path"])
+        self.assertEqual(required_literals("foo|bar"), [])
+        results = list(self.index.search(r"def \w+\(\)", self.root, regex=True))
+        self.assertEqual(results, [os.path.join(self.root, "src/util.py") + ":1:def helper():"])
+        self.assertEqual(len(list(self.index.search(r"def|return", self.root, regex=True, max_results=3))), 3)
+
+    def test_refresh_and_names(self):
+        self.write("src/util.py", "def renamed():\n    pass\n")
+        os.utime(os.path.join(self.root, "src/util.py"), (1, 1))
+        self.index.refresh()
+        self.assertEqual(list(self.index.search("helper", self.root)), [])
+        self.assertEqual(len(list(self.index.search("renamed", self.root))), 1)
+        self.assertEqual(self.index.search_names(["UTIL", "src"], self.root),
+                         [os.path.join(self.root, "src"), os.path.join(self.root, "src/util.py")])
+
+    def test_files_too_large_to_index_are_searched(self):
+        self.write("src/large.txt", "filler line\n" * 200 + "the needle is here\n")
+        index = TrigramIndex(self.root, os.path.join(self.temp_dir.name, "small.db"), max_file_size=1024, refresh_interval=0)
+        index.refresh()
+        expected = [os.path.join(self.root, "src/large.txt") + ":201:the needle is here"]
+        self.assertEqual(list(index.search("NEEDLE", self.root)), expected)
+        self.assertEqual(list(index.search(r"needle \w+", self.root, regex=True)), expected)
+        self.assertEqual(list(index.search("load_config", os.path.join(self.root, "src"))),
+                         [os.path.join(self.root, "src/app.py") + ":3:def load_config(path):"])
+
+    def test_line_numbers_only_count_newlines(self):
+        self.write("src/page.txt", "first\x0cstill first\x1c\nsecond line with target\n")
+        self.index.refresh()
+        self.assertEqual(list(self.index.search("target", self.root)),
+                         [os.path.join(self.root, "src/page.txt") + ":2:second line with target"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from leah.utils.VectorIndex import VectorIndex
+
+def one_hot(i, dim=4):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[i] = 1
+    return vector
+
+class TestVectorIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index_dir = os.path.join(self.temp_dir.name, "index")
+        self.index = VectorIndex(self.index_dir, 4)
+        self.vectors = {"north": one_hot(0), "east": one_hot(1), "south": one_hot(2), "north east": (one_hot(0) + one_hot(1))}
+        self.embedded = []
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        return [self.vectors[text] for text in texts]
+
+    def test_search_ranks_by_cosine_similarity(self):
+        self.index.update_file("a.txt", 1, ["north", "east"], self.embed)
+        self.index.update_file("b.txt", 1, ["north east"], self.embed)
+        results = self.index.search(one_hot(0), k=2)
+        self.assertEqual([(path, text) for _, path, text in results], [("a.txt", "north"), ("b.txt", "north east")])
+        self.assertAlmostEqual(results[0][0], 1.0, places=5)
+        self.assertEqual(len(self.index.search(one_hot(0), k=10)), 3)
+
+    def test_search_restricted_to_paths(self):
+        self.index.update_file("a.txt", 1, ["east"], self.embed)
+        self.index.update_file("c.txt", 1, ["north"], self.embed)
+        self.assertEqual([path for _, path, _ in self.index.search(one_hot(0), k=3, paths=["a.txt"])], ["a.txt"])
+        self.assertEqual(self.index.search(one_hot(0), k=3, paths=["missing.txt"]), [])
+        self.assertEqual(self.index.search(one_hot(0), k=3, paths=[]), [])
+
+    def test_update_reuses_vectors_and_rows(self):
+        self.index.update_file("a.txt", 1, ["north", "east"], self.embed)
+        self.index.update_file("b.txt", 1, ["north"], self.embed)
+        self.assertEqual(self.embedded, ["north", "east"])
+        self.assertFalse(self.index.needs_update("a.txt", 1))
+        self.assertTrue(self.index.needs_update("a.txt", 2))
+        self.index.update_file("a.txt", 2, ["south"], self.embed)
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index._rows, 3)
+        self.index.remove_file("b.txt")
+        self.assertEqual([text for _, _, text in self.index.search(one_hot(0), k=3)], ["south"])
+
+    def test_reopen_and_dimension_change(self):
+        self.index.update_file("a.txt", 1, ["north"], self.embed)
+        self.assertEqual(VectorIndex.stored_dim(self.index_dir), 4)
+        reopened = VectorIndex(self.index_dir, 4)
+        self.assertEqual(reopened.search(one_hot(0), k=1)[0][2], "north")
+        rebuilt = VectorIndex(self.index_dir, 8)
+        self.assertEqual(len(rebuilt), 0)
+        self.assertEqual(rebuilt.indexed_paths(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import threading
+import unittest
+from leah.utils.VoiceSynthesizer import VoiceSynthesizer
+
+class FakeSynthesizer(VoiceSynthesizer):
+    def __init__(self, voice_dir, **kwargs):
+        super().__init__(voice_dir, workers=2, **kwargs)
+        self.spoken = []
+        self.release_synthesis = threading.Event()
+        self.release_synthesis.set()
+
+    def _synthesize(self, text, voice, path):
+        self.release_synthesis.wait(5)
+        if text == "fail":
+            raise RuntimeError("service unavailable")
+        self.spoken.append(text)
+        with open(path, "wb") as f:
+            f.write(b"x" * 100)
+
+class TestVoiceSynthesizer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def exists(self, synthesizer, filename):
+        return os.path.exists(synthesizer.get_path(filename))
+
+    def test_clips_are_synthesized_once(self):
+        synthesizer = FakeSynthesizer(self.temp_dir.name)
+        synthesizer.release_synthesis.clear()
+        first = synthesizer.submit("Hello there.", "en-US-AvaNeural")
+        self.assertEqual(synthesizer.submit("Hello there.", "en-US-AvaNeural"), first)
+        synthesizer.release_synthesis.set()
+        self.assertTrue(synthesizer.wait(first, timeout=5))
+        self.assertEqual(synthesizer.submit("Hello there.", "en-US-AvaNeural"), first)
+        self.assertEqual(synthesizer.spoken, ["Hello there."])
+        self.assertNotEqual(synthesizer.submit("Hello there.", "en-GB-SoniaNeural"), first)
+        self.assertIsNone(synthesizer.submit("  ", "en-US-AvaNeural"))
+        failed = synthesizer.submit("fail", "en-US-AvaNeural")
+        self.assertFalse(synthesizer.wait(failed, timeout=5))
+        synthesizer.shutdown()
+
+    def test_pinned_clips_are_not_evicted(self):
+        synthesizer = FakeSynthesizer(self.temp_dir.name, max_cache_bytes=250)
+        first = synthesizer.submit("First.", "voice")
+        self.assertTrue(synthesizer.wait(first, timeout=5))
+        os.utime(synthesizer.get_path(first), (1, 1))
+        second = synthesizer.submit("Second.", "voice")
+        self.assertTrue(synthesizer.wait(second, timeout=5))
+        # The oldest clip has been sent to a client but not fetched yet
+        third = synthesizer.submit("Third.", "voice")
+        self.assertTrue(synthesizer.wait(third, timeout=5))
+        self.assertTrue(all(self.exists(synthesizer, name) for name in (first, second, third)))
+
+        for name in (first, second):
+            synthesizer.release(name)
+        fourth = synthesizer.submit("Fourth.", "voice")
+        self.assertTrue(synthesizer.wait(fourth, timeout=5))
+        self.assertFalse(self.exists(synthesizer, first))
+        self.assertTrue(self.exists(synthesizer, third))
+        self.assertTrue(self.exists(synthesizer, fourth))
+        synthesizer.shutdown()
+
+    def test_pins_expire(self):
+        synthesizer = FakeSynthesizer(self.temp_dir.name, max_cache_bytes=150, pin_seconds=0)
+        first = synthesizer.submit("First.", "voice")
+        self.assertTrue(synthesizer.wait(first, timeout=5))
+        os.utime(synthesizer.get_path(first), (1, 1))
+        second = synthesizer.submit("Second.", "voice")
+        self.assertTrue(synthesizer.wait(second, timeout=5))
+        self.assertFalse(self.exists(synthesizer, first))
+        self.assertEqual(synthesizer._pins, {})
+        synthesizer.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
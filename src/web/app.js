@@ -277,6 +277,7 @@ const App = () => {
 
         const startSubscription = async () => {
             console.log("Starting subscription");
+            let controller = null;
             try {
                 // Only start a new subscription if we don't have an active one
                 if (abortControllerRef.current) {
@@ -284,16 +285,18 @@ const App = () => {
                     return;
                 }
                 
-                abortControllerRef.current = new AbortController();
+                controller = new AbortController();
+                abortControllerRef.current = controller;
 
-                const res = await fetch('/subscribe', {
+                // Only ask the server to synthesize speech while unmuted, toggling mute reconnects
+                const res = await fetch(isMuted ? '/subscribe' : '/subscribe?voice=1', {
                     method: 'GET',
                     headers: {
                         'Content-Type': 'application/json',
                         'Authorization': `Bearer ${token}`,
                         'X-Username': username
                     },
-                    signal: abortControllerRef.current.signal
+                    signal: controller.signal
                 });
 
                 if (res.status === 401) {
@@ -332,6 +335,13 @@ const App = () => {
                             // Strip the 'data:' prefix and parse the JSON response
                             const jsonResponse = JSON.parse(jsonObject.replace(/^data:\s*/, ''));
                             console.log("JSON response:", jsonResponse);
+                            if (jsonResponse.type === 'audio') {
+                                // Speech for a message, only play it for the channel being viewed
+                                if (jsonResponse.channel === currentChannel && !isMuted) {
+                                    addToAudioQueue("/voice/" + jsonResponse.filename);
+                                }
+                                continue;
+                            }
                             let to_channel = jsonResponse.via_channel;
                             if (jsonResponse.type == "direct") {
                                 to_channel = jsonResponse.from_user;
@@ -366,18 +376,17 @@ const App = () => {
                     }
                 }
             } catch (error) {
-                console.log("Subscription error:", error);
-            } finally {
-                setIsSubscriptionActive(false);
-                abortControllerRef.current = null;
                 if (error.name === 'AbortError') {
                     console.log('Subscription aborted');
-                    abortControllerRef.current = null;
-                    startSubscription();
                 } else {
                     console.error('Subscription error:', error);
-                    await new Promise(resolve => setTimeout(resolve, 500));
-                    startSubscription();
+                }
+            } finally {
+                // After a reconnect (e.g. toggling mute) the ref belongs to the newer subscription,
+                // otherwise the polling below starts a new one
+                if (abortControllerRef.current === controller) {
+                    setIsSubscriptionActive(false);
+                    abortControllerRef.current = null;
                 }
             }
         };
@@ -412,6 +421,7 @@ const App = () => {
         return () => {
             if (abortControllerRef.current) {
                 abortControllerRef.current.abort();
+                abortControllerRef.current = null;
             }
             // Clear polling interval
             clearInterval(pollingInterval);
@@ -618,7 +628,7 @@ const App = () => {
     }, [submissionQueue]);
 
     const useAudioPlayer = () => {
-        // We are managing promises of audio urls instead of directly storing strings
+        // We are managing promises of audio data instead of directly storing strings
         // because there is no guarantee when openai tts api finishes processing and resolves a specific url
         // For more info, check this comment:
         // https://github.com/tarasglek/chatcraft.org/pull/357#discussion_r1473470003
@@ -633,14 +643,13 @@ const App = () => {
             }
         }, [queue, isPlaying]);
 
-        const playAudio = async (audioClipUri) => {
-            console.log('Attempting to play audio with Web Audio API:', audioClipUri);
-            if (!audioClipUri) {
-                console.error('No audio URI provided');
+        const playAudio = async (audioClip) => {
+            console.log('Attempting to play audio with Web Audio API');
+            if (!audioClip) {
+                console.error('No audio clip provided');
                 return;
             }
             setIsPlaying(true);
-            const audioUrl = await audioClipUri;
 
             // Create a new audio context if one doesn't exist
             if (!audioContextRef.current) {
@@ -648,8 +657,7 @@ const App = () => {
             }
 
             try {
-                const response = await fetch(audioUrl);
-                const arrayBuffer = await response.arrayBuffer();
+                const arrayBuffer = await audioClip;
                 const audioBuffer = await audioContextRef.current.decodeAudioData(arrayBuffer);
                 const source = audioContextRef.current.createBufferSource();
                 source.buffer = audioBuffer;
@@ -670,7 +678,15 @@ const App = () => {
         };
 
         const addToAudioQueue = (audioClipUri) => {
-            setQueue((oldQueue) => [...oldQueue, audioClipUri]);
+            // Start downloading straight away so the clip is ready when the previous one ends
+            const audioClip = fetch(audioClipUri).then((response) => {
+                if (!response.ok) {
+                    throw new Error(`Failed to fetch audio: ${response.status}`);
+                }
+                return response.arrayBuffer();
+            });
+            audioClip.catch(() => {});
+            setQueue((oldQueue) => [...oldQueue, audioClip]);
         };
 
         const clearAudioQueue = () => {
@@ -172,6 +172,9 @@ def send_transcription(text):
     }
     print(headers)
     print("Making request")
+    # Audio segments are numbered, queue them in that order
+    pending_audio = {}
+    next_seq = 0
     with requests.post(f'{host}/query', json={
         'query': final_text, 
         'persona': DEFAULT_PERSONA,
@@ -188,13 +191,14 @@ def send_transcription(text):
                             global_conversation_id = data_json.get('id')
                             print(f"Got conversation ID: {global_conversation_id}")
                             continue
-                        filename = data_json.get('filename')
-                        if filename:
-                            print(f"Queueing {filename} for playback")
-                            # Stream audio from the server
-                            audio_url = f"{host}/voice/{filename}"
-                            # Add the URL to the queue
-                            audio_queue.put(audio_url)
+                        if data_json.get('type') == 'audio':
+                            pending_audio[data_json.get('seq', next_seq)] = data_json.get('filename')
+                            while next_seq in pending_audio:
+                                filename = pending_audio.pop(next_seq)
+                                next_seq += 1
+                                print(f"Queueing {filename} for playback")
+                                # Stream audio from the server
+                                audio_queue.put(f"{host}/voice/{filename}")
                         elif data_json.get('content',''):
                             print(data_json.get('content'), end="")
                     except json.JSONDecodeError: